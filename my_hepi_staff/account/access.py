@@ -0,0 +1,101 @@
+import time
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY as AUTH_SESSION_KEY
+from django.core.cache import cache
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import Account
+
+
+SESSION_KEY = '_current_account'
+VERSION_KEY = 'account:current:{account_id}:version'
+
+# Account fields kept in the session; employee/employer only as "exists" flags
+SESSION_FIELDS = ['id', 'user_id', 'is_employee', 'is_employer']
+
+
+def _timeout():
+    # the version expiring also makes the sessions resolve the account again
+    return getattr(settings, 'CURRENT_ACCOUNT_TIMEOUT', 300)
+
+
+def account_version(account_id: int) -> int:
+    return cache.get_or_set(VERSION_KEY.format(account_id=account_id), time.time_ns, timeout=_timeout())
+
+
+def invalidate_account(account_id: int) -> None:
+    """Make every session holding ``account_id`` resolve it again on its next request."""
+    key = VERSION_KEY.format(account_id=account_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=_timeout())
+
+
+def _from_session(data: dict) -> Account:
+    account = Account.from_db('default', SESSION_FIELDS, [data[f] for f in SESSION_FIELDS])
+    # known to be missing: accessing them raises without a query, like after select_related
+    for name in ('employee', 'employer'):
+        if not data[name]:
+            getattr(Account, name).related.set_cached_value(account, None)
+    return account
+
+
+def _resolve(request) -> Optional[Account]:
+    session = getattr(request, 'session', None)
+    cached = session.get(SESSION_KEY) if session is not None else None
+
+    if cached and str(cached['user_id']) == session.get(AUTH_SESSION_KEY) \
+            and cached['version'] == account_version(cached['id']):
+        return _from_session(cached)
+
+    user = request.user
+    if not user.is_authenticated:
+        return None
+
+    account = Account.objects.select_related('employee', 'employer').filter(user_id=user.pk).first()
+    if account is None:
+        return None
+
+    if session is not None:
+        version = account_version(account.pk)
+        session[SESSION_KEY] = {
+            **{f: getattr(account, f) for f in SESSION_FIELDS},
+            'employee': hasattr(account, 'employee'),
+            'employer': hasattr(account, 'employer'),
+            'version': version,
+        }
+    return account
+
+
+def get_account(request) -> Optional[Account]:
+    """
+    The ``Account`` of the logged-in user, resolved once per request. Its ids
+    and flags are kept in the session until ``invalidate_account`` is called,
+    or ``CURRENT_ACCOUNT_TIMEOUT`` seconds at most, so most requests resolve
+    it without a query; ``account.employee`` and ``account.employer`` are
+    then loaded on first access.
+    """
+    if not hasattr(request, '_account'):
+        request._account = _resolve(request)
+    return request._account
+
+
+# sessions are read synchronously, so async views resolve in a thread
+aget_account = sync_to_async(get_account)
+
+
+class CurrentAccountMiddleware(MiddlewareMixin):
+    """Expose the lazily resolved ``request.account``; needs the auth middleware."""
+
+    def process_request(self, request):
+        request.account = SimpleLazyObject(lambda: get_account(request))
+
+
+def account(request) -> dict:
+    """Context processor adding ``account`` to every template."""
+    return {'account': getattr(request, 'account', None)}
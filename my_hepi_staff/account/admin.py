@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Account, Employer, Employee
+from .models import Account, Assignment, BelbinSubmission, Employer, Employee
 
 @admin.register(Account)
 class AccountAdmin(admin.ModelAdmin):
@@ -17,3 +17,18 @@ class EmployerAdmin(admin.ModelAdmin):
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ['account']
+
+
+@admin.register(BelbinSubmission)
+class BelbinSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'created', 'po', 'nl', 'cza', 'sie', 'czk', 'se', 'czg', 'per']
+    raw_id_fields = ['employee']
+    readonly_fields = ['raw_answers']
+    ordering = ['-created']
+
+
+@admin.register(Assignment)
+class AssignmentAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'project', 'start_date', 'end_date', 'allocation']
+    raw_id_fields = ['employee', 'project']
+    ordering = ['employee', 'start_date']
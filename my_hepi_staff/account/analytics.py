@@ -0,0 +1,182 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from competence.models import Competence, Group
+from .models import CompetenceRollup, Employee, GroupRollup, Project
+
+
+EmployeeCompetence = Employee.competences.through
+ProjectCompetence = Project.competences.through
+
+GROUP_FIELDS = ['competences', 'employees', 'projects', 'under_supplied', 'shortfall']
+CSV_HEADER = ['group', 'competence', 'employees', 'projects', 'gap']
+
+
+# -- live computation, joining both through tables ----------------------------------
+
+def live_competence_counts(competence_ids: Optional[Iterable[int]] = None) -> dict[int, tuple[int, int]]:
+    """``competence pk -> (active employees, projects)`` counted from the through tables."""
+    competences = Competence.objects.all()
+    employees = EmployeeCompetence.objects.filter(employee__is_active=True)
+    projects = ProjectCompetence.objects.all()
+    if competence_ids is not None:
+        competence_ids = list(competence_ids)
+        competences = competences.filter(pk__in=competence_ids)
+        employees = employees.filter(competence_id__in=competence_ids)
+        projects = projects.filter(competence_id__in=competence_ids)
+
+    supply = dict(employees.order_by().values('competence_id').annotate(n=Count('*'))
+                  .values_list('competence_id', 'n'))
+    demand = dict(projects.order_by().values('competence_id').annotate(n=Count('*'))
+                  .values_list('competence_id', 'n'))
+    return {pk: (supply.get(pk, 0), demand.get(pk, 0)) for pk in competences.values_list('pk', flat=True)}
+
+
+def live_group_report() -> list[dict]:
+    """``group_report()`` computed from scratch, what the rollups save every request."""
+    counts = live_competence_counts()
+    groups = {pk: {'group_id': pk, 'group': name, **dict.fromkeys(GROUP_FIELDS, 0)}
+              for pk, name in Group.objects.values_list('pk', 'name')}
+
+    for pk, group_id in Competence.objects.values_list('pk', 'competence_group_id'):
+        employees, projects = counts[pk]
+        row = groups[group_id]
+        row['competences'] += 1
+        row['employees'] += employees
+        row['projects'] += projects
+        if projects > employees:
+            row['under_supplied'] += 1
+            row['shortfall'] += projects - employees
+
+    return sorted(groups.values(), key=lambda r: (-r['shortfall'], r['group'], r['group_id']))
+
+
+# -- reading the rollups -------------------------------------------------------------
+
+def group_report() -> list[dict]:
+    """One row per competence group, the most under-supplied first: a single query over ``GroupRollup``."""
+    rows = GroupRollup.objects.order_by('-shortfall', 'group__name', 'group_id') \
+        .values('group_id', 'group__name', *GROUP_FIELDS)
+    return [{'group_id': r['group_id'], 'group': r['group__name'], **{f: r[f] for f in GROUP_FIELDS}}
+            for r in rows]
+
+
+def competence_report(group_id: Optional[int] = None):
+    """``CompetenceRollup`` rows with their competence and group, the largest gap first."""
+    queryset = CompetenceRollup.objects.select_related('competence__competence_group') \
+        .order_by('-gap', 'competence__name', 'competence_id')
+    if group_id is not None:
+        queryset = queryset.filter(competence__competence_group_id=group_id)
+    return queryset
+
+
+def csv_rows(group_id: Optional[int] = None):
+    yield CSV_HEADER
+    for rollup in competence_report(group_id).iterator():
+        competence = rollup.competence
+        yield [competence.competence_group.name, competence.name, rollup.employees, rollup.projects, rollup.gap]
+
+
+# -- incremental maintenance ---------------------------------------------------------
+
+def refresh_groups(group_ids: Optional[Iterable[int]] = None, competence_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute ``GroupRollup`` rows from the competence rollups of the groups
+    (all of them, those in ``group_ids`` or those of ``competence_ids``): one
+    aggregate query and one upsert.
+    """
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=list(group_ids))
+    if competence_ids is not None:
+        groups = groups.filter(pk__in=Competence.objects.filter(pk__in=list(competence_ids))
+                               .values('competence_group_id'))
+
+    rollup = 'competence_group__rollup'
+    short = Q(**{f'{rollup}__gap__gt': 0})
+    rows = groups.order_by().annotate(
+        n_competences=Count(rollup),
+        n_employees=Coalesce(Sum(f'{rollup}__employees'), 0),
+        n_projects=Coalesce(Sum(f'{rollup}__projects'), 0),
+        n_under_supplied=Count(rollup, filter=short),
+        n_shortfall=Coalesce(Sum(f'{rollup}__gap', filter=short), 0),
+    ).values_list('pk', 'n_competences', 'n_employees', 'n_projects', 'n_under_supplied', 'n_shortfall')
+
+    rollups = [GroupRollup(group_id=pk, **dict(zip(GROUP_FIELDS, values))) for pk, *values in rows]
+    GroupRollup.objects.bulk_create(rollups, update_conflicts=True, unique_fields=['group'],
+                                    update_fields=GROUP_FIELDS)
+    return len(rollups)
+
+
+def _apply(field: str, deltas: Counter) -> None:
+    # supply lowers the gap, demand raises it
+    sign = 1 if field == 'projects' else -1
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    if not by_delta:
+        return
+
+    for delta, pks in by_delta.items():
+        CompetenceRollup.objects.filter(pk__in=pks).update(**{field: F(field) + delta, 'gap': F('gap') + sign * delta})
+    _groups_changed(pk for pks in by_delta.values() for pk in pks)
+
+
+_stale = threading.local()
+
+
+def _refresh_stale_groups() -> None:
+    competence_ids = getattr(_stale, 'competence_ids', None)
+    if competence_ids:
+        _stale.competence_ids = set()
+        refresh_groups(competence_ids=competence_ids)
+
+
+def _groups_changed(competence_ids: Iterable[int]) -> None:
+    # group sums are recomputed once per transaction, when it commits; after a
+    # rollback the leftover pks only cost a needless recount on the next commit
+    if not hasattr(_stale, 'competence_ids'):
+        _stale.competence_ids = set()
+    _stale.competence_ids.update(competence_ids)
+    transaction.on_commit(_refresh_stale_groups)
+
+
+def supply_changed(deltas: Counter) -> None:
+    """``deltas`` maps competence pks to the change in active employees having them."""
+    _apply('employees', deltas)
+
+
+def demand_changed(deltas: Counter) -> None:
+    """``deltas`` maps competence pks to the change in projects requiring them."""
+    _apply('projects', deltas)
+
+
+def competence_added(competence: Competence) -> None:
+    CompetenceRollup.objects.get_or_create(competence=competence)
+    refresh_groups(group_ids=[competence.competence_group_id])
+
+
+# -- full rebuild --------------------------------------------------------------------
+
+@transaction.atomic
+def rebuild_rollups() -> tuple[int, int]:
+    """Recount every competence from the through tables; returns the rows written per table."""
+    counts = live_competence_counts()
+    rollups = [CompetenceRollup(competence_id=pk, employees=employees, projects=projects, gap=projects - employees)
+               for pk, (employees, projects) in counts.items()]
+    CompetenceRollup.objects.bulk_create(rollups, batch_size=1000, update_conflicts=True,
+                                         unique_fields=['competence'], update_fields=['employees', 'projects', 'gap'])
+    return len(rollups), refresh_groups()
+
+
+def rollup_drift() -> dict[int, tuple[tuple[int, int], tuple[int, int]]]:
+    """Competences whose ``(employees, projects)`` rollup differs from a live count: ``pk -> (stored, live)``."""
+    stored = {pk: (employees, projects) for pk, employees, projects in
+              CompetenceRollup.objects.values_list('competence_id', 'employees', 'projects')}
+    return {pk: (stored.get(pk), live) for pk, live in live_competence_counts().items() if stored.get(pk) != live}
@@ -0,0 +1,200 @@
+from typing import Any
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views.generic.base import View
+
+from competence.models import Competence, Group
+from .access import aget_account
+from .belbin import ROLES
+from .directory import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, directory_page, directory_queryset
+from .models import ROLE_FIELDS, Account, BelbinSubmission, Employee, EmployeeDocument, Employer, Project
+from .projects import annotate_staffing
+from .views import EmployeeDirectoryMixin
+
+
+class ApiView(View):
+    """
+    Read-only async JSON endpoint. Subclasses implement ``get_data`` and
+    return a dict; the ORM is used through its async API only (``aget``,
+    ``acount``, ``aiterator``, ``async for``) so requests served by an ASGI
+    server do not hold a worker thread while waiting on the database.
+    """
+
+    http_method_names = ['get']
+    employer_only = True
+
+    async def get(self, request, *args, **kwargs):
+        account = await aget_account(request)
+        if account is None:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+        if self.employer_only and not account.is_employer:
+            return JsonResponse({'error': 'Only employers can use this endpoint.'}, status=403)
+
+        try:
+            data = await self.get_data(request, account, **kwargs)
+        except ObjectDoesNotExist:
+            return JsonResponse({'error': 'Not found.'}, status=404)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse(data)
+
+    async def get_data(self, request, account: Account, **kwargs) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def get_int(self, name: str, default: int, minimum: int = 1, maximum: int = MAX_PAGE_SIZE) -> int:
+        value = self.request.GET.get(name, '')
+        if not value:
+            return default
+        if not value.isdigit():
+            raise ValueError(f'{name} must be a positive integer.')
+        return max(minimum, min(int(value), maximum))
+
+
+def employee_data(document: EmployeeDocument) -> dict[str, Any]:
+    data = {
+        'id': document.pk,
+        'username': document.username,
+        'first_name': document.first_name,
+        'last_name': document.last_name,
+        'email': document.email,
+        'city': document.city,
+        'is_active': document.is_active,
+        'belbin_test_result': document.belbin_test_result,
+        'competences': document.competence_ids,
+    }
+    if hasattr(document, 'free'):
+        data['free'] = document.free
+    return data
+
+
+class EmployeeListApi(EmployeeDirectoryMixin, ApiView):
+
+    async def get_data(self, request, account, **kwargs):
+        per_page = self.get_int('per_page', DEFAULT_PAGE_SIZE)
+        queryset = directory_queryset(cursor=request.GET.get('cursor'), **self.get_directory_filters())
+        page = directory_page([e async for e in queryset[:per_page + 1]], per_page)
+
+        return {
+            'employees': [employee_data(e) for e in page.employees],
+            'next_cursor': page.next_cursor,
+        }
+
+
+class EmployeeDetailApi(ApiView):
+    model = EmployeeDocument
+
+    async def get_data(self, request, account, pk, **kwargs):
+        return employee_data(await EmployeeDocument.objects.aget(pk=pk))
+
+
+def project_data(project: Project) -> dict[str, Any]:
+    return {
+        'id': project.pk,
+        'code': project.code,
+        'title': project.title,
+        'description': project.description,
+        'competences': [c.pk for c in project.competences.all()],
+        'employees': [e.pk for e in project.employees.all()],
+        'required_count': project.required_count,
+        'covered_count': project.covered_count,
+        'employee_count': project.employee_count,
+        'coverage': project.coverage,
+    }
+
+
+class ProjectApiMixin:
+    model = Project
+
+    async def get_projects(self, account):
+        employer = await Employer.objects.only('pk').aget(account=account)
+        queryset = Project.objects.filter(employer=employer).prefetch_related(
+            Prefetch('competences', queryset=Competence.objects.only('pk').order_by()),
+            Prefetch('employees', queryset=Employee.objects.only('pk').order_by()),
+        )
+        return annotate_staffing(queryset)
+
+
+class ProjectListApi(ProjectApiMixin, ApiView):
+
+    async def get_data(self, request, account, **kwargs):
+        page = self.get_int('page', 1, maximum=10 ** 9)
+        per_page = self.get_int('per_page', DEFAULT_PAGE_SIZE)
+        projects = await self.get_projects(account)
+        offset = (page - 1) * per_page
+
+        return {
+            'count': await projects.acount(),
+            'page': page,
+            'projects': [project_data(p) async for p in projects.order_by('code')[offset:offset + per_page]],
+        }
+
+
+class ProjectDetailApi(ProjectApiMixin, ApiView):
+
+    async def get_data(self, request, account, pk, **kwargs):
+        projects = await self.get_projects(account)
+        return project_data(await projects.aget(pk=pk))
+
+
+class CompetenceGroupApi(ApiView):
+    employer_only = False
+
+    async def get_data(self, request, account, **kwargs):
+        groups = Group.objects.prefetch_related(
+            Prefetch('competence_group', queryset=Competence.objects.order_by('name'))
+        )
+
+        return {
+            'groups': [
+                {
+                    'id': group.pk,
+                    'name': group.name,
+                    'active': bool(group.status),
+                    'competences': [
+                        {'id': c.pk, 'name': c.name, 'active': bool(c.status)}
+                        for c in group.competence_group.all()
+                    ],
+                }
+                async for group in groups.aiterator(chunk_size=500)
+            ],
+        }
+
+
+class BelbinResultApi(ApiView):
+    """
+    Latest Belbin submission per employee, ordered by pk and paged with
+    ``after=<last pk>``. Employees only see their own results.
+    """
+
+    employer_only = False
+
+    async def get_data(self, request, account, **kwargs):
+        per_page = self.get_int('per_page', DEFAULT_PAGE_SIZE)
+        after = self.get_int('after', 0, minimum=0, maximum=2 ** 62)
+
+        submissions = BelbinSubmission.objects.latest_per_employee() \
+            .select_related('employee').defer('raw_answers') \
+            .filter(pk__gt=after).order_by('pk')
+        if not account.is_employer:
+            submissions = submissions.filter(employee__account=account)
+        if request.GET.get('employee', '').isdigit():
+            submissions = submissions.filter(employee_id=int(request.GET['employee']))
+
+        results = [
+            {
+                'id': s.pk,
+                'employee': s.employee_id,
+                'created': s.created.isoformat(),
+                'result': s.employee.belbin_test_result,
+                'scores': {role: getattr(s, ROLE_FIELDS[role]) for role in ROLES},
+            }
+            async for s in submissions[:per_page]
+        ]
+
+        return {
+            'results': results,
+            'next_after': results[-1]['id'] if len(results) == per_page else None,
+        }
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
+
+    def ready(self):
+        from my_hepi_staff import db
+        from . import checks, signals  # noqa: F401
+
+        db.connect()
@@ -0,0 +1,95 @@
+from datetime import date
+from typing import Iterable, Optional
+
+from django.db.models import OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Assignment, Employee
+
+
+FULL_TIME = 100
+DEFAULT_MIN_FREE = 50
+
+
+def overlapping(queryset, start: date, end: date):
+    """Assignments whose period shares at least one day with ``start``..``end``, open ends included."""
+    return queryset.filter(Q(end_date__gte=start) | Q(end_date__isnull=True),
+                           Q(start_date__lte=end) | Q(start_date__isnull=True))
+
+
+def _assignments(employee, start: date, end: date, exclude_project: Optional[int] = None):
+    assignments = overlapping(Assignment.objects.filter(employee_id=employee), start, end)
+    if exclude_project is not None:
+        assignments = assignments.exclude(project_id=exclude_project)
+    return assignments
+
+
+def booked(start: date, end: date, exclude_project: Optional[int] = None):
+    """
+    Expression for the allocation of the outer employee on the busiest day of
+    ``start``..``end``, so assignments that follow each other are not added
+    up. The load only rises where an assignment starts, so the days tried are
+    the start of each overlapping assignment, or ``start`` for those begun
+    before it; each is a correlated sum over the assignment period index.
+    """
+    first_day = Value(start)
+    days = _assignments(OuterRef('pk'), start, end, exclude_project) \
+        .annotate(day=Greatest(Coalesce('start_date', first_day), first_day))
+    running = _assignments(OuterRef(OuterRef('pk')), start, end, exclude_project) \
+        .filter(Q(start_date__lte=OuterRef('day')) | Q(start_date__isnull=True),
+                Q(end_date__gte=OuterRef('day')) | Q(end_date__isnull=True))
+    load = running.order_by().values('employee_id').annotate(total=Sum('allocation')).values('total')
+    peak = days.annotate(load=Subquery(load)).order_by('-load').values('load')[:1]
+    return Coalesce(Subquery(peak), Value(0))
+
+
+def annotate_availability(queryset, start: date, end: date, exclude_project: Optional[int] = None):
+    """Annotate employees with ``free``, the percent of full time left on the busiest day of ``start``..``end``."""
+    return queryset.annotate(free=Value(FULL_TIME) - booked(start, end, exclude_project=exclude_project))
+
+
+def available_employees(start: date,
+                        end: date,
+                        min_free: int = DEFAULT_MIN_FREE,
+                        competences: Iterable[int] = (),
+                        queryset=None,
+                        exclude_project: Optional[int] = None):
+    """
+    Active employees with at least ``min_free`` percent of full time free over
+    ``start``..``end`` and every competence in ``competences``, as one query:
+    the competences are joined through their covering index and the booked
+    time is ``booked()``, the peak of the overlapping assignments.
+    """
+    if start > end:
+        raise ValueError('The period must not end before it starts.')
+
+    # also on the querysets of callers, the directory passes employee documents
+    queryset = (Employee.objects.all() if queryset is None else queryset).filter(is_active=True)
+    for competence_id in set(competences):
+        # one join per competence, so the planner can start from the rarest one
+        queryset = queryset.filter(competences=competence_id)
+    return annotate_availability(queryset, start, end, exclude_project=exclude_project) \
+        .filter(free__gte=min_free)
+
+
+def busy_employee_ids(start: date, end: date, allocation: int = FULL_TIME,
+                      exclude_project: Optional[int] = None) -> list[int]:
+    """Employees who cannot take on another ``allocation`` percent on some day of ``start``..``end``."""
+    assigned = overlapping(Assignment.objects.all(), start, end).values('employee_id')
+    return list(Employee.objects.filter(pk__in=assigned)
+                .annotate(peak=booked(start, end, exclude_project=exclude_project))
+                .filter(peak__gt=FULL_TIME - allocation).values_list('pk', flat=True))
+
+
+def parse_period(start: Optional[str], end: Optional[str] = None) -> Optional[tuple[date, date]]:
+    """
+    ``(start, end)`` from ISO dates, ``None`` without a start. A missing end
+    means the period is open-ended.
+    """
+    if not start:
+        return None
+    start_date = date.fromisoformat(start)
+    end_date = date.fromisoformat(end) if end else date.max
+    if start_date > end_date:
+        raise ValueError('The period must not end before it starts.')
+    return start_date, end_date
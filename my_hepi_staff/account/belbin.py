@@ -0,0 +1,144 @@
+from typing import Any, Sequence
+
+
+GROUPS = 7
+QUESTIONS_PER_GROUP = 8
+ANSWERS = GROUPS * QUESTIONS_PER_GROUP
+# points to share between the questions of a group
+POINTS_PER_GROUP = 10
+
+# [group, question] pairs (1-based) that add up to each team role
+ROLE_MAPPING = [
+    {'name': 'PO', 'mapping': [[1, 7], [2, 1], [3, 8], [4, 4], [5, 2], [6, 6], [7, 5]]},
+    {'name': 'NL', 'mapping': [[1, 4], [2, 2], [3, 1], [4, 8], [5, 6], [6, 3], [7, 7]]},
+    {'name': 'CZA', 'mapping': [[1, 6], [2, 5], [3, 3], [4, 2], [5, 4], [6, 7], [7, 1]]},
+    {'name': 'SIE', 'mapping': [[1, 3], [2, 7], [3, 4], [4, 5], [5, 8], [6, 1], [7, 6]]},
+    {'name': 'CZK', 'mapping': [[1, 1], [2, 3], [3, 6], [4, 7], [5, 5], [6, 8], [7, 4]]},
+    {'name': 'SĘ', 'mapping': [[1, 8], [2, 4], [3, 7], [4, 3], [5, 1], [6, 5], [7, 2]]},
+    {'name': 'CZG', 'mapping': [[1, 2], [2, 6], [3, 5], [4, 1], [5, 3], [6, 5], [7, 8]]},
+    {'name': 'PER', 'mapping': [[1, 5], [2, 8], [3, 2], [4, 6], [5, 7], [6, 4], [7, 3]]},
+]
+
+ROLES = [role['name'] for role in ROLE_MAPPING]
+
+SCORE_RANGES = {
+    'PO': {'sredni': (9, 13), 'wysoki': (14, 18), 'bardzo wysoki': (19, float('inf'))},
+    'NL': {'sredni': (5, 8), 'wysoki': (9, 12), 'bardzo wysoki': (13, float('inf'))},
+    'CZA': {'sredni': (10, 14), 'wysoki': (15, 20), 'bardzo wysoki': (21, float('inf'))},
+    'SIE': {'sredni': (4, 7), 'wysoki': (8, 11), 'bardzo wysoki': (12, float('inf'))},
+    'CZK': {'sredni': (6, 9), 'wysoki': (10, 13), 'bardzo wysoki': (14, float('inf'))},
+    'SĘ': {'sredni': (7, 11), 'wysoki': (12, 16), 'bardzo wysoki': (17, float('inf'))},
+    'CZG': {'sredni': (5, 10), 'wysoki': (11, 15), 'bardzo wysoki': (16, float('inf'))},
+    'PER': {'sredni': (8, 13), 'wysoki': (14, 19), 'bardzo wysoki': (20, float('inf'))},
+}
+
+LEVEL_MARKS = {'sredni': '', 'wysoki': '^', 'bardzo wysoki': '*'}
+
+ROLE_BITS = {role: 1 << i for i, role in enumerate(ROLES)}
+
+
+def answer_index(group: int, question: int) -> int:
+    return (group - 1) * QUESTIONS_PER_GROUP + (question - 1)
+
+
+def answer_field(index: int) -> str:
+    group, question = divmod(index, QUESTIONS_PER_GROUP)
+    return f'group_{group + 1}_question_{question + 1}'
+
+
+def answers_from_form(cleaned_data: dict[str, Any]) -> list[int]:
+    """Flatten GroupedTableForm data into the 56 answers in group/question order."""
+    return [cleaned_data[answer_field(i)] for i in range(ANSWERS)]
+
+
+def parse_result(text: str) -> dict[str, str]:
+    """Invert ``BelbinScorer.format``: ``"PO^, CZA*"`` -> ``{'PO': 'wysoki', 'CZA': 'bardzo wysoki'}``."""
+    marks = {mark: level for level, mark in LEVEL_MARKS.items()}
+    result = {}
+    for token in (text or '').split(','):
+        token = token.strip()
+        mark = token[-1:] if token[-1:] in ('^', '*') else ''
+        role = token[:-1] if mark else token
+        if role in ROLE_BITS:
+            result[role] = marks[mark]
+    return result
+
+
+def role_mask(text: str, levels=('wysoki', 'bardzo wysoki')) -> int:
+    """Bitmask (see ``ROLE_BITS``) of the roles scored at one of ``levels``."""
+    mask = 0
+    for role, level in parse_result(text).items():
+        if level in levels:
+            mask |= ROLE_BITS[role]
+    return mask
+
+
+def roles_from_mask(mask: int) -> list[str]:
+    return [role for role, bit in ROLE_BITS.items() if mask & bit]
+
+
+class BelbinScorer:
+    """
+    Stateless Belbin scoring.
+
+    ``weights`` is the 8x56 role-by-answer matrix built once from the mapping;
+    scoring a submission is a product of that matrix with the answer vector.
+    The matrix is mostly zeros, so each row is evaluated through the indices
+    of its non-zero columns. ``score_batch`` computes the same product for a
+    whole answer matrix at once: it transposes the submissions so each answer
+    is one column, and a role score is the sum of its weighted columns.
+    """
+
+    def __init__(self, mapping: list[dict] = ROLE_MAPPING, score_ranges: dict = SCORE_RANGES):
+        self.roles = [role['name'] for role in mapping]
+        self.score_ranges = score_ranges
+        self.weights = [[0] * ANSWERS for _ in mapping]
+
+        for row, role in zip(self.weights, mapping):
+            for group, question in role['mapping']:
+                row[answer_index(group, question)] += 1
+
+        self._columns = [[(i, w) for i, w in enumerate(row) if w] for row in self.weights]
+
+    def score(self, answers: Sequence[int]) -> list[int]:
+        if len(answers) != ANSWERS:
+            raise ValueError(f'Expected {ANSWERS} answers, got {len(answers)}.')
+        return [sum(answers[i] * w for i, w in columns) for columns in self._columns]
+
+    def score_batch(self, submissions: Sequence[Sequence[int]]) -> list[list[int]]:
+        for answers in submissions:
+            if len(answers) != ANSWERS:
+                raise ValueError(f'Expected {ANSWERS} answers, got {len(answers)}.')
+        if not submissions:
+            return []
+
+        columns = list(zip(*submissions))
+        role_scores = []
+        for row in self._columns:
+            terms = [columns[i] if w == 1 else [value * w for value in columns[i]] for i, w in row]
+            role_scores.append(map(sum, zip(*terms)))
+        return [list(scores) for scores in zip(*role_scores)]
+
+    def level(self, role: str, score: int) -> str:
+        for level_name, (low, high) in self.score_ranges[role].items():
+            if low <= score <= high:
+                return level_name
+        return ''
+
+    def levels(self, scores: Sequence[int]) -> list[tuple[str, str]]:
+        result = []
+        for role, score in zip(self.roles, scores):
+            level = self.level(role, score)
+            if level:
+                result.append((role, level))
+        return result
+
+    def format(self, scores: Sequence[int]) -> str:
+        """``Employee.belbin_test_result`` text, e.g. ``"PO^, CZA*"``."""
+        return ', '.join(f"{role}{LEVEL_MARKS.get(level, '')}" for role, level in self.levels(scores))
+
+    def result(self, answers: Sequence[int]) -> str:
+        return self.format(self.score(answers))
+
+
+scorer = BelbinScorer()
@@ -0,0 +1,112 @@
+import random
+import statistics
+import time
+from typing import Callable
+
+from django.template.loader import render_to_string
+from django.test import Client
+from django.test.utils import override_settings
+
+from competence.models import Competence
+from . import profiling
+from .belbin import ANSWERS, answer_field, role_mask, scorer
+from .forms import CompetenceEnrollForm, GroupedTableForm, ProjectForm
+from .models import Employee
+from .views import EmployeeBelbinTest
+
+
+def timings(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Best and median wall time of ``repeat`` calls, after one warm-up call."""
+    fn()
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - started) * 1000)
+    return {'min_ms': min(runs), 'median_ms': statistics.median(runs)}
+
+
+def bench_views(repeat: int) -> list[dict]:
+    """Every GET-able URL of ``account.urls`` as an employer and as an employee."""
+    users, samples = profiling.personas()
+    results = []
+
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        for persona, user in users.items():
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+
+            for name, path in profiling.view_requests('account.urls', samples, skip=profiling.skip_view):
+                client.get(path)
+                runs = []
+                for _ in range(repeat):
+                    with profiling.profile(name, path=path) as result:
+                        response = client.get(path)
+                    result.status = response.status_code
+                    runs.append(result)
+
+                totals = [r.total_ms for r in runs]
+                best = min(runs, key=lambda r: r.total_ms)
+                results.append({
+                    'name': f'{persona}:{name}',
+                    'status': best.status,
+                    'queries': best.queries,
+                    'min_ms': best.total_ms,
+                    'median_ms': statistics.median(totals),
+                    'sql_ms': best.sql_ms,
+                    'template_ms': best.template_ms,
+                })
+    return results
+
+
+def bench_forms(repeat: int) -> list[dict]:
+    competences = list(Competence.objects.values_list('pk', flat=True)[:5])
+    employees = list(Employee.objects.values_list('pk', flat=True)[:5])
+    project_data = {'code': 'BENCHMARK-1', 'title': 'Benchmark', 'description': '',
+                    'competences': competences, 'employees': employees}
+    answers = {answer_field(i): 10 if i % 8 == 0 else 0 for i in range(ANSWERS)}
+    questions = EmployeeBelbinTest.questions
+
+    cases = {
+        'ProjectForm.render': lambda: str(ProjectForm()),
+        'ProjectForm.validate': lambda: ProjectForm(data=project_data).is_valid(),
+        'CompetenceEnrollForm.render': lambda: str(CompetenceEnrollForm()),
+        'CompetenceEnrollForm.validate': lambda: CompetenceEnrollForm(data={'competence': competences}).is_valid(),
+        'GroupedTableForm.validate': lambda: GroupedTableForm(answers, grouped_questions=questions).is_valid(),
+        'GroupedTableForm.render': lambda: render_to_string(EmployeeBelbinTest.questions_template_name, {
+            'form': GroupedTableForm(grouped_questions=questions),
+        }),
+    }
+    return [{'name': name, **timings(fn, repeat)} for name, fn in cases.items()]
+
+
+def bench_scoring(repeat: int, submissions: int = 1000) -> list[dict]:
+    rng = random.Random(0)
+    batch = [[rng.randint(0, 3) for _ in range(ANSWERS)] for _ in range(submissions)]
+    scores = scorer.score_batch(batch)
+    results = list(Employee.objects.values_list('belbin_test_result', flat=True)[:submissions])
+
+    cases = {
+        f'score_batch({submissions})': lambda: scorer.score_batch(batch),
+        f'format({submissions})': lambda: [scorer.format(s) for s in scores],
+        f'role_mask({len(results)})': lambda: [role_mask(r) for r in results],
+    }
+    return [{'name': name, **timings(fn, repeat)} for name, fn in cases.items()]
+
+
+def run_suite(repeat: int) -> dict[str, list[dict]]:
+    return {
+        'views': bench_views(repeat),
+        'forms': bench_forms(repeat),
+        'scoring': bench_scoring(repeat),
+    }
+
+
+def flatten(report: dict) -> dict[tuple[str, str, str], float]:
+    """``(scale, section, name) -> median ms`` of a report written by ``manage.py benchmark``."""
+    return {
+        (scale, section, row['name']): row['median_ms']
+        for scale, result in report['scales'].items()
+        for section, rows in result['benchmarks'].items()
+        for row in rows
+    }
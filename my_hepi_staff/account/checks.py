@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+# backends whose data lives in one process, so a version bumped by one worker is never seen by the others
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs=None, **kwargs):
+    """
+    The ``ProcessLocal`` versions and the competence summaries are invalidated
+    through the cache, which only reaches every worker if it is shared.
+    """
+    if getattr(settings, 'ALLOW_PROCESS_LOCAL_CACHE', False):
+        return []
+
+    aliases = {'default', getattr(settings, 'COMPETENCE_SUMMARY_CACHE', 'default')}
+    messages = []
+    for alias in sorted(aliases):
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend not in PROCESS_LOCAL_BACKENDS:
+            continue
+        messages.append(Warning(
+            f'Cache {alias!r} uses {backend.rsplit(".", 1)[-1]}: invalidations made by one process '
+            f'do not reach the others, which keep serving stale data.',
+            hint='Use a shared backend (Redis, Memcached, database) when running more than one process, '
+                 'or set ALLOW_PROCESS_LOCAL_CACHE for a single process.',
+            id='account.W001',
+        ))
+    return messages
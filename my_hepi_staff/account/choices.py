@@ -0,0 +1,189 @@
+from typing import Callable, Iterable, Optional
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.utils import flatatt
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+
+from competence.models import Competence
+from .models import Employee
+from .versioning import ProcessLocal
+
+
+COMPETENCE_CHOICES_KEY = 'account:choices:competences:version'
+EMPLOYEE_CHOICES_KEY = 'account:choices:employees:version'
+
+
+class ChoiceSet:
+    """
+    An immutable list of ``(pk, label)`` choices, optionally grouped as
+    ``[(group, [(pk, label), ...]), ...]``, with the labels by pk, the set of
+    valid pks and pre-rendered widget HTML.
+    """
+
+    def __init__(self, choices: list, grouped: bool = False):
+        self.choices = choices
+        self.grouped = grouped
+        self.labels = {pk: label for _, options in self.groups() for pk, label in options}
+        self.pks = frozenset(self.labels)
+        self._html: dict[tuple, str] = {}
+
+    def groups(self) -> Iterable[tuple[Optional[str], list]]:
+        return self.choices if self.grouped else [(None, self.choices)]
+
+    def html(self, key: tuple, render: Callable[['ChoiceSet'], str]) -> str:
+        # widgets render from the same ChoiceSet for as long as the version holds
+        if key not in self._html:
+            self._html[key] = render(self)
+        return self._html[key]
+
+
+def build_competence_choices() -> ChoiceSet:
+    groups = []
+    rows = Competence.objects.order_by('competence_group__name', 'competence_group_id', 'name') \
+        .values_list('competence_group_id', 'competence_group__name', 'pk', 'name')
+    current = None
+    for group_id, group_name, pk, name in rows:
+        if group_id != current:
+            groups.append((group_name, []))
+            current = group_id
+        groups[-1][1].append((pk, name))
+    return ChoiceSet(groups, grouped=True)
+
+
+def build_employee_choices() -> ChoiceSet:
+    rows = Employee.objects.order_by('account__user__last_name', 'account__user__first_name', 'pk') \
+        .values_list('pk', 'account__user__first_name', 'account__user__last_name')
+    return ChoiceSet([(pk, f'{first_name} {last_name}') for pk, first_name, last_name in rows])
+
+
+_competence_choices = ProcessLocal(COMPETENCE_CHOICES_KEY, build_competence_choices)
+_employee_choices = ProcessLocal(EMPLOYEE_CHOICES_KEY, build_employee_choices)
+
+
+def competence_choices() -> ChoiceSet:
+    return _competence_choices.get()
+
+
+def employee_choices() -> ChoiceSet:
+    return _employee_choices.get()
+
+
+def invalidate_competence_choices() -> None:
+    _competence_choices.invalidate()
+
+
+def invalidate_employee_choices() -> None:
+    _employee_choices.invalidate()
+
+
+class CachedSelectMultiple(forms.SelectMultiple):
+    """
+    ``<select multiple>`` rendered from a cached ``ChoiceSet``: the options are
+    rendered once per catalog version and only the selected ones are patched
+    in per request, instead of running a template for every option.
+    """
+
+    provider: Callable[[], ChoiceSet] = None
+
+    @staticmethod
+    def render_options(choice_set: ChoiceSet) -> str:
+        parts = []
+        for group, options in choice_set.groups():
+            if group is not None:
+                parts.append(format_html('<optgroup label="{}">', group))
+            parts.extend(f'<option value="{pk}">{escape(label)}</option>' for pk, label in options)
+            if group is not None:
+                parts.append('</optgroup>')
+        return ''.join(parts)
+
+    def render(self, name, value, attrs=None, renderer=None):
+        html = self.provider().html(('select',), self.render_options)
+        for selected in self.format_value(value):
+            html = html.replace(f'<option value="{selected}">', f'<option value="{selected}" selected>', 1)
+
+        final_attrs = self.build_attrs(self.attrs, attrs)
+        return mark_safe(format_html('<select name="{}" multiple{}>', name, flatatt(final_attrs)) + html + '</select>')
+
+
+class CachedCheckboxSelectMultiple(CachedSelectMultiple):
+    """Grouped checkboxes rendered the same way as ``CachedSelectMultiple``."""
+
+    @staticmethod
+    def render_checkboxes(name: str, id_: str) -> Callable[[ChoiceSet], str]:
+        def render(choice_set: ChoiceSet) -> str:
+            parts = []
+            for group, options in choice_set.groups():
+                if group is not None:
+                    parts.append(format_html('<div><label>{}</label>', group))
+                for pk, label in options:
+                    parts.append(
+                        f'<div><label for="{id_}_{pk}"><input type="checkbox" name="{escape(name)}" '
+                        f'value="{pk}" id="{id_}_{pk}"> {escape(label)}</label></div>'
+                    )
+                if group is not None:
+                    parts.append('</div>')
+            return ''.join(parts)
+        return render
+
+    def render(self, name, value, attrs=None, renderer=None):
+        final_attrs = self.build_attrs(self.attrs, attrs)
+        id_ = escape(final_attrs.pop('id', f'id_{name}'))
+        final_attrs.pop('required', None)
+
+        html = self.provider().html(('checkbox', name, id_), self.render_checkboxes(name, id_))
+        for selected in self.format_value(value):
+            html = html.replace(f'value="{selected}" id=', f'value="{selected}" checked id=', 1)
+
+        return mark_safe(format_html('<div id="{}"{}>', id_, flatatt(final_attrs)) + html + '</div>')
+
+    def id_for_label(self, id_, index=None):
+        return ''
+
+
+class CachedMultipleChoiceField(forms.MultipleChoiceField):
+    """
+    Multiple choice of pks from a cached ``ChoiceSet``. Submitted values are
+    checked against the cached pk set, so validation does not query the
+    database, and ``cleaned_data`` holds pks rather than model instances.
+    """
+
+    widget = CachedSelectMultiple
+
+    def __init__(self, provider: Callable[[], ChoiceSet], **kwargs):
+        self.provider = provider
+        super().__init__(choices=lambda: provider().choices, **kwargs)
+        self.widget.provider = provider
+
+    def prepare_value(self, value):
+        if value is None:
+            return []
+        if isinstance(value, str) or not hasattr(value, '__iter__'):
+            value = [value]
+        return [getattr(v, 'pk', v) for v in value]
+
+    def has_changed(self, initial, data) -> bool:
+        return {str(v) for v in self.prepare_value(initial)} != {str(v) for v in self.prepare_value(data)}
+
+    def to_python(self, value) -> list[int]:
+        if not value:
+            return []
+        if not isinstance(value, (list, tuple)):
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        try:
+            return [int(getattr(v, 'pk', v)) for v in value]
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+
+    def validate(self, value: list[int]) -> None:
+        if self.required and not value:
+            raise ValidationError(self.error_messages['required'], code='required')
+        pks = self.provider().pks
+        for pk in value:
+            if pk not in pks:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': pk},
+                )
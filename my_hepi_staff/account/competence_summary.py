@@ -0,0 +1,90 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from competence.models import Competence
+
+
+CATALOG_VERSION_KEY = 'account:competence-catalog:version'
+SUMMARY_KEY = 'account:competence-summary:{version}:{employee_id}'
+# bumped whenever an employee's competences change, for template fragment keys
+COMPETENCES_VERSION_KEY = 'account:competences:{employee_id}:version'
+HITS_KEY = 'account:competence-summary:hits'
+MISSES_KEY = 'account:competence-summary:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'COMPETENCE_SUMMARY_CACHE', 'default')]
+
+
+def _incr(cache, key: str) -> None:
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def catalog_version() -> int:
+    return get_cache().get_or_set(CATALOG_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def bump_catalog_version() -> None:
+    cache = get_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def competences_version(employee_id: int) -> int:
+    return get_cache().get_or_set(COMPETENCES_VERSION_KEY.format(employee_id=employee_id), time.time_ns,
+                                  timeout=None)
+
+
+def build_competence_summary(employee_id: int) -> dict[str, list[str]]:
+    rows = Competence.objects.filter(competence_joined=employee_id) \
+        .order_by('competence_group__name', 'name') \
+        .values_list('competence_group__name', 'name')
+
+    result = {}
+    for group_name, name in rows:
+        result.setdefault(group_name, []).append(name)
+
+    return result
+
+
+def get_competence_summary(employee_id: int) -> dict[str, list[str]]:
+    """
+    Competence names of an employee grouped by competence group name.
+
+    Summaries are keyed by the catalog version, so renaming a group or a
+    competence invalidates every cached summary at once. They also expire
+    after ``COMPETENCE_SUMMARY_TIMEOUT`` seconds, the staleness bound when
+    the invalidation happened in a process that does not share the cache.
+    """
+    cache = get_cache()
+    key = SUMMARY_KEY.format(version=catalog_version(), employee_id=employee_id)
+    summary = cache.get(key)
+
+    if summary is None:
+        _incr(cache, MISSES_KEY)
+        summary = build_competence_summary(employee_id)
+        cache.set(key, summary, timeout=getattr(settings, 'COMPETENCE_SUMMARY_TIMEOUT', 300))
+    else:
+        _incr(cache, HITS_KEY)
+
+    return summary
+
+
+def invalidate_competence_summary(*employee_ids: int) -> None:
+    version = catalog_version()
+    # a deleted version is recreated from the clock, so it never repeats an old one
+    get_cache().delete_many([SUMMARY_KEY.format(version=version, employee_id=pk) for pk in employee_ids] +
+                            [COMPETENCES_VERSION_KEY.format(employee_id=pk) for pk in employee_ids])
+
+
+def summary_stats() -> dict[str, int]:
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {'hits': values.get(HITS_KEY, 0), 'misses': values.get(MISSES_KEY, 0)}
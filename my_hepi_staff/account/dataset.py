@@ -0,0 +1,222 @@
+import random
+from bisect import bisect
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterator, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from .belbin import GROUPS, QUESTIONS_PER_GROUP, scorer
+from .importer import DEFAULT_BATCH_SIZE, StaffImporter
+from .models import BelbinSubmission, Employee
+
+
+# competence groups with their most common competences; larger catalogs add numbered ones
+CATALOG = {
+    'Python': ['Django', 'Flask', 'FastAPI', 'pandas', 'NumPy', 'Celery', 'pytest', 'SQLAlchemy'],
+    'JavaScript': ['React', 'React Native', 'Type Script', 'Node.js', 'Vue', 'Angular', 'Next.js', 'Jest'],
+    '.Net': ['C#', 'EF', 'EF Core', 'Dapper', 'ASP.NET Core', 'Blazor', 'LINQ', 'xUnit'],
+    'PHP': ['Laravel', 'Symfony', 'xDebug', 'Composer', 'WordPress', 'PHPUnit'],
+    'Java': ['Spring', 'Hibernate', 'Maven', 'Gradle', 'JUnit', 'Kotlin'],
+    'DevOps': ['Docker', 'Kubernetes', 'Terraform', 'Ansible', 'GitLab CI', 'Prometheus'],
+    'Cloud': ['AWS', 'Azure', 'GCP', 'Lambda', 'S3', 'CloudFormation'],
+    'Data': ['SQL', 'PostgreSQL', 'Spark', 'Airflow', 'dbt', 'Power BI'],
+    'Mobile': ['Swift', 'Android', 'Flutter', 'Xamarin'],
+    'QA': ['Selenium', 'Cypress', 'Playwright', 'Postman'],
+    'Design': ['Figma', 'UX research', 'Accessibility'],
+    'Management': ['Scrum', 'Kanban', 'Jira', 'Budgeting'],
+}
+
+FIRST_NAMES = ['Jan', 'Anna', 'Piotr', 'Katarzyna', 'Tomasz', 'Małgorzata', 'Paweł', 'Agnieszka', 'Michał',
+               'Ewa', 'Krzysztof', 'Magdalena', 'Łukasz', 'Joanna', 'Marcin', 'Aleksandra', 'Grzegorz',
+               'Zofia', 'Jakub', 'Natalia', 'Mateusz', 'Karolina', 'Adam', 'Weronika', 'Wojciech', 'Julia']
+LAST_NAMES = ['Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk', 'Kamiński', 'Lewandowski',
+              'Zieliński', 'Szymański', 'Woźniak', 'Dąbrowski', 'Kozłowski', 'Jankowski', 'Mazur',
+              'Kwiatkowski', 'Krawczyk', 'Piotrowski', 'Grabowski', 'Nowakowski', 'Pawłowski', 'Michalski',
+              'Nowicki', 'Adamczyk', 'Dudek', 'Zając', 'Wieczorek', 'Jabłoński', 'Król', 'Majewski',
+              'Olszewski', 'Jaworski', 'Wróbel', 'Malinowski', 'Pawlak', 'Witkowski', 'Walczak', 'Stępień',
+              'Górski', 'Rutkowski', 'Michalak', 'Sikora', 'Ostrowski', 'Baran', 'Duda', 'Szewczyk']
+CITIES = ['Warszawa', 'Kraków', 'Wrocław', 'Łódź', 'Poznań', 'Gdańsk', 'Szczecin', 'Bydgoszcz', 'Lublin',
+          'Białystok', 'Katowice', 'Gdynia', 'Częstochowa', 'Radom', 'Rzeszów', 'Toruń', 'Kielce',
+          'Gliwice', 'Olsztyn', 'Opole']
+
+USERNAME_PREFIX = 'gen-'
+
+
+@dataclass
+class Scale:
+    employers: int
+    employees: int
+    projects: int
+    # extra numbered competences per group on top of CATALOG
+    competences_per_group: int = 0
+
+
+SCALES = {
+    '1k': Scale(employers=10, employees=1_000, projects=200),
+    '10k': Scale(employers=50, employees=10_000, projects=2_000, competences_per_group=20),
+    '100k': Scale(employers=200, employees=100_000, projects=20_000, competences_per_group=80),
+}
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    """Cumulative weights where the i-th item is picked about 1 / i**s as often as the first."""
+    return list(accumulate(1 / (i + 1) ** s for i in range(n)))
+
+
+class Picker:
+    """Weighted sampling without replacement from a fixed list, weights precomputed once."""
+
+    def __init__(self, items: list, cumulative: list[float], rng: random.Random):
+        self.items = items
+        self.cumulative = cumulative
+        self.rng = rng
+
+    def pick(self):
+        return self.items[bisect(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+    def sample(self, k: int) -> list:
+        k = min(k, len(self.items))
+        chosen = {}
+        while len(chosen) < k:
+            item = self.pick()
+            chosen[item] = None
+        return list(chosen)
+
+
+class DatasetGenerator:
+    """
+    Synthetic staff data at a given ``Scale``, loaded through ``StaffImporter``
+    so it takes the same bulk-insert path as real imports. Competences and
+    groups follow a Zipf distribution: each employee has one or two main
+    groups and mostly the popular competences in them, and projects are
+    staffed with employees who have at least one required competence.
+    """
+
+    def __init__(self, scale: Scale, seed: int = 0, belbin_ratio: float = 0.7,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.belbin_ratio = belbin_ratio
+        self.batch_size = batch_size
+
+        self.catalog = {
+            group: names + [f'{group} {i + 1}' for i in range(scale.competences_per_group)]
+            for group, names in CATALOG.items()
+        }
+        groups = list(self.catalog)
+        self.groups = Picker(groups, zipf_weights(len(groups), s=0.8), self.rng)
+        self.competences = {
+            group: Picker([f'{group}/{name}' for name in names], zipf_weights(len(names)), self.rng)
+            for group, names in self.catalog.items()
+        }
+        self.cities = Picker(CITIES, zipf_weights(len(CITIES), s=0.9), self.rng)
+        # competence -> usernames of employees who have it, for staffing projects
+        self.holders: dict[str, list[str]] = {}
+
+    def username(self, kind: str, n: int) -> str:
+        return f'{USERNAME_PREFIX}{kind}{n:06d}'
+
+    def person(self, kind: str, n: int) -> dict:
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        username = self.username(kind, n)
+        return {
+            'username': username,
+            'email': f'{username}@example.com',
+            'first_name': first_name,
+            'last_name': last_name,
+            'address': f'ul. {self.rng.choice(LAST_NAMES)}a {self.rng.randint(1, 200)}',
+            'post_code': f'{self.rng.randint(0, 99):02d}-{self.rng.randint(0, 999):03d}',
+            'city': self.cities.pick(),
+        }
+
+    def competence_records(self) -> Iterator[dict]:
+        for group, names in self.catalog.items():
+            for name in names:
+                yield {'group': group, 'name': name}
+
+    def employer_records(self) -> Iterator[dict]:
+        for n in range(self.scale.employers):
+            yield {**self.person('employer', n), 'company_name': f'Firma {n + 1:04d} Sp. z o.o.'}
+
+    def employee_records(self) -> Iterator[dict]:
+        for n in range(self.scale.employees):
+            record = self.person('employee', n)
+            main_groups = self.groups.sample(1 if self.rng.random() < 0.6 else 2)
+            competences = []
+            for group in main_groups:
+                competences += self.competences[group].sample(self.rng.randint(2, 8))
+            for competence in competences:
+                self.holders.setdefault(competence, []).append(record['username'])
+
+            record['competences'] = competences
+            record['description'] = (f"{record['city']}, {', '.join(c.split('/')[1] for c in competences[:3])}"
+                                     if self.rng.random() < 0.5 else '')
+            yield record
+
+    def project_records(self) -> Iterator[dict]:
+        for n in range(self.scale.projects):
+            group = self.groups.pick()
+            competences = self.competences[group].sample(self.rng.randint(1, 5))
+            employees = set()
+            for competence in competences:
+                holders = self.holders.get(competence, [])
+                for _ in range(min(len(holders), self.rng.randint(0, 3))):
+                    employees.add(self.rng.choice(holders))
+            yield {
+                'code': f'GEN-{n + 1:06d}',
+                'title': f'{group} project {n + 1}',
+                'description': '',
+                'employer': f'Firma {self.rng.randrange(self.scale.employers) + 1:04d} Sp. z o.o.',
+                'competences': competences,
+                'employees': sorted(employees),
+            }
+
+    def answers(self) -> list[int]:
+        """One Belbin submission: each group's 10 points spread over its questions."""
+        answers = []
+        for _ in range(GROUPS):
+            row = [0] * QUESTIONS_PER_GROUP
+            for _ in range(10):
+                row[self.rng.randrange(QUESTIONS_PER_GROUP)] += 1
+            answers += row
+        return answers
+
+    def generate_belbin(self) -> Iterator[int]:
+        """Submit the Belbin test for ``belbin_ratio`` of the generated employees; yields batch sizes."""
+        employees = Employee.objects.filter(account__user__username__startswith=USERNAME_PREFIX) \
+            .only('pk').order_by('pk')
+        batch = []
+        for employee in employees.iterator(chunk_size=self.batch_size):
+            if self.rng.random() >= self.belbin_ratio:
+                continue
+            answers = self.answers()
+            submission = BelbinSubmission(employee_id=employee.pk)
+            submission.answers = answers
+            submission.scores = scorer.score(answers)
+            employee.belbin_test_result = scorer.format(submission.scores)
+            batch.append((employee, submission))
+
+            if len(batch) == self.batch_size:
+                yield self._save_belbin(batch)
+                batch = []
+        if batch:
+            yield self._save_belbin(batch)
+
+    def _save_belbin(self, batch) -> int:
+        BelbinSubmission.objects.bulk_create([submission for _, submission in batch])
+        Employee.objects.bulk_update([employee for employee, _ in batch], ['belbin_test_result'])
+        return len(batch)
+
+    def set_password(self, password: Optional[str]) -> int:
+        """Give every generated user the same password, hashed once."""
+        if not password:
+            return 0
+        return User.objects.filter(username__startswith=USERNAME_PREFIX).update(password=make_password(password))
+
+    def importer(self) -> StaffImporter:
+        # generated records carry no passwords, so there is nothing to hash in parallel
+        return StaffImporter(batch_size=self.batch_size, workers=1)
+
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from django.db.models import F, Q
+
+from .availability import DEFAULT_MIN_FREE, available_employees
+from .belbin import ROLE_BITS
+from .models import Employee, EmployeeDocument
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class DirectoryPage:
+    employees: list[EmployeeDocument]
+    next_cursor: Optional[str]
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(last_name: str, pk: int) -> str:
+    raw = json.dumps([last_name, pk], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        last_name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise ValueError(f'Invalid cursor: {cursor!r}')
+
+    if not isinstance(last_name, str) or not isinstance(pk, int):
+        raise ValueError(f'Invalid cursor: {cursor!r}')
+
+    return last_name, pk
+
+
+def filter_employees(queryset, city=None, role=None, competence=None,
+                     available_from=None, available_to=None, min_free=None):
+    if available_from:
+        queryset = available_employees(available_from, available_to or date.max,
+                                       min_free=DEFAULT_MIN_FREE if min_free is None else min_free,
+                                       queryset=queryset)
+    if city:
+        queryset = queryset.filter(city__iexact=city)
+    if role:
+        bit = ROLE_BITS.get(role)
+        if bit is None:
+            return queryset.none()
+        queryset = queryset.alias(has_role=F('belbin_roles').bitand(bit)).filter(has_role=bit)
+    if competence:
+        # the packed competence ids cannot be searched, this is a semi-join on the covering index
+        holders = Employee.competences.through.objects.filter(competence_id=competence).values('employee_id')
+        queryset = queryset.filter(pk__in=holders)
+    return queryset
+
+
+def directory_queryset(city: Optional[str] = None,
+                       role: Optional[str] = None,
+                       competence: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       available_from: Optional[date] = None,
+                       available_to: Optional[date] = None,
+                       min_free: Optional[int] = None):
+    queryset = EmployeeDocument.objects.order_by('last_name', 'pk')
+    queryset = filter_employees(queryset, city=city, role=role, competence=competence,
+                                available_from=available_from, available_to=available_to, min_free=min_free)
+
+    if cursor:
+        last_name, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(last_name__gt=last_name) | Q(last_name=last_name, pk__gt=pk))
+
+    return queryset
+
+
+def directory_page(employees: list[Employee], per_page: int) -> DirectoryPage:
+    """Build a page from up to ``per_page + 1`` employees, the extra one signalling a next page."""
+    next_cursor = None
+
+    if len(employees) > per_page:
+        employees = employees[:per_page]
+        last = employees[-1]
+        next_cursor = encode_cursor(last.last_name, last.pk)
+
+    return DirectoryPage(employees=employees, next_cursor=next_cursor)
+
+
+def employee_directory(city: Optional[str] = None,
+                       role: Optional[str] = None,
+                       competence: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       per_page: int = DEFAULT_PAGE_SIZE,
+                       available_from: Optional[date] = None,
+                       available_to: Optional[date] = None,
+                       min_free: Optional[int] = None) -> DirectoryPage:
+    """
+    One page of employee documents ordered by ``(last_name, pk)``.
+
+    Pages are addressed by a keyset cursor rather than an offset, so fetching
+    page 1000 costs the same single query, on the document table alone, as
+    fetching page 1. With
+    ``available_from`` (and ``available_to``, open-ended when missing) only
+    active employees with ``min_free`` percent of their time free in that
+    period are listed, annotated with ``free``.
+    """
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+    queryset = directory_queryset(city=city, role=role, competence=competence, cursor=cursor,
+                                  available_from=available_from, available_to=available_to, min_free=min_free)
+    return directory_page(list(queryset[:per_page + 1]), per_page)
@@ -0,0 +1,139 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Count
+
+from .belbin import LEVEL_MARKS, role_mask
+from .models import Assignment, Employee, EmployeeDocument
+
+
+EmployeeCompetence = Employee.competences.through
+
+CHUNK_SIZE = 2000
+# the columns copied from the source tables, compared by document_drift()
+DOCUMENT_FIELDS = ['username', 'first_name', 'last_name', 'email', 'city', 'is_active',
+                   'belbin_test_result', 'belbin_roles', 'raw_competence_ids', 'project_count']
+
+
+def belbin_roles(result: str) -> int:
+    """Bitmask of every role listed in a ``belbin_test_result``, whatever its level."""
+    return role_mask(result, levels=tuple(LEVEL_MARKS))
+
+
+# -- building documents from the source tables --------------------------------------
+
+def _build(employee_ids: list[int]) -> Iterator[EmployeeDocument]:
+    # three queries per chunk: employees with their users, competences, assignment counts
+    rows = Employee.objects.filter(pk__in=employee_ids).order_by('pk').values_list(
+        'pk', 'account__user__username', 'account__user__first_name', 'account__user__last_name',
+        'account__user__email', 'city', 'is_active', 'belbin_test_result')
+
+    competences = {}
+    for employee_id, competence_id in EmployeeCompetence.objects.filter(employee_id__in=employee_ids) \
+            .values_list('employee_id', 'competence_id'):
+        competences.setdefault(employee_id, []).append(competence_id)
+
+    projects = dict(Assignment.objects.filter(employee_id__in=employee_ids).order_by()
+                    .values('employee_id').annotate(n=Count('*')).values_list('employee_id', 'n'))
+
+    for pk, username, first_name, last_name, email, city, is_active, result in rows:
+        document = EmployeeDocument(employee_id=pk, username=username, first_name=first_name,
+                                    last_name=last_name, email=email, city=city, is_active=is_active,
+                                    belbin_test_result=result, belbin_roles=belbin_roles(result),
+                                    project_count=projects.get(pk, 0))
+        document.competence_ids = competences.get(pk, ())
+        yield document
+
+
+def build_documents(employee_ids: Optional[Iterable[int]] = None) -> Iterator[EmployeeDocument]:
+    """Fresh, unsaved documents of ``employee_ids`` (every employee by default), in pk order."""
+    if employee_ids is None:
+        employee_ids = Employee.objects.order_by('pk').values_list('pk', flat=True)
+    employee_ids = sorted(set(employee_ids))
+    for start in range(0, len(employee_ids), CHUNK_SIZE):
+        yield from _build(employee_ids[start:start + CHUNK_SIZE])
+
+
+def _save(documents: list[EmployeeDocument]) -> None:
+    EmployeeDocument.objects.bulk_create(documents, batch_size=500, update_conflicts=True,
+                                         unique_fields=['employee'], update_fields=DOCUMENT_FIELDS)
+
+
+# -- incremental maintenance ---------------------------------------------------------
+
+_deferred = threading.local()
+
+
+def refresh_documents(employee_ids: Iterable[int]) -> None:
+    """
+    Rewrite the documents of ``employee_ids`` from the source tables, in the
+    current transaction; deleted employees lose theirs by cascade. Inside
+    ``deferred()`` the rewrite waits for the block to end.
+    """
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+    pending = getattr(_deferred, 'ids', None)
+    if pending is not None:
+        pending |= employee_ids
+        return
+    _save(list(build_documents(employee_ids)))
+
+
+@contextmanager
+def deferred():
+    """Collect the refreshes signalled in the block and run them once at its end, for bulk writes."""
+    if getattr(_deferred, 'ids', None) is not None:
+        # nested, the outermost block refreshes
+        yield
+        return
+
+    _deferred.ids = set()
+    try:
+        yield
+        employee_ids = _deferred.ids
+    finally:
+        _deferred.ids = None
+    refresh_documents(employee_ids)
+
+
+# -- full rebuild --------------------------------------------------------------------
+
+@transaction.atomic
+def rebuild_documents() -> int:
+    """Rewrite every document and drop the orphans of raw deletes; returns the documents written."""
+    written = 0
+    batch = []
+    for document in build_documents():
+        batch.append(document)
+        if len(batch) == CHUNK_SIZE:
+            _save(batch)
+            written += len(batch)
+            batch = []
+    _save(batch)
+    EmployeeDocument.objects.exclude(employee__in=Employee.objects.all()).delete()
+    return written + len(batch)
+
+
+def document_drift() -> dict[int, list[str]]:
+    """Employees whose document is missing, stale or orphaned: ``pk -> differing fields``."""
+    stored = {row[0]: row[1:] for row in EmployeeDocument.objects.order_by('pk')
+              .values_list('pk', *DOCUMENT_FIELDS).iterator(chunk_size=CHUNK_SIZE)}
+
+    drift = {}
+    for document in build_documents():
+        live = tuple(getattr(document, f) for f in DOCUMENT_FIELDS)
+        row = stored.pop(document.pk, None)
+        if row is None:
+            drift[document.pk] = ['missing']
+            continue
+        # BinaryField values come back as memoryview
+        row = tuple(bytes(v) if isinstance(v, memoryview) else v for v in row)
+        fields = [f for f, old, new in zip(DOCUMENT_FIELDS, row, live) if old != new]
+        if fields:
+            drift[document.pk] = fields
+
+    drift.update((pk, ['orphaned']) for pk in stored)
+    return drift
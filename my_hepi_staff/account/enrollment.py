@@ -0,0 +1,159 @@
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+
+from competence.models import Competence
+from .documents import deferred
+from .models import Employee
+
+
+Through = Employee.competences.through
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
+
+
+@dataclass
+class EnrollmentResult:
+    added: int = 0
+    removed: int = 0
+    changed_employees: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _send(employee: Employee, action: str, pk_set: set[int]) -> None:
+    # bulk_create/delete on the through table bypass the related manager, so
+    # listeners (caches, matching matrix) are notified the way add()/remove() would.
+    m2m_changed.send(sender=Through, instance=employee, action=action, reverse=False,
+                     model=Competence, pk_set=pk_set, using=Through.objects.db)
+
+
+def bulk_set_competences(assignments: dict[Employee, Iterable[int]]) -> EnrollmentResult:
+    """
+    Replace the competences of many employees with one read, one ``bulk_create``
+    and one filtered delete per chunk of employees, inside a single transaction.
+    """
+    wanted = {employee: set(competence_ids) for employee, competence_ids in assignments.items()}
+    by_id = {employee.pk: employee for employee in wanted}
+    result = EnrollmentResult()
+
+    # the documents of changed employees are rewritten once, not per signal
+    with transaction.atomic(), deferred():
+        current = {pk: {} for pk in by_id}
+        for ids in _chunks(list(by_id)):
+            rows = Through.objects.filter(employee_id__in=ids) \
+                .values_list('pk', 'employee_id', 'competence_id')
+            for row_pk, employee_id, competence_id in rows:
+                current[employee_id][competence_id] = row_pk
+
+        to_create = []
+        to_delete = []
+        changes = []
+
+        for employee, competence_ids in wanted.items():
+            existing = current[employee.pk]
+            added = competence_ids - existing.keys()
+            removed = existing.keys() - competence_ids
+
+            if not added and not removed:
+                continue
+
+            to_create.extend(Through(employee_id=employee.pk, competence_id=pk) for pk in added)
+            to_delete.extend(existing[pk] for pk in removed)
+            changes.append((employee, added, removed))
+
+        for employee, added, removed in changes:
+            if removed:
+                _send(employee, 'pre_remove', removed)
+            if added:
+                _send(employee, 'pre_add', added)
+
+        for ids in _chunks(to_delete):
+            Through.objects.filter(pk__in=ids).delete()
+        Through.objects.bulk_create(to_create, batch_size=CHUNK_SIZE)
+
+        for employee, added, removed in changes:
+            if removed:
+                _send(employee, 'post_remove', removed)
+            if added:
+                _send(employee, 'post_add', added)
+
+    result.added = len(to_create)
+    result.removed = len(to_delete)
+    result.changed_employees = len(changes)
+    return result
+
+
+def set_competences(employee: Employee, competence_ids: Iterable[int]) -> EnrollmentResult:
+    return bulk_set_competences({employee: competence_ids})
+
+
+def parse_competence_csv(file) -> tuple[dict[str, set[int]], list[str]]:
+    """
+    Read ``username,competences`` rows, competences being ``;``-separated
+    competence ids. An empty competences cell clears the employee's skills.
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.StringIO(file.decode('utf-8-sig'))
+    elif not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig')
+
+    assignments = {}
+    errors = []
+
+    for line_no, row in enumerate(csv.DictReader(file), start=2):
+        username = (row.get('username') or '').strip()
+        if not username:
+            errors.append(f'Line {line_no}: missing username.')
+            continue
+
+        try:
+            competence_ids = {int(pk) for pk in (row.get('competences') or '').split(';') if pk.strip()}
+        except ValueError:
+            errors.append(f'Line {line_no}: competences must be ";"-separated ids.')
+            continue
+
+        assignments.setdefault(username, set()).update(competence_ids)
+
+    return assignments, errors
+
+
+def enroll_from_csv(file) -> EnrollmentResult:
+    by_username, errors = parse_competence_csv(file)
+
+    employees = {}
+    for usernames in _chunks(list(by_username)):
+        for employee in Employee.objects.select_related('account__user') \
+                .filter(account__user__username__in=usernames):
+            employees[employee.account.user.username] = employee
+
+    known_competences = set()
+    all_competences = list(set().union(*by_username.values())) if by_username else []
+    for ids in _chunks(all_competences):
+        known_competences.update(Competence.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+    assignments = {}
+    for username, competence_ids in by_username.items():
+        if username not in employees:
+            errors.append(f'Unknown employee: {username}.')
+            continue
+
+        unknown = competence_ids - known_competences
+        if unknown:
+            errors.append(f"Unknown competences for {username}: {', '.join(map(str, sorted(unknown)))}.")
+            continue
+
+        assignments[employees[username]] = competence_ids
+
+    result = bulk_set_competences(assignments)
+    result.errors = errors
+    return result
@@ -0,0 +1,99 @@
+import csv
+from typing import Iterable, Iterator
+
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+from competence.models import Competence
+from .models import Employee, Project
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EmployeeCompetence = Employee.competences.through
+ProjectCompetence = Project.competences.through
+
+
+class Echo:
+    """File-like object whose write() hands the line back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def employee_rows(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    competences = Competence.objects.order_by('name').only('pk', 'name')
+    queryset = Employee.objects.select_related('account__user') \
+        .prefetch_related(Prefetch('competences', queryset=competences)) \
+        .order_by('pk')
+
+    for e in queryset.iterator(chunk_size=chunk_size):
+        user = e.account.user
+        yield [e.pk, user.username, user.first_name, user.last_name, user.email,
+               e.address, e.post_code, e.city, e.is_active, e.belbin_test_result,
+               ';'.join(c.name for c in e.competences.all())]
+
+
+def project_rows(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    competences = Competence.objects.order_by('name').only('pk', 'name')
+    employees = Employee.objects.select_related('account__user').order_by('pk')
+    queryset = Project.objects.select_related('employer') \
+        .prefetch_related(Prefetch('competences', queryset=competences),
+                          Prefetch('employees', queryset=employees)) \
+        .order_by('pk')
+
+    for p in queryset.iterator(chunk_size=chunk_size):
+        yield [p.pk, p.code, p.title, p.employer.company_name,
+               ';'.join(c.name for c in p.competences.all()),
+               ';'.join(e.account.user.username for e in p.employees.all())]
+
+
+def _holders(through):
+    # correlated COUNT(*) per competence: joining both M2M tables would multiply their rows
+    counted = through.objects.filter(competence_id=OuterRef('pk')).order_by() \
+        .values('competence_id').annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counted), 0)
+
+
+def competence_rows(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    queryset = Competence.objects.select_related('competence_group') \
+        .annotate(employee_count=_holders(EmployeeCompetence), project_count=_holders(ProjectCompetence)) \
+        .order_by('pk')
+
+    for c in queryset.iterator(chunk_size=chunk_size):
+        yield [c.pk, c.competence_group.name, c.name, c.get_status_display(),
+               c.employee_count, c.project_count]
+
+
+EXPORTS = {
+    'employees': (
+        ['id', 'username', 'first_name', 'last_name', 'email', 'address', 'post_code', 'city',
+         'is_active', 'belbin_test_result', 'competences'],
+        employee_rows,
+    ),
+    'projects': (
+        ['id', 'code', 'title', 'employer', 'competences', 'employees'],
+        project_rows,
+    ),
+    'competences': (
+        ['id', 'group', 'name', 'status', 'employees', 'projects'],
+        competence_rows,
+    ),
+}
+
+
+def export_rows(kind: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    """Header followed by every row of ``kind``; raises KeyError for unknown kinds."""
+    header, rows = EXPORTS[kind]
+    yield header
+    yield from rows(chunk_size=chunk_size)
+
+
+def stream_rows(rows: Iterable[list]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_csv(kind: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    return stream_rows(export_rows(kind, chunk_size=chunk_size))
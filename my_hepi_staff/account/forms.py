@@ -1,7 +1,15 @@
+from datetime import date
+from typing import Optional
+
 from django import forms
 
-from account.models import Project, Employee
-from competence.models import Competence
+from account.availability import FULL_TIME, busy_employee_ids
+from account.belbin import POINTS_PER_GROUP
+from account.choices import (CachedCheckboxSelectMultiple, CachedMultipleChoiceField,
+                             competence_choices, employee_choices)
+from account.matching import Match, rank_employees
+from account.models import Project
+from account.similarity import related_competences
 
 
 class LoginForm(forms.Form):
@@ -10,9 +18,9 @@ class LoginForm(forms.Form):
 
 
 class CompetenceEnrollForm(forms.Form):
-    competence = forms.ModelMultipleChoiceField(queryset=Competence.objects.all(), 
-                                        widget=forms.CheckboxSelectMultiple,
-                                        label='')
+    competence = CachedMultipleChoiceField(competence_choices,
+                                           widget=CachedCheckboxSelectMultiple,
+                                           label='')
 
 
 class AboutMeForm(forms.Form):
@@ -28,23 +36,101 @@ class GroupedTableForm(forms.Form):
             questions = group.get('questions')
             self.fields[f'group_{idx+1}'] = forms.CharField(label=group_name, widget=forms.HiddenInput(), required=False)
             for q_idx, question in enumerate(questions):
-                self.fields[f'group_{idx+1}_question_{q_idx+1}'] = forms.IntegerField(label=question, initial=0)
+                self.fields[f'group_{idx+1}_question_{q_idx+1}'] = forms.IntegerField(
+                    label=question, initial=0, min_value=0, max_value=POINTS_PER_GROUP)
 
     def clean(self):
         cleaned_data = super().clean()
         for group_idx, group in enumerate(self.grouped_questions):
-            sum_of_group = sum(cleaned_data[f'group_{group_idx + 1}_question_{q_idx + 1}'] for q_idx in range(len(group['questions'])))
-            if sum_of_group != 10:
-                self.add_error(f'group_{group_idx + 1}', f"The sum of the fields in '{group['name']}' must equal 10.")
+            values = [cleaned_data.get(f'group_{group_idx + 1}_question_{q_idx + 1}')
+                      for q_idx in range(len(group['questions']))]
+            if None in values:
+                # an answer out of range already has its own error
+                continue
+            if sum(values) != POINTS_PER_GROUP:
+                self.add_error(f'group_{group_idx + 1}',
+                               f"The sum of the fields in '{group['name']}' must equal {POINTS_PER_GROUP}.")
 
 
 class ProjectForm(forms.ModelForm):
-    competences = forms.ModelMultipleChoiceField(queryset=Competence.objects.all(), required=True)
-    employees = forms.ModelMultipleChoiceField(queryset=Employee.objects.all(), required=True)
+    competences = CachedMultipleChoiceField(competence_choices, required=True)
+    employees = CachedMultipleChoiceField(employee_choices, required=True)
+    # the assignment of employees added to the project
+    start_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}),
+                               help_text='Leave empty for an open-ended assignment.')
+    allocation = forms.IntegerField(min_value=1, max_value=FULL_TIME, initial=FULL_TIME, required=False,
+                                    help_text='Percent of full time.')
 
     class Meta:
         model = Project
         fields = ['code', 'title', 'description', 'competences', 'employees']
 
-    
-    
+    def period(self) -> Optional[tuple[date, date]]:
+        data = self.cleaned_data if hasattr(self, 'cleaned_data') else self.initial
+        start, end = data.get('start_date'), data.get('end_date')
+        if not start:
+            return None
+        return start, end or date.max
+
+    def current_employee_ids(self) -> set[int]:
+        if not self.instance.pk:
+            return set()
+        return set(self.instance.assignments.values_list('employee_id', flat=True))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start and end and end < start:
+            self.add_error('end_date', 'The assignment cannot end before it starts.')
+            return cleaned_data
+
+        period = self.period()
+        allocation = cleaned_data.get('allocation') or FULL_TIME
+        if period and cleaned_data.get('employees'):
+            added = set(cleaned_data['employees']) - self.current_employee_ids()
+            busy = added & set(busy_employee_ids(*period, allocation=allocation, exclude_project=self.instance.pk))
+            if busy:
+                names = dict(employee_choices().choices)
+                self.add_error('employees', 'Not enough free time in this period: '
+                               + ', '.join(sorted(names.get(pk, str(pk)) for pk in busy)))
+        return cleaned_data
+
+    def _save_m2m(self):
+        # new assignments get the period and allocation of the form; the
+        # generic save that follows finds nothing left to add
+        self.instance.employees.set(self.cleaned_data['employees'], through_defaults={
+            'start_date': self.cleaned_data.get('start_date'),
+            'end_date': self.cleaned_data.get('end_date'),
+            'allocation': self.cleaned_data.get('allocation') or FULL_TIME,
+        })
+        super()._save_m2m()
+
+    def selected_competence_ids(self) -> list[int]:
+        if self.is_bound:
+            key = self.add_prefix('competences')
+            values = self.data.getlist(key) if hasattr(self.data, 'getlist') else self.data.get(key, [])
+        elif 'competences' in self.initial:
+            values = self.initial['competences']
+        elif self.instance.pk:
+            values = self.instance.competences.values_list('pk', flat=True)
+        else:
+            values = []
+
+        ids = []
+        for value in values:
+            try:
+                ids.append(int(getattr(value, 'pk', value)))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    def suggest_employees(self, limit: int = 10) -> list[Match]:
+        period = self.period()
+        busy = busy_employee_ids(*period, allocation=self.initial.get('allocation') or FULL_TIME,
+                                 exclude_project=self.instance.pk) if period else ()
+        return rank_employees(self.selected_competence_ids(), limit=limit, exclude=busy)
+
+    def suggest_competences(self, limit: int = 5) -> list[dict]:
+        """Competences that employees with the selected ones usually have as well."""
+        return related_competences(self.selected_competence_ids(), limit=limit)
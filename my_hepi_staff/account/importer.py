@@ -0,0 +1,296 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from competence.models import Competence, Group
+from .analytics import rebuild_rollups
+from .documents import rebuild_documents
+from .choices import invalidate_competence_choices, invalidate_employee_choices
+from .matching import invalidate_matrix
+from .search import rebuild_search_index
+from .models import Account, Employee, Employer, Project
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class BatchReport:
+    kind: str
+    number: int
+    created: int
+    skipped: int
+    seconds: float
+    # rows rejected as inconsistent with the rest of the input, not merely existing
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def per_minute(self) -> float:
+        return self.created / self.seconds * 60 if self.seconds else 0.0
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Yield dicts from a ``.csv`` file or a JSON-lines file (anything else)."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def split_list(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(';')
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def batched(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _setup_worker():
+    django.setup()
+
+
+def _hash(password: str) -> str:
+    return make_password(password)
+
+
+class StaffImporter:
+    """
+    Loads competence catalogs, employers, employees and projects with one
+    ``bulk_create`` per model per batch. Foreign keys are resolved through
+    in-memory maps, and rows whose natural key (group + name, username,
+    company name, project code) already exists are skipped, so re-running an
+    import is a no-op. Rows that conflict with another row of the same batch
+    are left out and reported in ``BatchReport.errors``.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = None):
+        self.batch_size = batch_size
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._pool = None
+        self._competences = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+        # bulk_create sends no signals: rewrite the documents the matrix is read from
+        # and recount the competence rollups
+        rebuild_documents()
+        rebuild_rollups()
+        invalidate_matrix()
+        invalidate_competence_choices()
+        invalidate_employee_choices()
+        rebuild_search_index()
+
+    # -- helpers -----------------------------------------------------------
+
+    def hash_passwords(self, passwords: list[Optional[str]]) -> list[str]:
+        to_hash = [p for p in passwords if p]
+        if self.workers > 1 and len(to_hash) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_setup_worker)
+            chunksize = max(1, len(to_hash) // (self.workers * 4))
+            hashed = iter(self._pool.map(_hash, to_hash, chunksize=chunksize))
+        else:
+            hashed = iter(map(_hash, to_hash))
+        return [next(hashed) if p else make_password(None) for p in passwords]
+
+    def competence_map(self) -> dict[str, int]:
+        if self._competences is None:
+            self._competences = {}
+            for pk, group, name in Competence.objects.values_list('pk', 'competence_group__name', 'name'):
+                self._competences.setdefault(name, pk)
+                self._competences[f'{group}/{name}'] = pk
+        return self._competences
+
+    def resolve_competences(self, names: list[str]) -> list[int]:
+        mapping = self.competence_map()
+        missing = [n for n in names if n not in mapping]
+        if missing:
+            raise ValueError(f"Unknown competences: {', '.join(missing)}")
+        return [mapping[n] for n in names]
+
+    def _run(self, kind: str, records: Iterable[dict], handler) -> Iterator[BatchReport]:
+        for number, batch in enumerate(batched(records, self.batch_size), start=1):
+            started = time.perf_counter()
+            # handlers append to errors, numbering rows from 1 across the whole input
+            errors = []
+            with transaction.atomic():
+                created = handler(batch, (number - 1) * self.batch_size + 1, errors)
+            yield BatchReport(kind, number, created, len(batch) - created, time.perf_counter() - started, errors)
+
+    def _create_users(self, batch: list[dict], is_employee: bool) -> dict[str, tuple[Account, dict]]:
+        usernames = {r['username'] for r in batch}
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+        fresh = {}
+        for record in batch:
+            if record['username'] not in existing:
+                fresh.setdefault(record['username'], record)
+        if not fresh:
+            return {}
+
+        passwords = self.hash_passwords([r.get('password') for r in fresh.values()])
+        users = User.objects.bulk_create([
+            User(username=username, password=password, email=r.get('email', ''),
+                 first_name=r.get('first_name', ''), last_name=r.get('last_name', ''))
+            for (username, r), password in zip(fresh.items(), passwords)
+        ])
+        if users and users[0].pk is None:
+            ids = dict(User.objects.filter(username__in=fresh).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        accounts = Account.objects.bulk_create([
+            Account(user=user, is_employee=is_employee, is_employer=not is_employee) for user in users
+        ])
+        if accounts and accounts[0].pk is None:
+            ids = dict(Account.objects.filter(user__in=users).values_list('user_id', 'pk'))
+            for account in accounts:
+                account.pk = ids[account.user_id]
+
+        return {account.user.username: (account, fresh[account.user.username]) for account in accounts}
+
+    # -- importers ---------------------------------------------------------
+
+    def import_competences(self, records: Iterable[dict]) -> Iterator[BatchReport]:
+        groups = dict(Group.objects.values_list('name', 'pk'))
+
+        def handle(batch, first_row, errors):
+            new_groups = {r['group'] for r in batch} - groups.keys()
+            for group in Group.objects.bulk_create([Group(name=name) for name in sorted(new_groups)]):
+                groups[group.name] = group.pk
+            if new_groups and None in groups.values():
+                groups.update(Group.objects.filter(name__in=new_groups).values_list('name', 'pk'))
+
+            mapping = self.competence_map()
+            fresh = {}
+            for r in batch:
+                key = f"{r['group']}/{r['name']}"
+                if key not in mapping:
+                    fresh.setdefault(key, r)
+
+            created = Competence.objects.bulk_create([
+                Competence(name=r['name'], competence_group_id=groups[r['group']]) for r in fresh.values()
+            ])
+            self._competences = None
+            return len(created)
+
+        return self._run('competences', records, handle)
+
+    def import_employers(self, records: Iterable[dict]) -> Iterator[BatchReport]:
+        def handle(batch, first_row, errors):
+            names = {r['company_name'] for r in batch}
+            taken = set(Employer.objects.filter(company_name__in=names).values_list('company_name', flat=True))
+
+            # company names are unique: the first row of a batch claims one, other users asking for it fail
+            claimed = {}
+            fresh = []
+            for row, r in enumerate(batch, start=first_row):
+                name = r['company_name']
+                if name in taken:
+                    continue
+                if name in claimed and claimed[name][1] != r['username']:
+                    errors.append(f'Row {row}: company name {name!r} is already used by row {claimed[name][0]}.')
+                    continue
+                claimed.setdefault(name, (row, r['username']))
+                fresh.append(r)
+            batch = fresh
+
+            accounts = self._create_users(batch, is_employee=False)
+            created = Employer.objects.bulk_create([
+                Employer(account=account, company_name=r['company_name'], address=r.get('address', ''),
+                         post_code=r.get('post_code', ''), city=r.get('city', ''))
+                for account, r in accounts.values()
+            ])
+            return len(created)
+
+        return self._run('employers', records, handle)
+
+    def import_employees(self, records: Iterable[dict]) -> Iterator[BatchReport]:
+        def handle(batch, first_row, errors):
+            accounts = self._create_users(batch, is_employee=True)
+            employees = Employee.objects.bulk_create([
+                Employee(account=account, address=r.get('address', ''), post_code=r.get('post_code', ''),
+                         city=r.get('city', ''), description=r.get('description') or None)
+                for account, r in accounts.values()
+            ])
+            if employees and employees[0].pk is None:
+                ids = dict(Employee.objects.filter(account__in=[e.account for e in employees])
+                           .values_list('account_id', 'pk'))
+                for employee in employees:
+                    employee.pk = ids[employee.account_id]
+
+            Employee.competences.through.objects.bulk_create([
+                Employee.competences.through(employee_id=employee.pk, competence_id=competence_id)
+                for employee, (_, r) in zip(employees, accounts.values())
+                for competence_id in set(self.resolve_competences(split_list(r.get('competences'))))
+            ], batch_size=self.batch_size)
+            return len(employees)
+
+        return self._run('employees', records, handle)
+
+    def import_projects(self, records: Iterable[dict]) -> Iterator[BatchReport]:
+        employers = dict(Employer.objects.values_list('company_name', 'pk'))
+
+        def handle(batch, first_row, errors):
+            codes = {r['code'] for r in batch}
+            taken = set(Project.objects.filter(code__in=codes).values_list('code', flat=True))
+            fresh = {}
+            for r in batch:
+                if r['code'] not in taken:
+                    fresh.setdefault(r['code'], r)
+
+            usernames = {u for r in fresh.values() for u in split_list(r.get('employees'))}
+            employee_ids = dict(Employee.objects.filter(account__user__username__in=usernames)
+                                .values_list('account__user__username', 'pk'))
+
+            unknown = {r['employer'] for r in fresh.values()} - employers.keys()
+            if unknown:
+                raise ValueError(f"Unknown employers: {', '.join(sorted(unknown))}")
+
+            projects = Project.objects.bulk_create([
+                Project(employer_id=employers[r['employer']], code=code, title=r['title'],
+                        description=r.get('description') or None)
+                for code, r in fresh.items()
+            ])
+            if projects and projects[0].pk is None:
+                ids = dict(Project.objects.filter(code__in=fresh).values_list('code', 'pk'))
+                for project in projects:
+                    project.pk = ids[project.code]
+
+            Project.competences.through.objects.bulk_create([
+                Project.competences.through(project_id=project.pk, competence_id=competence_id)
+                for project in projects
+                for competence_id in set(self.resolve_competences(split_list(fresh[project.code].get('competences'))))
+            ], batch_size=self.batch_size)
+            Project.employees.through.objects.bulk_create([
+                Project.employees.through(project_id=project.pk, employee_id=employee_ids[username])
+                for project in projects
+                for username in set(split_list(fresh[project.code].get('employees')))
+                if username in employee_ids
+            ], batch_size=self.batch_size)
+            return len(projects)
+
+        return self._run('projects', records, handle)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from account.analytics import group_report, live_group_report
+from account.benchmarks import timings
+
+
+class Command(BaseCommand):
+    help = ('Time the competence-gap report read from the rollup tables against the same report computed '
+            'live from the employee and project competence tables, and check that both agree.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per version; the median is kept.')
+
+    def handle(self, *args, **options):
+        if group_report() != live_group_report():
+            raise CommandError('The rollups differ from the live counts, run rebuild_rollups first.')
+
+        self.stdout.write(f'{"version":<8} {"queries":>8} {"min ms":>9} {"median ms":>10}')
+        results = {}
+        for name, report in [('rollup', group_report), ('live', live_group_report)]:
+            with CaptureQueriesContext(connection) as queries:
+                report()
+            results[name] = timings(report, options['repeat'])
+            self.stdout.write(f'{name:<8} {len(queries):>8} {results[name]["min_ms"]:>9.2f} '
+                              f'{results[name]["median_ms"]:>10.2f}')
+
+        speedup = results['live']['median_ms'] / results['rollup']['median_ms']
+        self.stdout.write(self.style.SUCCESS(f'Rollups are {speedup:.0f}x faster than the live joins.'))
@@ -0,0 +1,96 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+DEFAULT_PATHS = ['/api/employees', '/api/projects', '/api/competence-groups', '/api/belbin']
+
+
+class Command(BaseCommand):
+    help = ('Load a running server with concurrent API requests and report throughput and latency '
+            'per concurrency level. Run it once against the ASGI app (e.g. '
+            '"uvicorn my_hepi_staff.asgi:application --workers 1") and once against WSGI (e.g. '
+            '"gunicorn my_hepi_staff.wsgi --workers 1 --threads 8") to compare them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server.')
+        parser.add_argument('--username', required=True,
+                            help='Employer to authenticate as; a session is created in the database.')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help=f'API path to request, repeatable. Defaults to {", ".join(DEFAULT_PATHS)}.')
+        parser.add_argument('--concurrency', default='1,8,32,64',
+                            help='Comma-separated numbers of simultaneous clients.')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per concurrency level.')
+        parser.add_argument('--label', default='', help='Label stored with the results, e.g. asgi or wsgi.')
+        parser.add_argument('--output', help='Append results as a JSON line to this file.')
+
+    def session_cookie(self, username):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'No user {username!r}.')
+        client = Client()
+        client.force_login(user)
+        return client.cookies['sessionid'].value
+
+    def fetch(self, url, cookie):
+        request = urllib.request.Request(url, headers={'Cookie': f'sessionid={cookie}'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def run_level(self, urls, cookie, concurrency, total):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda url: self.fetch(url, cookie), islice(cycle(urls), total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(seconds * 1000 for seconds, _ in results)
+        return {
+            'concurrency': concurrency,
+            'requests': total,
+            'errors': sum(1 for _, ok in results if not ok),
+            'rps': total / elapsed,
+            'mean_ms': statistics.mean(latencies),
+            'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        }
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(n) for n in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency must be a comma-separated list of integers.')
+
+        cookie = self.session_cookie(options['username'])
+        urls = [options['url'].rstrip('/') + path for path in options['paths'] or DEFAULT_PATHS]
+
+        # warm up connections, caches and lazily built structures
+        for url in urls:
+            _, ok = self.fetch(url, cookie)
+            if not ok:
+                raise CommandError(f'{url} did not answer 200, is the server running?')
+
+        rows = []
+        self.stdout.write(f'{"clients":>8} {"req/s":>9} {"mean ms":>9} {"p95 ms":>9} {"errors":>7}')
+        for concurrency in levels:
+            row = self.run_level(urls, cookie, concurrency, options['requests'])
+            rows.append(row)
+            self.stdout.write(f'{row["concurrency"]:>8} {row["rps"]:>9.1f} {row["mean_ms"]:>9.1f} '
+                              f'{row["p95_ms"]:>9.1f} {row["errors"]:>7}')
+
+        if options['output']:
+            with open(options['output'], 'a') as f:
+                f.write(json.dumps({'label': options['label'], 'url': options['url'], 'results': rows}) + '\n')
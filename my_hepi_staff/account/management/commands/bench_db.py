@@ -0,0 +1,123 @@
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from account.directory import directory_queryset
+from account.models import Project
+from account.projects import annotate_staffing
+
+
+class Command(BaseCommand):
+    help = ('Measure database throughput for concurrent read/write mixes on the configured database. '
+            'Reads are project summaries and directory pages, writes touch a project row in a '
+            'transaction without changing it. Run it once per DATABASE_* / SQLITE_* profile to compare them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', default='1,4,16', help='Comma-separated numbers of concurrent clients.')
+        parser.add_argument('--writes', default='0,0.1,0.5',
+                            help='Comma-separated fractions of operations that write.')
+        parser.add_argument('--operations', type=int, default=2000, help='Operations per write mix and thread count, split between the threads.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--label', default='', help='Label stored with the results.')
+        parser.add_argument('--output', help='Append results as a JSON line to this file.')
+
+    def floats(self, value, name):
+        try:
+            return [float(n) for n in value.split(',')]
+        except ValueError:
+            raise CommandError(f'--{name} must be a comma-separated list of numbers.')
+
+    def describe(self):
+        if connection.vendor != 'sqlite':
+            return f'{connection.vendor} (CONN_MAX_AGE={connection.settings_dict["CONN_MAX_AGE"]})'
+        with connection.cursor() as cursor:
+            values = {}
+            for name in ('journal_mode', 'synchronous', 'mmap_size', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        return 'sqlite ' + ', '.join(f'{k}={v}' for k, v in values.items())
+
+    def read(self, rng, projects):
+        if rng.random() < 0.5:
+            employer_id = rng.choice(projects)[1]
+            list(annotate_staffing(Project.objects.filter(employer_id=employer_id)).order_by('code')[:25])
+        else:
+            list(directory_queryset()[:25])
+
+    def write(self, rng, projects):
+        with transaction.atomic():
+            Project.objects.filter(pk=rng.choice(projects)[0]).update(description=F('description'))
+
+    def run_mix(self, threads, write_ratio, operations, projects, seed):
+        results = []
+
+        def client(n, count):
+            rng = random.Random(seed + n)
+            done = []
+            try:
+                for _ in range(count):
+                    kind = 'write' if rng.random() < write_ratio else 'read'
+                    started = time.perf_counter()
+                    try:
+                        getattr(self, kind)(rng, projects)
+                        ok = True
+                    except OperationalError:
+                        ok = False
+                    done.append((kind, (time.perf_counter() - started) * 1000, ok))
+            finally:
+                # connections are per thread, close this one before the thread goes away
+                connection.close()
+            results.extend(done)
+
+        workers = [threading.Thread(target=client, args=(n, operations // threads + (n < operations % threads)))
+                   for n in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        row = {
+            'threads': threads,
+            'write_ratio': write_ratio,
+            'operations': operations,
+            'errors': sum(1 for _, _, ok in results if not ok),
+            'ops': operations / elapsed,
+        }
+        for kind in ('read', 'write'):
+            latencies = sorted(ms for k, ms, ok in results if k == kind and ok)
+            row[f'{kind}_p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] \
+                if latencies else None
+        return row
+
+    def handle(self, *args, **options):
+        levels = [int(n) for n in self.floats(options['threads'], 'threads')]
+        mixes = self.floats(options['writes'], 'writes')
+
+        projects = list(Project.objects.values_list('pk', 'employer_id'))
+        if not projects:
+            raise CommandError('No projects to read and write, import some data first.')
+
+        self.stdout.write(f'{settings.DATABASES["default"]["NAME"]}: {self.describe()}')
+        self.stdout.write(f'{"threads":>8} {"writes":>7} {"ops/s":>9} {"read p95":>9} {"write p95":>10} {"errors":>7}')
+
+        rows = []
+        for write_ratio in mixes:
+            for threads in levels:
+                row = self.run_mix(threads, write_ratio, options['operations'], projects, options['seed'])
+                rows.append(row)
+                read_p95 = '-' if row['read_p95_ms'] is None else f'{row["read_p95_ms"]:.1f}'
+                write_p95 = '-' if row['write_p95_ms'] is None else f'{row["write_p95_ms"]:.1f}'
+                self.stdout.write(f'{threads:>8} {write_ratio:>7.0%} {row["ops"]:>9.1f} {read_p95:>9} '
+                                  f'{write_p95:>10} {row["errors"]:>7}')
+
+        if options['output']:
+            with open(options['output'], 'a') as f:
+                f.write(json.dumps({'label': options['label'], 'database': self.describe(), 'results': rows}) + '\n')
@@ -0,0 +1,89 @@
+import json
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from account import profiling
+from account.competence_summary import invalidate_competence_summary
+from account.models import Employee
+from account.views import EmployeeBelbinTest
+
+
+class Command(BaseCommand):
+    help = ('Render the competence and Belbin test pages as an employee, with and without their caches '
+            '(the competence form fragment and the pre-rendered questionnaire), and report render times.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employee', help='Username to render the pages as, defaults to the first employee.')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per page and mode.')
+        parser.add_argument('--output', help='Write the measurements as JSON to this file.')
+
+    def get_employee(self, username):
+        employees = Employee.objects.select_related('account__user')
+        if username:
+            employees = employees.filter(account__user__username=username)
+        employee = employees.first()
+        if employee is None:
+            raise CommandError('No employee to render the pages as.')
+        return employee
+
+    def measure(self, client, name, path, before, requests):
+        runs = []
+        for _ in range(requests):
+            before()
+            with profiling.profile(name, path=path) as result:
+                response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f'{path} answered {response.status_code}.')
+            runs.append(result)
+
+        totals = sorted(r.total_ms for r in runs)
+        return {
+            'mean_ms': statistics.mean(totals),
+            'p95_ms': totals[min(len(totals) - 1, int(len(totals) * 0.95))],
+            'template_ms': statistics.mean(r.template_ms for r in runs),
+            'queries': runs[-1].queries,
+        }
+
+    def handle(self, *args, **options):
+        employee = self.get_employee(options['employee'])
+
+        def uncached_fragment():
+            # a new competences version gives the fragment a new cache key
+            invalidate_competence_summary(employee.pk)
+
+        def unrendered_questionnaire():
+            EmployeeBelbinTest._questionnaire = None
+
+        def nothing():
+            pass
+
+        cases = [
+            ('competence', 'employee-competence', 'uncached', uncached_fragment),
+            ('competence', 'employee-competence', 'cached', nothing),
+            ('belbin', 'employee-belbin-test', 'rendered', unrendered_questionnaire),
+            ('belbin', 'employee-belbin-test', 'pre-rendered', nothing),
+        ]
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            client.force_login(employee.account.user)
+
+            self.stdout.write(f'{"page":<12} {"mode":<13} {"mean ms":>9} {"p95 ms":>9} {"template ms":>12} '
+                              f'{"queries":>8}')
+            for page, url_name, mode, before in cases:
+                path = reverse(url_name)
+                client.get(path)
+                row = {'page': page, 'mode': mode, **self.measure(client, url_name, path, before,
+                                                                  options['requests'])}
+                results.append(row)
+                self.stdout.write(f'{page:<12} {mode:<13} {row["mean_ms"]:>9.2f} {row["p95_ms"]:>9.2f} '
+                                  f'{row["template_ms"]:>12.2f} {row["queries"]:>8}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
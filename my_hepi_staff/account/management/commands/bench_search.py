@@ -0,0 +1,90 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import Employee
+from account.search import FTS5Backend, TrigramIndex, get_backend
+from competence.models import Competence
+
+
+class Command(BaseCommand):
+    help = ('Compare build time, query latency and top results of the FTS5 and pure-Python '
+            'employee search backends on the current database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=200, help='Number of sampled queries.')
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('query', nargs='*', help='Queries to run instead of sampled ones.')
+
+    def sample_queries(self, count, rng):
+        names = list(Employee.objects.filter(is_active=True)
+                     .values_list('account__user__last_name', 'city')[:1000])
+        competences = list(Competence.objects.values_list('name', flat=True)[:1000])
+        if not names:
+            raise CommandError('No active employees to search for.')
+
+        def typo(word):
+            if len(word) < 4:
+                return word
+            i = rng.randrange(1, len(word) - 1)
+            return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+        queries = []
+        for _ in range(count):
+            last_name, city = rng.choice(names)
+            kind = rng.randrange(4)
+            if kind == 0:
+                queries.append(last_name)
+            elif kind == 1:
+                queries.append(f'{city} {rng.choice(competences)}' if competences else city)
+            elif kind == 2:
+                queries.append(last_name[:max(3, len(last_name) // 2)])
+            else:
+                queries.append(typo(last_name))
+        return queries
+
+    def timed(self, search, queries, limit):
+        results, timings = [], []
+        for query in queries:
+            started = time.perf_counter()
+            results.append([hit.employee_id for hit in search(query, limit=limit)])
+            timings.append((time.perf_counter() - started) * 1000)
+        return results, timings
+
+    def report(self, name, build_ms, timings, results):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        found = sum(1 for r in results if r)
+        self.stdout.write(
+            f'{name:>7}: build {build_ms:9.1f} ms | query mean {statistics.mean(timings):7.2f} ms, '
+            f'p95 {p95:7.2f} ms | {found}/{len(results)} queries with results'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        queries = options['query'] or self.sample_queries(options['queries'], rng)
+        limit = options['limit']
+
+        started = time.perf_counter()
+        index = TrigramIndex.build()
+        python_build = (time.perf_counter() - started) * 1000
+        python_results, python_timings = self.timed(index.search, queries, limit)
+        self.report('python', python_build, python_timings, python_results)
+
+        if not FTS5Backend.available():
+            self.stdout.write('fts5: not available on this database, run the account migrations on SQLite.')
+            return
+
+        fts = get_backend('fts5')
+        started = time.perf_counter()
+        fts.rebuild()
+        fts_build = (time.perf_counter() - started) * 1000
+        fts_results, fts_timings = self.timed(fts.search, queries, limit)
+        self.report('fts5', fts_build, fts_timings, fts_results)
+
+        overlaps = [len(set(a) & set(b)) / len(set(a) | set(b)) for a, b in zip(python_results, fts_results) if a or b]
+        if overlaps:
+            self.stdout.write(f'top-{limit} overlap (Jaccard): {statistics.mean(overlaps):.2f}')
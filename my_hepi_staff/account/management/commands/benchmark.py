@@ -0,0 +1,113 @@
+import json
+import platform
+import subprocess
+import time
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from account import benchmarks
+from account.dataset import SCALES, USERNAME_PREFIX
+
+
+class Command(BaseCommand):
+    help = ('Generate a dataset per scale in its own database (never the configured one), time every view '
+            'of account.urls, the forms and the Belbin scoring code on it, and write the results as JSON. '
+            'Pass --compare with an earlier report to see the difference.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1k,10k,100k',
+                            help=f'Comma-separated dataset scales out of {", ".join(SCALES)}.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark; the median is kept.')
+        parser.add_argument('--workdir', default=str(Path(settings.BASE_DIR) / 'benchmarks'),
+                            help='Where SQLite benchmark databases and reports are written.')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the benchmark databases and reuse the datasets on the next run.')
+        parser.add_argument('--output', help='Report file, defaults to <workdir>/<commit>.json.')
+        parser.add_argument('--compare', help='An earlier report to compare the medians with.')
+
+    def commit(self) -> str:
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=settings.BASE_DIR, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return 'unknown'
+
+    def database_name(self, workdir: Path, scale: str) -> str:
+        if connection.vendor == 'sqlite':
+            return str(workdir / f'benchmark-{scale}.sqlite3')
+        return f'{connection.settings_dict["NAME"]}_benchmark_{scale}'
+
+    def run_scale(self, scale: str, workdir: Path, options) -> dict:
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict['TEST'] = {**connection.settings_dict.get('TEST', {}),
+                                            'NAME': self.database_name(workdir, scale)}
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False,
+                                           keepdb=options['keepdb'])
+        try:
+            generated = 0.0
+            if not User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+                self.stdout.write(f'[{scale}] generating dataset...')
+                started = time.perf_counter()
+                call_command('generate_dataset', scale=scale, stdout=StringIO())
+                generated = time.perf_counter() - started
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            # versions of the process-local indexes built on the previous scale must not match this one
+            cache.clear()
+
+            self.stdout.write(f'[{scale}] running benchmarks...')
+            return {
+                'dataset': {**vars(SCALES[scale]), 'generated_seconds': generated},
+                'benchmarks': benchmarks.run_suite(options['repeat']),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+    def handle(self, *args, **options):
+        scales = [s.strip() for s in options['scales'].split(',') if s.strip()]
+        unknown = set(scales) - SCALES.keys()
+        if unknown:
+            raise CommandError(f'Unknown scales: {", ".join(sorted(unknown))}.')
+
+        workdir = Path(options['workdir'])
+        workdir.mkdir(parents=True, exist_ok=True)
+        commit = self.commit()
+
+        report = {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'scales': {scale: self.run_scale(scale, workdir, options) for scale in scales},
+        }
+
+        output = Path(options['output'] or workdir / f'{commit}.json')
+        output.write_text(json.dumps(report, indent=2))
+
+        self.print_report(report, options['compare'])
+        self.stdout.write(self.style.SUCCESS(f'Report written to {output}.'))
+
+    def print_report(self, report: dict, compare_path: str = None):
+        current = benchmarks.flatten(report)
+        previous = benchmarks.flatten(json.loads(Path(compare_path).read_text())) if compare_path else {}
+
+        header = f'{"scale":<6} {"section":<8} {"benchmark":<48} {"median ms":>10}'
+        self.stdout.write(header + (f' {"before ms":>10} {"change":>8}' if previous else ''))
+        for key, ms in current.items():
+            line = f'{key[0]:<6} {key[1]:<8} {key[2]:<48} {ms:>10.2f}'
+            if key in previous:
+                before = previous[key]
+                change = (ms - before) / before if before else 0.0
+                line += f' {before:>10.2f} {change:>+8.0%}'
+            self.stdout.write(line)
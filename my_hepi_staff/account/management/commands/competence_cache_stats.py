@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from account.competence_summary import summary_stats
+
+
+class Command(BaseCommand):
+    help = 'Print hit/miss counters of the dashboard competence summary cache.'
+
+    def handle(self, *args, **options):
+        stats = summary_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0.0
+
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f'hit ratio: {ratio:.2%}')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.similarity import DEFAULT_MIN_SUPPORT, DEFAULT_TOP_K, compute_similarity
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = ('Recompute the competence similarity graph from the competences of active employees, '
+            'keeping the most similar competences of each for recommendations.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                            help='Neighbours kept per competence.')
+        parser.add_argument('--min-support', type=int, default=DEFAULT_MIN_SUPPORT,
+                            help='Employees that must have both competences of a pair for it to count.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the computation as a job for run_workers and exit.')
+
+    def handle(self, *args, **options):
+        if options['top_k'] < 1 or options['min_support'] < 1:
+            raise CommandError('--top-k and --min-support must be positive.')
+
+        if options['background']:
+            job = enqueue('account.compute_similarity', top_k=options['top_k'], min_support=options['min_support'])
+            self.stdout.write(self.style.SUCCESS(f'Queued job {job.pk}.'))
+            return
+
+        rows = compute_similarity(options['top_k'], options['min_support'])
+        self.stdout.write(self.style.SUCCESS(f'Stored neighbours for {rows} competences.'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.export import DEFAULT_CHUNK_SIZE, EXPORTS, export_rows, stream_csv
+
+
+class Command(BaseCommand):
+    help = 'Export employees, projects or competences as CSV or XLSX without loading them into memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('-o', '--output', help='Target file, stdout when omitted (CSV only).')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        chunk_size = options['chunk_size']
+
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('XLSX export needs --output.')
+            self._write_xlsx(kind, options['output'], chunk_size)
+            return
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                f.writelines(stream_csv(kind, chunk_size=chunk_size))
+        else:
+            for line in stream_csv(kind, chunk_size=chunk_size):
+                self.stdout.write(line, ending='')
+
+    def _write_xlsx(self, kind, path, chunk_size):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise CommandError('XLSX export requires openpyxl (pip install openpyxl).')
+
+        # write_only workbooks flush rows to disk, so memory stays flat
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(kind)
+        for row in export_rows(kind, chunk_size=chunk_size):
+            sheet.append(row)
+        workbook.save(path)
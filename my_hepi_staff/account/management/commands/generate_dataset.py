@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.dataset import SCALES, DatasetGenerator, Scale
+from account.importer import DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Fill the database with synthetic employers, employees, a competence catalog, staffed projects '
+            'and Belbin results, using the bulk-insert path of import_staff. Use a scratch database: '
+            'generated usernames start with "gen-" and an existing dataset is left in place.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='1k',
+                            help='Preset sizes; the options below override single counts.')
+        parser.add_argument('--employers', type=int)
+        parser.add_argument('--employees', type=int)
+        parser.add_argument('--projects', type=int)
+        parser.add_argument('--belbin-ratio', type=float, default=0.7,
+                            help='Fraction of employees with a Belbin test result.')
+        parser.add_argument('--password', help='Password of every generated user, so they can log in.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def get_scale(self, options) -> Scale:
+        preset = SCALES[options['scale']]
+        scale = Scale(
+            employers=options['employers'] if options['employers'] is not None else preset.employers,
+            employees=options['employees'] if options['employees'] is not None else preset.employees,
+            projects=options['projects'] if options['projects'] is not None else preset.projects,
+            competences_per_group=preset.competences_per_group,
+        )
+        if scale.projects and not scale.employers:
+            raise CommandError('Projects need at least one employer.')
+        return scale
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(self.get_scale(options), seed=options['seed'],
+                                     belbin_ratio=options['belbin_ratio'], batch_size=options['batch_size'])
+        started = time.perf_counter()
+
+        with generator.importer() as importer:
+            for kind, records in [
+                ('competences', generator.competence_records()),
+                ('employers', generator.employer_records()),
+                ('employees', generator.employee_records()),
+                ('projects', generator.project_records()),
+            ]:
+                created = skipped = 0
+                for report in getattr(importer, f'import_{kind}')(records):
+                    created += report.created
+                    skipped += report.skipped
+                self.stdout.write(f'{kind}: {created} created, {skipped} already there')
+
+            submitted = sum(generator.generate_belbin())
+            self.stdout.write(f'belbin results: {submitted} submitted')
+
+        if options['password']:
+            generator.set_password(options['password'])
+
+        self.stdout.write(self.style.SUCCESS(f'Dataset generated in {time.perf_counter() - started:.1f}s.'))
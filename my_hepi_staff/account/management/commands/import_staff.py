@@ -0,0 +1,66 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.importer import DEFAULT_BATCH_SIZE, StaffImporter, read_records
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = ('Bulk import competence catalogs, employers, employees and projects from CSV or JSON-lines files. '
+            'Records that already exist are skipped, so the import can be re-run safely.')
+
+    # dependency order: later kinds reference earlier ones
+    kinds = ['competences', 'employers', 'employees', 'projects']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--competences', help='Rows with group,name.')
+        parser.add_argument('--employers',
+                            help='Rows with username,password,email,first_name,last_name,company_name,address,post_code,city.')
+        parser.add_argument('--employees',
+                            help='Rows with username,password,email,first_name,last_name,address,post_code,city,'
+                                 'description,competences (";"-separated names or "Group/Name").')
+        parser.add_argument('--projects',
+                            help='Rows with code,title,description,employer (company name),competences,employees (usernames).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes used to hash passwords, defaults to the number of CPUs.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the import as a job for run_workers and exit; the files must be '
+                                 'readable by the workers.')
+
+    def handle(self, *args, **options):
+        if not any(options[kind] for kind in self.kinds):
+            raise CommandError(f"Pass at least one of {', '.join('--' + k for k in self.kinds)}.")
+
+        if options['background']:
+            paths = {kind: os.path.abspath(options[kind]) for kind in self.kinds if options[kind]}
+            job = enqueue('account.import_staff', batch_size=options['batch_size'],
+                          workers=options['workers'] or 1, **paths)
+            self.stdout.write(self.style.SUCCESS(f'Queued job {job.pk}.'))
+            return
+
+        with StaffImporter(batch_size=options['batch_size'], workers=options['workers']) as importer:
+            for kind in self.kinds:
+                if not options[kind]:
+                    continue
+
+                created = skipped = 0
+                seconds = 0.0
+                try:
+                    reports = getattr(importer, f'import_{kind}')(read_records(options[kind]))
+                    for report in reports:
+                        created += report.created
+                        skipped += report.skipped
+                        seconds += report.seconds
+                        self.stdout.write(f'{kind} batch {report.number}: {report.created} created, '
+                                          f'{report.skipped} skipped in {report.seconds:.2f}s '
+                                          f'({report.per_minute:,.0f}/min)')
+                        for error in report.errors:
+                            self.stderr.write(f'{kind}: {error}')
+                except (KeyError, ValueError) as e:
+                    raise CommandError(f'{kind}: {e}')
+
+                rate = created / seconds * 60 if seconds else 0.0
+                self.stdout.write(self.style.SUCCESS(
+                    f'{kind}: {created} created, {skipped} skipped in {seconds:.2f}s ({rate:,.0f}/min)'))
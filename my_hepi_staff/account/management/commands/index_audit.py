@@ -0,0 +1,116 @@
+import json
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from account import profiling
+
+
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+# FROM "account_employee" U0 / INNER JOIN "auth_user" T3: the plan names tables by alias
+TABLE_ALIAS = re.compile(r'(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?"?([A-Z]\d+)\b)?')
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)( USING (COVERING )?INDEX \w+)?$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(sql: str, params) -> list[str]:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[3] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN ' + sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(sql: str, plan: list[str]) -> set[str]:
+    """
+    Tables read in full. Walking an index is only counted when the rows are
+    sorted afterwards anyway; without the sort it serves ORDER BY/GROUP BY and
+    a LIMIT stops it early.
+    """
+    aliases = {alias or table: table for table, alias in TABLE_ALIAS.findall(sql)}
+    sorted_after = any(line.strip() == 'USE TEMP B-TREE FOR ORDER BY' for line in plan)
+    scans = set()
+    for line in plan:
+        if connection.vendor == 'sqlite':
+            match = SQLITE_SCAN.match(line.strip())
+            if match and match.group(2) and not sorted_after:
+                continue
+        else:
+            match = POSTGRES_SCAN.search(line)
+        if match and match.group(1) in aliases:
+            scans.add(aliases[match.group(1)])
+    return scans
+
+
+def allowed_scans(name: str) -> set[str]:
+    allowed = getattr(settings, 'INDEX_AUDIT_ALLOWED_SCANS', {})
+    return {*allowed.get('*', ()), *allowed.get(name, ())}
+
+
+class Command(BaseCommand):
+    help = ('Request every URL of account.urls as an employer and as an employee, run EXPLAIN over the SQL '
+            'each view issues and fail when a query scans a whole table that INDEX_AUDIT_ALLOWED_SCANS '
+            'does not allow for that view. Run it on a database of realistic size (and ANALYZEd): '
+            'the planner rightly scans tables of a few rows. Everything runs in one transaction that is '
+            'rolled back, so the logins write no sessions; on SQLite it holds the write lock for the '
+            'duration of the run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employer', help='Username to request employer pages as, defaults to the first employer.')
+        parser.add_argument('--employee', help='Username to request employee pages as, defaults to the first employee.')
+        parser.add_argument('--output', help='Write the plans of every query as JSON to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            users, samples = profiling.personas(options['employer'], options['employee'])
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        results = []
+        violations = []
+
+        with override_settings(ALLOWED_HOSTS=['testserver']), profiling.rolled_back():
+            for persona, user in users.items():
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+
+                for name, path in profiling.view_requests('account.urls', samples, skip=profiling.skip_view):
+                    with profiling.profile(name, path=path, keep_sql=True) as result:
+                        client.get(path)
+
+                    allowed = allowed_scans(name)
+                    seen = set()
+                    for sql, params in result.sql:
+                        if sql in seen or not sql.lstrip().upper().startswith(EXPLAINED):
+                            continue
+                        seen.add(sql)
+
+                        plan = explain(sql, params)
+                        scans = full_scans(sql, plan) - allowed
+                        results.append({'persona': persona, 'view': name, 'sql': sql, 'plan': plan,
+                                        'full_scans': sorted(scans)})
+
+                        if scans:
+                            violations.append(f'{persona} {name}: full scan of {", ".join(sorted(scans))}')
+                            self.stdout.write(self.style.WARNING(
+                                f'{persona:<8} {name:<32} full scan of {", ".join(sorted(scans))}'))
+                            self.stdout.write(f'    {sql}')
+                        if scans or options['verbosity'] > 1:
+                            for line in plan:
+                                self.stdout.write(f'    | {line}')
+
+                    self.stdout.write(f'{persona:<8} {name:<32} {len(seen)} distinct queries explained')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        if violations:
+            raise CommandError(f'{len(violations)} queries scan whole tables:\n' + '\n'.join(violations))
+
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} queries use indexes.'))
@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from account import profiling
+
+
+class Command(BaseCommand):
+    help = ('Request every URL of account.urls as an employer and as an employee against the current '
+            'database and fail when a view exceeds its query or latency budget (PROFILE_VIEW_BUDGETS). '
+            'Everything runs in one transaction that is rolled back, so the logins write no sessions; '
+            'on SQLite it holds the write lock for the duration of the run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employer', help='Username to request employer pages as, defaults to the first employer.')
+        parser.add_argument('--employee', help='Username to request employee pages as, defaults to the first employee.')
+        parser.add_argument('--max-queries', type=int, help='Override the query budget of every view.')
+        parser.add_argument('--max-ms', type=float, help='Override the latency budget of every view.')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per view; the fastest one counts.')
+        parser.add_argument('--output', help='Write the measurements as JSON to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            users, samples = profiling.personas(options['employer'], options['employee'])
+        except LookupError as e:
+            raise CommandError(str(e))
+        results = []
+        violations = []
+
+        with override_settings(ALLOWED_HOSTS=['testserver']), profiling.rolled_back():
+            for persona, user in users.items():
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+
+                for name, path in profiling.view_requests('account.urls', samples, skip=profiling.skip_view):
+                    runs = []
+                    for _ in range(max(1, options['repeat'])):
+                        with profiling.profile(name, path=path) as result:
+                            response = client.get(path)
+                        result.status = response.status_code
+                        runs.append(result)
+
+                    best = min(runs, key=lambda r: r.total_ms)
+                    results.append({'persona': persona, **best.as_dict()})
+                    violations.extend(self.check_budget(persona, best, options))
+
+                    self.stdout.write(f'{persona:<8} {name:<32} {best.status} {best.queries:>4} queries '
+                                      f'({best.similar} similar) {best.total_ms:8.1f} ms '
+                                      f'[sql {best.sql_ms:.1f}, template {best.template_ms:.1f}, '
+                                      f'python {best.python_ms:.1f}]')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        if violations:
+            raise CommandError('Budget exceeded:\n' + '\n'.join(violations))
+
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} requests within budget.'))
+
+    def check_budget(self, persona, result, options):
+        budget = profiling.budget_for(result.view)
+        max_queries = options['max_queries'] if options['max_queries'] is not None else budget.get('queries')
+        max_ms = options['max_ms'] if options['max_ms'] is not None else budget.get('ms')
+
+        if result.status >= 500:
+            yield f'{persona} {result.view}: HTTP {result.status}'
+        if max_queries is not None and result.queries > max_queries:
+            yield f'{persona} {result.view}: {result.queries} queries > {max_queries}'
+        if max_ms is not None and result.total_ms > max_ms:
+            yield f'{persona} {result.view}: {result.total_ms:.1f} ms > {max_ms} ms'
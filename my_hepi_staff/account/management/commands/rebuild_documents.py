@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.documents import document_drift, rebuild_documents
+
+
+class Command(BaseCommand):
+    help = ('Rewrite the denormalized employee documents read by the employer views from the source tables. '
+            'Needed after writes that bypass signals (raw SQL, bulk_create/bulk_update outside import_staff).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only compare the documents with the source tables and fail when they differ.')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = document_drift()
+            for pk, fields in sorted(drift.items()):
+                self.stdout.write(f'employee {pk}: {", ".join(fields)}')
+            if drift:
+                raise CommandError(f'{len(drift)} employee documents differ.')
+            self.stdout.write(self.style.SUCCESS('Documents match the source tables.'))
+            return
+
+        written = rebuild_documents()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} employee documents.'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.analytics import group_report, live_group_report, rebuild_rollups, rollup_drift
+
+
+class Command(BaseCommand):
+    help = ('Recount the competence supply/demand rollups behind the analytics page from the through tables. '
+            'Needed after writes that bypass signals (raw SQL, bulk_create outside import_staff).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only compare the rollups with a live count and fail when they differ.')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = rollup_drift()
+            for pk, (stored, live) in sorted(drift.items()):
+                self.stdout.write(f'competence {pk}: stored (employees, projects) {stored}, live {live}')
+            groups_differ = group_report() != live_group_report()
+            if drift or groups_differ:
+                raise CommandError(f'{len(drift)} competence rollups differ'
+                                   + (', group rollups differ' if groups_differ else '') + '.')
+            self.stdout.write(self.style.SUCCESS('Rollups match the live counts.'))
+            return
+
+        competences, groups = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {competences} competence and {groups} group rollups.'))
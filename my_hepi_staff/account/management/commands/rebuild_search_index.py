@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from account.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the employee full-text search index from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=['auto', 'fts5', 'python'], default=None,
+                            help='Defaults to EMPLOYEE_SEARCH_BACKEND.')
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['backend'])
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the {backend.name} search index.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.rescoring import rescore_file, rescore_submissions
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = ('Re-score stored raw Belbin answers with the current role mapping and score ranges, '
+            'updating the submissions\' role scores and Employee.belbin_test_result.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-file', dest='source',
+                            help='Score answers from a CSV or JSON-lines file with username and answers '
+                                 '(56 values, ";"-separated in CSV, a list in JSON) instead of the '
+                                 'stored submissions.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Score without saving.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the stored submissions re-score as a job for run_workers and exit.')
+
+    def handle(self, *args, **options):
+        if options['background']:
+            if options['source']:
+                raise CommandError('--background re-scores the stored submissions, drop --from-file.')
+            job = enqueue('account.rescore_belbin', batch_size=options['batch_size'], dry_run=options['dry_run'])
+            self.stdout.write(self.style.SUCCESS(f'Queued job {job.pk}.'))
+            return
+
+        if options['source']:
+            try:
+                updated, unchanged = rescore_file(options['source'], options['batch_size'], options['dry_run'])
+            except (KeyError, ValueError) as e:
+                raise CommandError(f'Invalid answers: {e}')
+        else:
+            updated, unchanged = rescore_submissions(options['batch_size'], options['dry_run'])
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {updated} employees, {unchanged} unchanged.'))
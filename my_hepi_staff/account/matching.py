@@ -0,0 +1,128 @@
+import heapq
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .models import EmployeeDocument
+from .versioning import ProcessLocal
+
+
+MATRIX_VERSION_KEY = 'account:matching:version'
+
+
+@dataclass
+class Match:
+    employee_id: int
+    covered: int
+    required: int
+    jaccard: float
+    missing: list[int] = field(default_factory=list)
+
+    @property
+    def coverage(self) -> float:
+        return self.covered / self.required if self.required else 0.0
+
+
+class CompetenceMatrix:
+    """
+    Employee competences packed as one integer bitset per employee.
+
+    Bit ``i`` of a row is set when the employee has the competence at
+    position ``i`` of ``competence_ids``, so coverage and Jaccard against a
+    project are a couple of ``&``/``|`` and ``bit_count()`` calls per row.
+    """
+
+    def __init__(self, employee_ids: list[int], rows: list[int], competence_ids: list[int]):
+        self.employee_ids = employee_ids
+        self.rows = rows
+        self.competence_ids = competence_ids
+        self.positions = {pk: i for i, pk in enumerate(competence_ids)}
+
+    @classmethod
+    def build(cls) -> 'CompetenceMatrix':
+        # one scan of the document table, competences come packed per employee
+        documents = (EmployeeDocument.objects
+                     .filter(is_active=True)
+                     .order_by('pk')
+                     .values_list('pk', 'raw_competence_ids'))
+
+        held = []
+        for employee_id, raw in documents.iterator(chunk_size=5000):
+            if raw:
+                held.append((employee_id, array('I', bytes(raw))))
+
+        competence_ids = sorted({pk for _, ids in held for pk in ids})
+        positions = {pk: i for i, pk in enumerate(competence_ids)}
+
+        employee_ids = []
+        rows = []
+        for employee_id, ids in held:
+            row = 0
+            for pk in ids:
+                row |= 1 << positions[pk]
+            employee_ids.append(employee_id)
+            rows.append(row)
+
+        return cls(employee_ids, rows, competence_ids)
+
+    def mask(self, competence_ids: Iterable[int]) -> tuple[int, list[int]]:
+        """Return the bitset of ``competence_ids`` and the ids nobody has."""
+        bits = 0
+        unknown = []
+        for pk in set(competence_ids):
+            position = self.positions.get(pk)
+            if position is None:
+                unknown.append(pk)
+            else:
+                bits |= 1 << position
+        return bits, sorted(unknown)
+
+    def decode(self, bits: int) -> list[int]:
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self.competence_ids[low.bit_length() - 1])
+            bits ^= low
+        return result
+
+    def rank(self, competence_ids: Iterable[int], limit: int = 10, exclude: Iterable[int] = ()) -> list[Match]:
+        required, unknown = self.mask(competence_ids)
+        n_required = required.bit_count() + len(unknown)
+        if not required:
+            return []
+
+        excluded = set(exclude)
+        rows = self.rows
+        employee_ids = self.employee_ids
+        n_unknown = len(unknown)
+
+        # Rank by coverage first, Jaccard breaks ties in favour of specialists.
+        def key(i):
+            covered = (rows[i] & required).bit_count()
+            return covered, covered / ((rows[i] | required).bit_count() + n_unknown)
+
+        candidates = (i for i in range(len(rows))
+                      if rows[i] & required and employee_ids[i] not in excluded)
+        best = heapq.nlargest(limit, candidates, key=key)
+
+        matches = []
+        for i in best:
+            covered, jaccard = key(i)
+            missing = self.decode(required & ~rows[i]) + unknown
+            matches.append(Match(employee_ids[i], covered, n_required, jaccard, sorted(missing)))
+        return matches
+
+
+_matrix = ProcessLocal(MATRIX_VERSION_KEY, CompetenceMatrix.build)
+
+
+def get_matrix() -> CompetenceMatrix:
+    return _matrix.get()
+
+
+def invalidate_matrix() -> None:
+    _matrix.invalidate()
+
+
+def rank_employees(competence_ids: Iterable[int], limit: int = 10, exclude: Iterable[int] = ()) -> list[Match]:
+    return get_matrix().rank(competence_ids, limit=limit, exclude=exclude)
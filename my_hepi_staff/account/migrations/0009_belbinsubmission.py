@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_employee_belbin_test_result'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='belbin_test_result',
+            field=models.CharField(default='N/A', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='BelbinSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('raw_answers', models.BinaryField(max_length=56)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('po', models.PositiveSmallIntegerField(default=0)),
+                ('nl', models.PositiveSmallIntegerField(default=0)),
+                ('cza', models.PositiveSmallIntegerField(default=0)),
+                ('sie', models.PositiveSmallIntegerField(default=0)),
+                ('czk', models.PositiveSmallIntegerField(default=0)),
+                ('se', models.PositiveSmallIntegerField(default=0)),
+                ('czg', models.PositiveSmallIntegerField(default=0)),
+                ('per', models.PositiveSmallIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='belbin_submissions', to='account.employee')),
+            ],
+            options={
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['employee', '-created'], name='account_bel_employe_b5de3a_idx')],
+            },
+        ),
+    ]
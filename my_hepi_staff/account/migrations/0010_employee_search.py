@@ -0,0 +1,64 @@
+import unicodedata
+
+from django.db import OperationalError, migrations
+
+
+TABLE = 'account_employee_search'
+
+
+# a copy of account.search.fold as of this migration, so later changes to it don't alter history
+def fold(text):
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text.lower().replace('ł', 'l'))
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def create_search_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+            "name, city, competences, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        # SQLite built without FTS5; the pure-Python backend is used instead
+        return
+
+    Employee = apps.get_model('account', 'Employee')
+    rows = []
+    for employee in Employee.objects.filter(is_active=True).select_related('account__user') \
+            .prefetch_related('competences'):
+        user = employee.account.user
+        rows.append((
+            employee.pk,
+            fold(f'{user.first_name} {user.last_name}'),
+            fold(employee.city),
+            fold(' '.join(c.name for c in employee.competences.all())),
+            fold(employee.description),
+        ))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, name, city, competences, description) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_belbinsubmission'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
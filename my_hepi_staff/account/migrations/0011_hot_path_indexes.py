@@ -0,0 +1,58 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+# Indexes Django cannot declare on the models: on the auto-created M2M tables,
+# on auth_user, and the case-insensitive city lookup (city__iexact is LIKE on
+# SQLite, which only uses a NOCASE index, and UPPER() on PostgreSQL)
+INDEXES = [
+    # directory pages are ordered by last name; LIMIT stops after the first page
+    ('account_user_last_name_idx', 'auth_user', '("last_name")'),
+    # reverse M2M lookups read both columns from the index alone
+    ('account_employee_competences_competence_employee_idx', 'account_employee_competences',
+     '("competence_id", "employee_id")'),
+    ('account_project_employees_employee_project_idx', 'account_project_employees',
+     '("employee_id", "project_id")'),
+    ('account_project_competences_competence_project_idx', 'account_project_competences',
+     '("competence_id", "project_id")'),
+]
+CITY_INDEX = 'account_employee_city_ci_idx'
+CITY_COLUMNS = {
+    'sqlite': '("city" COLLATE NOCASE)',
+    'postgresql': '(UPPER("city"::text))',
+}
+
+
+def create_indexes(apps, schema_editor):
+    for name, table, columns in INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" {columns}')
+
+    columns = CITY_COLUMNS.get(schema_editor.connection.vendor)
+    if columns:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{CITY_INDEX}" ON "account_employee" {columns}')
+
+
+def drop_indexes(apps, schema_editor):
+    for name in [CITY_INDEX] + [name for name, _, _ in INDEXES]:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_employee_search'),
+        ('competence', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['is_active', 'belbin_test_result'], name='account_emp_is_acti_1ffc66_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['employer', 'code'], name='account_pro_employe_322346_idx'),
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:02
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# the covering index from 0011; SQLite rebuilds the table to add a NOT NULL
+# column and only recreates the indexes the model state knows about
+EMPLOYEE_PROJECT_INDEX = 'account_project_employees_employee_project_idx'
+
+
+def create_employee_project_index(apps, schema_editor):
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{EMPLOYEE_PROJECT_INDEX}" '
+                          f'ON "account_project_employees" ("employee_id", "project_id")')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        # turn the auto-created through table of Project.employees into the
+        # Assignment model without touching the table or its rows
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Assignment',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='account.project')),
+                        ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='account.employee')),
+                    ],
+                    options={
+                        'db_table': 'account_project_employees',
+                        'unique_together': {('project', 'employee')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='project',
+                    name='employees',
+                    field=models.ManyToManyField(blank=True, related_name='projects', through='account.Assignment', to='account.employee'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='start_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='end_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='allocation',
+            field=models.PositiveSmallIntegerField(default=100, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['employee', 'end_date', 'start_date', 'allocation'], name='account_assignment_period_idx'),
+        ),
+        migrations.RunPython(create_employee_project_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_rollups(apps, schema_editor):
+    # the same counts as account.analytics.rebuild_rollups, on the historical models
+    Competence = apps.get_model('competence', 'Competence')
+    Group = apps.get_model('competence', 'Group')
+    Employee = apps.get_model('account', 'Employee')
+    Project = apps.get_model('account', 'Project')
+    CompetenceRollup = apps.get_model('account', 'CompetenceRollup')
+    GroupRollup = apps.get_model('account', 'GroupRollup')
+
+    def counts(through, **filters):
+        return dict(through.objects.filter(**filters).order_by().values('competence_id')
+                    .annotate(n=Count('*')).values_list('competence_id', 'n'))
+
+    supply = counts(Employee.competences.through, employee__is_active=True)
+    demand = counts(Project.competences.through)
+    groups = {pk: GroupRollup(group_id=pk) for pk in Group.objects.values_list('pk', flat=True)}
+    rollups = []
+    for pk, group_id in Competence.objects.values_list('pk', 'competence_group_id'):
+        employees, projects = supply.get(pk, 0), demand.get(pk, 0)
+        rollups.append(CompetenceRollup(competence_id=pk, employees=employees, projects=projects,
+                                        gap=projects - employees))
+        group = groups[group_id]
+        group.competences += 1
+        group.employees += employees
+        group.projects += projects
+        if projects > employees:
+            group.under_supplied += 1
+            group.shortfall += projects - employees
+
+    CompetenceRollup.objects.bulk_create(rollups, batch_size=1000)
+    GroupRollup.objects.bulk_create(groups.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_assignment'),
+        ('competence', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetenceRollup',
+            fields=[
+                ('competence', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='competence.competence')),
+                ('employees', models.IntegerField(default=0)),
+                ('projects', models.IntegerField(default=0)),
+                ('gap', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupRollup',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='competence.group')),
+                ('competences', models.IntegerField(default=0)),
+                ('employees', models.IntegerField(default=0)),
+                ('projects', models.IntegerField(default=0)),
+                ('under_supplied', models.IntegerField(default=0)),
+                ('shortfall', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
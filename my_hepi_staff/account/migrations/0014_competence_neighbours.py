@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0013_competence_rollups'),
+        ('competence', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetenceNeighbours',
+            fields=[
+                ('competence', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbours', serialize=False, to='competence.competence')),
+                ('raw_ids', models.BinaryField()),
+                ('raw_scores', models.BinaryField()),
+                ('computed', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:40
+
+from array import array
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# account.belbin.role_mask as of this migration, for every level: bit i is set for the i-th role in the text
+ROLES = ['PO', 'NL', 'CZA', 'SIE', 'CZK', 'SĘ', 'CZG', 'PER']
+
+
+def role_mask(text):
+    mask = 0
+    for token in (text or '').split(','):
+        token = token.strip()
+        role = token[:-1] if token[-1:] in ('^', '*') else token
+        if role in ROLES:
+            mask |= 1 << ROLES.index(role)
+    return mask
+
+
+CITY_INDEX = 'account_document_city_ci_idx'
+# as for account_employee in 0011: city__iexact is LIKE on SQLite and UPPER() on PostgreSQL
+CITY_COLUMNS = {
+    'sqlite': '("city" COLLATE NOCASE)',
+    'postgresql': '(UPPER("city"::text))',
+}
+
+
+def create_city_index(apps, schema_editor):
+    columns = CITY_COLUMNS.get(schema_editor.connection.vendor)
+    if columns:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{CITY_INDEX}" ON "account_employeedocument" {columns}')
+
+
+def drop_city_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{CITY_INDEX}"')
+
+
+def fill_documents(apps, schema_editor):
+    # the same rows as account.documents.rebuild_documents, on the historical models
+    Employee = apps.get_model('account', 'Employee')
+    Assignment = apps.get_model('account', 'Assignment')
+    EmployeeDocument = apps.get_model('account', 'EmployeeDocument')
+
+    competences = {}
+    for employee_id, competence_id in Employee.competences.through.objects.values_list('employee_id', 'competence_id'):
+        competences.setdefault(employee_id, []).append(competence_id)
+    projects = dict(Assignment.objects.order_by().values('employee_id').annotate(n=Count('*'))
+                    .values_list('employee_id', 'n'))
+
+    rows = Employee.objects.values_list('pk', 'account__user__username', 'account__user__first_name',
+                                        'account__user__last_name', 'account__user__email', 'city',
+                                        'is_active', 'belbin_test_result')
+    EmployeeDocument.objects.bulk_create(
+        (EmployeeDocument(employee_id=pk, username=username, first_name=first_name, last_name=last_name,
+                          email=email, city=city, is_active=is_active, belbin_test_result=result,
+                          belbin_roles=role_mask(result),
+                          raw_competence_ids=array('I', sorted(competences.get(pk, ()))).tobytes(),
+                          project_count=projects.get(pk, 0))
+         for pk, username, first_name, last_name, email, city, is_active, result in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0014_competence_neighbours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDocument',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='account.employee')),
+                ('username', models.CharField(max_length=150)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('city', models.CharField(max_length=150)),
+                ('is_active', models.BooleanField(default=True)),
+                ('belbin_test_result', models.CharField(default='N/A', max_length=64)),
+                ('belbin_roles', models.PositiveIntegerField(default=0)),
+                ('raw_competence_ids', models.BinaryField(default=b'')),
+                ('project_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_name', 'employee'], name='account_document_name_idx')],
+            },
+        ),
+        migrations.RunPython(create_city_index, drop_city_index),
+        migrations.RunPython(fill_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0015_employee_documents'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeedocument',
+            index=models.Index(fields=['is_active', 'belbin_test_result', 'project_count', 'employee'], name='account_document_team_idx'),
+        ),
+    ]
@@ -1,8 +1,13 @@
+from array import array
+
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
-from competence.models import Competence
+from competence.models import Competence, Group
+from .belbin import ANSWERS, POINTS_PER_GROUP, ROLES
 
 class Account(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -25,7 +30,14 @@ class Employee(models.Model):
                                          related_name='competence_joined',
                                          blank=True)
     description = models.TextField(blank=True, null=True)
-    belbin_test_result = models.CharField(max_length=10, blank=False, default='N/A', null=False)
+    belbin_test_result = models.CharField(max_length=64, blank=False, default='N/A', null=False)
+
+    class Meta:
+        indexes = [
+            # team building reads every active employee with a Belbin result;
+            # the case-insensitive city index is created in migration 0011
+            models.Index(fields=['is_active', 'belbin_test_result']),
+        ]
 
     def get_absolute_url(self):
         return reverse("employee-update", kwargs={"pk": self.pk})
@@ -65,16 +77,212 @@ class Project(models.Model):
     competences = models.ManyToManyField(Competence,
                                          related_name='project_competence_joined',
                                          blank=True)
-    employees = models.ManyToManyField(Employee, related_name='projects', blank=True)
-    
+    employees = models.ManyToManyField(Employee, related_name='projects', blank=True, through='Assignment')
+
     class Meta:
         ordering = ['code']
         indexes = [
-            models.Index(fields=['code'])
+            models.Index(fields=['code']),
+            models.Index(fields=['employer', 'code']),
         ]
 
     def get_absolute_url(self):
         return reverse("project-list")
 
     def __str__(self) -> str:
-        return self.title    
+        return self.title
+
+
+class Assignment(models.Model):
+    """
+    An employee on a project for a period, at ``allocation`` percent of full
+    time. A missing start or end date leaves the period open on that side, so
+    rows created before assignments had dates count as ongoing.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='assignments')
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='assignments')
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    allocation = models.PositiveSmallIntegerField(default=100,
+                                                  validators=[MinValueValidator(1), MaxValueValidator(100)])
+
+    class Meta:
+        # the table of the former auto-created Project.employees through model
+        db_table = 'account_project_employees'
+        unique_together = [('project', 'employee')]
+        indexes = [
+            # availability sums the allocations of one employee's assignments
+            # that end after the period starts, reading them from the index alone
+            models.Index(fields=['employee', 'end_date', 'start_date', 'allocation'],
+                         name='account_assignment_period_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.employee} @ {self.project} ({self.allocation}%)'
+
+
+# BelbinSubmission column for each Belbin role code
+ROLE_FIELDS = dict(zip(ROLES, ['po', 'nl', 'cza', 'sie', 'czk', 'se', 'czg', 'per']))
+
+
+class BelbinSubmissionQuerySet(models.QuerySet):
+
+    def latest_per_employee(self):
+        latest = BelbinSubmission.objects.filter(employee_id=OuterRef('employee_id')) \
+            .order_by('-created', '-pk').values('pk')[:1]
+        return self.filter(pk=Subquery(latest))
+
+    def role_totals(self) -> dict[str, int]:
+        totals = self.aggregate(**{field: Sum(field) for field in ROLE_FIELDS.values()})
+        return {role: totals[field] or 0 for role, field in ROLE_FIELDS.items()}
+
+
+class BelbinSubmission(models.Model):
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='belbin_submissions')
+    # the 56 answers, one unsigned byte each, in group/question order
+    raw_answers = models.BinaryField(max_length=ANSWERS)
+    created = models.DateTimeField(auto_now_add=True)
+    po = models.PositiveSmallIntegerField(default=0)
+    nl = models.PositiveSmallIntegerField(default=0)
+    cza = models.PositiveSmallIntegerField(default=0)
+    sie = models.PositiveSmallIntegerField(default=0)
+    czk = models.PositiveSmallIntegerField(default=0)
+    se = models.PositiveSmallIntegerField(default=0)
+    czg = models.PositiveSmallIntegerField(default=0)
+    per = models.PositiveSmallIntegerField(default=0)
+
+    objects = BelbinSubmissionQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['employee', '-created']),
+        ]
+
+    @property
+    def answers(self) -> list[int]:
+        return list(array('B', bytes(self.raw_answers)))
+
+    @answers.setter
+    def answers(self, values) -> None:
+        if len(values) != ANSWERS:
+            raise ValueError(f'Expected {ANSWERS} answers, got {len(values)}.')
+        if any(not 0 <= value <= POINTS_PER_GROUP for value in values):
+            raise ValueError(f'Answers must be between 0 and {POINTS_PER_GROUP}.')
+        self.raw_answers = array('B', values).tobytes()
+
+    @property
+    def scores(self) -> list[int]:
+        return [getattr(self, field) for field in ROLE_FIELDS.values()]
+
+    @scores.setter
+    def scores(self, values) -> None:
+        for field, value in zip(ROLE_FIELDS.values(), values):
+            setattr(self, field, value)
+
+    def __str__(self) -> str:
+        return f'{self.employee} ({self.created:%Y-%m-%d %H:%M})'
+
+
+class CompetenceRollup(models.Model):
+    """
+    Supply of and demand for one competence across the organisation, kept
+    current by ``account.signals`` (see ``account.analytics``) and rebuilt by
+    the ``rebuild_rollups`` command.
+    """
+    competence = models.OneToOneField(Competence, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    # active employees who have the competence
+    employees = models.IntegerField(default=0)
+    # projects that require it
+    projects = models.IntegerField(default=0)
+    # projects - employees, positive when under-supplied
+    gap = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.competence}: {self.employees} employees, {self.projects} projects'
+
+
+class GroupRollup(models.Model):
+    """Sums of the ``CompetenceRollup`` rows of one competence group."""
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    competences = models.IntegerField(default=0)
+    employees = models.IntegerField(default=0)
+    projects = models.IntegerField(default=0)
+    # competences with more projects than employees, and by how many projects in total
+    under_supplied = models.IntegerField(default=0)
+    shortfall = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.group}: {self.under_supplied} under-supplied competences'
+
+
+class CompetenceNeighbours(models.Model):
+    """
+    The competences most often held together with one competence, written by
+    the ``compute_similarity`` command (see ``account.similarity``).
+    """
+    competence = models.OneToOneField(Competence, on_delete=models.CASCADE, primary_key=True,
+                                      related_name='neighbours')
+    # neighbour pks as unsigned 32-bit ints and their cosine similarity as
+    # unsigned 16-bit ints scaled by SCORE_SCALE, best first
+    raw_ids = models.BinaryField()
+    raw_scores = models.BinaryField()
+    computed = models.DateTimeField(auto_now=True)
+
+    SCORE_SCALE = 65535
+
+    @property
+    def neighbours(self) -> list[tuple[int, float]]:
+        scores = array('H', bytes(self.raw_scores))
+        return [(pk, score / self.SCORE_SCALE) for pk, score in zip(array('I', bytes(self.raw_ids)), scores)]
+
+    @neighbours.setter
+    def neighbours(self, values) -> None:
+        self.raw_ids = array('I', [pk for pk, _ in values]).tobytes()
+        self.raw_scores = array('H', [round(score * self.SCORE_SCALE) for _, score in values]).tobytes()
+
+    def __str__(self) -> str:
+        return f'{self.competence}: {len(self.neighbours)} neighbours'
+
+
+class EmployeeDocument(models.Model):
+    """
+    Denormalized read model of one employee for the employer views: user,
+    employee, competence and assignment data in a single row, kept current by
+    ``account.signals`` (see ``account.documents``) and rebuilt by the
+    ``rebuild_documents`` command.
+    """
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    username = models.CharField(max_length=150)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+    city = models.CharField(max_length=150)
+    is_active = models.BooleanField(default=True)
+    belbin_test_result = models.CharField(max_length=64, default='N/A')
+    # every role in the result, whatever its level (see belbin.ROLE_BITS)
+    belbin_roles = models.PositiveIntegerField(default=0)
+    # sorted competence pks as unsigned 32-bit ints
+    raw_competence_ids = models.BinaryField(default=b'')
+    project_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # directory pages and their keyset cursor; the case-insensitive
+            # city index is created in migration 0015
+            models.Index(fields=['last_name', 'employee'], name='account_document_name_idx'),
+            # team building reads the role and load of every active employee from the index alone
+            models.Index(fields=['is_active', 'belbin_test_result', 'project_count', 'employee'],
+                         name='account_document_team_idx'),
+        ]
+
+    @property
+    def competence_ids(self) -> list[int]:
+        return list(array('I', bytes(self.raw_competence_ids)))
+
+    @competence_ids.setter
+    def competence_ids(self, values) -> None:
+        self.raw_competence_ids = array('I', sorted(values)).tobytes()
+
+    def __str__(self) -> str:
+        return self.first_name + ' ' + self.last_name
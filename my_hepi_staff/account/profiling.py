@@ -0,0 +1,350 @@
+import contextvars
+import importlib
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, transaction
+from django.template import base as template_base
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+
+@dataclass
+class Profile:
+    view: str
+    path: str = ''
+    method: str = 'GET'
+    status: int = 0
+    queries: int = 0
+    duplicates: int = 0
+    similar: int = 0
+    sql_ms: float = 0.0
+    template_ms: float = 0.0
+    python_ms: float = 0.0
+    total_ms: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+    # (sql, params) of every statement, only filled with keep_sql=True
+    sql: list[tuple[str, object]] = field(default_factory=list, repr=False)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop('sql')
+        return data
+
+
+class _Collector:
+    def __init__(self, keep_sql: bool = False):
+        self.keep_sql = keep_sql
+        self.statements = []
+        self.executed = []
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.statements.append((sql, repr(params)))
+            if self.keep_sql and not many:
+                self.executed.append((sql, params))
+
+
+_collector = contextvars.ContextVar('profiling_collector', default=None)
+_original_render = template_base.Template.render
+
+
+def _timed_render(self, context):
+    collector = _collector.get()
+    if collector is None:
+        return _original_render(self, context)
+
+    # {% include %} and {% extends %} render nested templates; count the outermost only
+    collector.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        collector.template_depth -= 1
+        if not collector.template_depth:
+            collector.template_seconds += time.perf_counter() - started
+
+
+def install_template_timing() -> None:
+    """Route ``Template.render`` through the collector; done on first use, so it costs nothing when off."""
+    if template_base.Template.render is not _timed_render:
+        template_base.Template.render = _timed_render
+
+
+def _wrap_connections(stack: ExitStack, collector: _Collector) -> None:
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(collector))
+
+
+def _finish(result: Profile, collector: _Collector, started: float) -> None:
+    exact = Counter(collector.statements)
+    similar = Counter(sql for sql, _ in collector.statements)
+    result.queries = len(collector.statements)
+    result.duplicates = sum(n - 1 for n in exact.values())
+    result.similar = sum(n - 1 for n in similar.values())
+    result.sql_ms = collector.sql_seconds * 1000
+    result.template_ms = collector.template_seconds * 1000
+    result.total_ms = (time.perf_counter() - started) * 1000
+    result.python_ms = max(0.0, result.total_ms - result.sql_ms - result.template_ms)
+    if collector.keep_sql:
+        result.sql = collector.executed
+
+
+@contextmanager
+def profile(view: str, path: str = '', method: str = 'GET', keep_sql: bool = False) -> Iterator[Profile]:
+    """
+    Measure SQL, template and remaining Python time of the enclosed block.
+    The yielded Profile is filled in when the block exits.
+    """
+    install_template_timing()
+    result = Profile(view=view, path=path, method=method)
+    collector = _Collector(keep_sql=keep_sql)
+    token = _collector.set(collector)
+    started = time.perf_counter()
+
+    try:
+        with ExitStack() as stack:
+            _wrap_connections(stack, collector)
+            yield result
+    finally:
+        _collector.reset(token)
+        _finish(result, collector, started)
+
+
+@asynccontextmanager
+async def aprofile(view: str, path: str = '', method: str = 'GET') -> AsyncIterator[Profile]:
+    """
+    ``profile()`` for async code. Connections belong to a thread, so the SQL
+    wrappers go on those of the thread ``sync_to_async`` runs the queries in.
+    """
+    install_template_timing()
+    result = Profile(view=view, path=path, method=method)
+    collector = _Collector()
+    token = _collector.set(collector)
+    started = time.perf_counter()
+    stack = ExitStack()
+
+    try:
+        await sync_to_async(_wrap_connections)(stack, collector)
+        yield result
+    finally:
+        await sync_to_async(stack.close)()
+        _collector.reset(token)
+        _finish(result, collector, started)
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer of the most recent request profiles."""
+
+    def __init__(self, size: int):
+        self._items = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, item: Profile) -> None:
+        with self._lock:
+            self._items.append(item)
+
+    def snapshot(self) -> list[Profile]:
+        with self._lock:
+            return list(self._items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+buffer = ProfileBuffer(getattr(settings, 'PROFILING_BUFFER_SIZE', 1000))
+
+
+def view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class ProfilingMiddleware:
+    """
+    Records per-request SQL count, duplicated/similar SQL, SQL time, template
+    render time and remaining Python time into ``buffer``.
+    Enabled with ``PROFILING_ENABLED``; otherwise it is left out of the chain.
+    Works in both modes, so it never forces async views onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with profile('unresolved', path=request.path, method=request.method) as result:
+            response = self.get_response(request)
+        return self.record(request, response, result)
+
+    async def __acall__(self, request):
+        async with aprofile('unresolved', path=request.path, method=request.method) as result:
+            response = await self.get_response(request)
+        return self.record(request, response, result)
+
+    def record(self, request, response, result: Profile):
+        result.view = view_name(request)
+        result.status = response.status_code
+        buffer.append(result)
+        return response
+
+
+def summarize(profiles: list[Profile]) -> dict[str, dict]:
+    summary = defaultdict(lambda: defaultdict(float))
+    for p in profiles:
+        row = summary[p.view]
+        row['requests'] += 1
+        row['queries'] += p.queries
+        row['duplicates'] += p.duplicates
+        row['similar'] += p.similar
+        row['sql_seconds'] += p.sql_ms / 1000
+        row['template_seconds'] += p.template_ms / 1000
+        row['python_seconds'] += p.python_ms / 1000
+        row['max_queries'] = max(row['max_queries'], p.queries)
+        row['max_seconds'] = max(row['max_seconds'], p.total_ms / 1000)
+    return summary
+
+
+def prometheus_text(profiles: list[Profile]) -> str:
+    metrics = [
+        ('requests', 'counter', 'Profiled requests.'),
+        ('queries', 'counter', 'SQL queries executed.'),
+        ('duplicates', 'counter', 'SQL queries repeated with identical parameters.'),
+        ('similar', 'counter', 'SQL queries repeated with different parameters (N+1 candidates).'),
+        ('sql_seconds', 'counter', 'Time spent in SQL.'),
+        ('template_seconds', 'counter', 'Time spent rendering templates.'),
+        ('python_seconds', 'counter', 'Time spent outside SQL and templates.'),
+        ('max_queries', 'gauge', 'Most SQL queries seen in a single request.'),
+        ('max_seconds', 'gauge', 'Slowest request.'),
+    ]
+    summary = summarize(profiles)
+    lines = []
+    for name, kind, help_text in metrics:
+        metric = f'myhepistaff_view_{name}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for view, row in sorted(summary.items()):
+            label = view.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{metric}{{view="{label}"}} {row[name]:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def budget_for(name: str) -> dict[str, float]:
+    budgets = getattr(settings, 'PROFILE_VIEW_BUDGETS', {})
+    return {**budgets.get('*', {}), **budgets.get(name, {})}
+
+
+def iter_url_patterns(patterns=None, prefix: str = '') -> Iterator[tuple[str, URLPattern]]:
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            yield from iter_url_patterns(entry.url_patterns, prefix + str(entry.pattern))
+        elif isinstance(entry, URLPattern):
+            yield prefix + str(entry.pattern), entry
+
+
+def sample_kwargs(pattern: URLPattern, samples: dict[str, object]) -> Optional[dict]:
+    """
+    Fill the URL converters of ``pattern`` from ``samples`` (model name -> instance).
+    ``pk`` is taken from the view's model, or the project when the view has none.
+    """
+    view_class = getattr(pattern.callback, 'view_class', None)
+    kwargs = {}
+    for name in pattern.pattern.converters:
+        if name == 'pk':
+            model = getattr(view_class, 'model', None)
+            sample = samples.get(model.__name__.lower() if model else 'project')
+        elif name.endswith('_id'):
+            sample = samples.get(name[:-3])
+        elif name == 'kind':
+            kwargs[name] = 'employees'
+            continue
+        else:
+            sample = None
+
+        if sample is None:
+            return None
+        kwargs[name] = sample.pk
+    return kwargs
+
+
+def view_requests(urlconf: str, samples: dict[str, object],
+                  skip: Callable[[str], bool] = lambda name: False) -> Iterator[tuple[str, str]]:
+    """Yield ``(url name, path)`` for every GET-able, named URL of the ``urlconf`` module."""
+    module = importlib.import_module(urlconf)
+    for _, pattern in iter_url_patterns(module.urlpatterns):
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if not pattern.name or skip(pattern.name):
+            continue
+        if view_class is not None and not hasattr(view_class, 'get'):
+            continue
+
+        kwargs = sample_kwargs(pattern, samples)
+        if kwargs is None:
+            continue
+        yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+
+def skip_view(name: str) -> bool:
+    # views that change the session or only report on other requests
+    return name in ('login', 'logout') or name.startswith('profiling')
+
+
+@contextmanager
+def rolled_back() -> Iterator[None]:
+    """
+    Run the block in a transaction that is rolled back, so the sessions the
+    ``personas`` log in with, and anything a view writes, leave no trace.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def personas(employer: Optional[str] = None, employee: Optional[str] = None) -> tuple[dict, dict]:
+    """
+    Users to request pages as, ``{'employer': user, 'employee': user}``, and the
+    sample objects for ``view_requests``. Defaults to the first of each.
+    """
+    from .models import Employee, Employer, Project
+
+    employers = Employer.objects.select_related('account__user')
+    employees = Employee.objects.select_related('account__user')
+    if employer:
+        employers = employers.filter(account__user__username=employer)
+    if employee:
+        employees = employees.filter(account__user__username=employee)
+
+    employer = employers.first()
+    employee = employees.first()
+    if employer is None or employee is None:
+        raise LookupError('Seed at least one employer and one employee first (see import_staff).')
+
+    project = Project.objects.filter(employer=employer).first() or Project.objects.first()
+    samples = {'employer': employer, 'employee': employee, 'project': project}
+    return {'employer': employer.account.user, 'employee': employee.account.user}, samples
@@ -0,0 +1,68 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import Case, Count, Exists, F, FloatField, OuterRef, Prefetch, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Employee, Project
+
+
+ProjectCompetence = Project.competences.through
+ProjectEmployee = Project.employees.through
+EmployeeCompetence = Employee.competences.through
+
+SORTS = {
+    'code': ['code'],
+    '-code': ['-code'],
+    'title': ['title', 'code'],
+    '-title': ['-title', 'code'],
+    'coverage': ['coverage', 'code'],
+    '-coverage': ['-coverage', 'code'],
+}
+DEFAULT_SORT = 'code'
+DEFAULT_PAGE_SIZE = 25
+
+
+def _count(queryset, field: str):
+    # correlated COUNT(*) so one project row is never multiplied by several joins
+    counted = queryset.order_by().values(field).annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counted), 0)
+
+
+def annotate_staffing(queryset):
+    """
+    Annotate projects with ``required_count`` (competences the project needs),
+    ``covered_count`` (those at least one assigned employee has), ``employee_count``
+    and ``coverage`` (covered / required, 1.0 when nothing is required).
+    """
+    covering = EmployeeCompetence.objects.filter(competence_id=OuterRef('competence_id'),
+                                                 employee__projects=OuterRef('project_id'))
+
+    required = ProjectCompetence.objects.filter(project_id=OuterRef('pk'))
+    covered = required.filter(Exists(covering))
+    employees = ProjectEmployee.objects.filter(project_id=OuterRef('pk'))
+
+    return queryset.annotate(
+        required_count=_count(required, 'project_id'),
+        covered_count=_count(covered, 'project_id'),
+        employee_count=_count(employees, 'project_id'),
+    ).annotate(
+        coverage=Case(
+            When(required_count=0, then=Value(1.0)),
+            default=Cast(F('covered_count'), FloatField()) / F('required_count'),
+            output_field=FloatField(),
+        )
+    )
+
+
+def project_summaries(employer_id: int, sort: str = DEFAULT_SORT):
+    employees = Employee.objects.select_related('account__user') \
+        .only('pk', 'account__user__first_name', 'account__user__last_name') \
+        .order_by('account__user__last_name', 'pk')
+    queryset = Project.objects.filter(employer_id=employer_id) \
+        .prefetch_related(Prefetch('employees', queryset=employees))
+
+    return annotate_staffing(queryset).order_by(*SORTS.get(sort, SORTS[DEFAULT_SORT]))
+
+
+def project_page(employer_id: int, sort: str = DEFAULT_SORT, page: int = 1,
+                 per_page: int = DEFAULT_PAGE_SIZE) -> Page:
+    return Paginator(project_summaries(employer_id, sort), per_page).get_page(page)
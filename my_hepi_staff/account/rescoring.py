@@ -0,0 +1,78 @@
+from typing import Callable, Iterable, Optional
+
+from django.db import transaction
+
+from .belbin import scorer
+from .documents import refresh_documents
+from .importer import batched, read_records, split_list
+from .models import ROLE_FIELDS, BelbinSubmission, Employee
+
+
+def apply_results(employees: list[Employee], results: Iterable[str], dry_run: bool = False) -> tuple[int, int]:
+    """Store the changed ``belbin_test_result`` texts: ``(updated, unchanged)``."""
+    changed = []
+    for employee, result in zip(employees, results):
+        if employee.belbin_test_result != result:
+            employee.belbin_test_result = result
+            changed.append(employee)
+
+    if not dry_run:
+        Employee.objects.bulk_update(changed, ['belbin_test_result'])
+        # bulk_update sends no post_save
+        refresh_documents(employee.pk for employee in changed)
+
+    return len(changed), len(employees) - len(changed)
+
+
+def rescore_submissions(batch_size: int = 1000, dry_run: bool = False,
+                        progress: Optional[Callable[[int, int], None]] = None) -> tuple[int, int]:
+    """
+    Re-score every employee's latest stored submission with the current
+    mapping and ranges; ``progress(done, total)`` is called after each batch.
+    """
+    updated = unchanged = 0
+    submissions = BelbinSubmission.objects.latest_per_employee() \
+        .select_related('employee').order_by('pk')
+    total = submissions.count() if progress else 0
+
+    for batch in batched(submissions.iterator(chunk_size=batch_size), batch_size):
+        all_scores = scorer.score_batch([s.answers for s in batch])
+        for submission, scores in zip(batch, all_scores):
+            submission.scores = scores
+
+        with transaction.atomic():
+            if not dry_run:
+                BelbinSubmission.objects.bulk_update(batch, list(ROLE_FIELDS.values()))
+            counts = apply_results([s.employee for s in batch],
+                                   [scorer.format(scores) for scores in all_scores], dry_run)
+
+        updated += counts[0]
+        unchanged += counts[1]
+        if progress:
+            progress(updated + unchanged, total)
+
+    return updated, unchanged
+
+
+def rescore_file(source: str, batch_size: int = 1000, dry_run: bool = False) -> tuple[int, int]:
+    """
+    Score the answers of a CSV or JSON-lines file with username and answers
+    columns. Raises ``KeyError`` or ``ValueError`` for malformed records.
+    """
+    updated = unchanged = 0
+
+    for batch in batched(read_records(source), batch_size):
+        answers = [[int(a) for a in split_list(r['answers'])] for r in batch]
+        results = [scorer.format(scores) for scores in scorer.score_batch(answers)]
+
+        by_username = {r['username']: result for r, result in zip(batch, results)}
+        employees = list(Employee.objects.filter(account__user__username__in=by_username)
+                         .select_related('account__user'))
+
+        with transaction.atomic():
+            counts = apply_results(employees, [by_username[e.account.user.username] for e in employees], dry_run)
+
+        updated += counts[0]
+        unchanged += counts[1]
+
+    return updated, unchanged
@@ -0,0 +1,270 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch
+
+from competence.models import Competence
+from .models import Employee
+from .versioning import ProcessLocal
+
+
+SEARCH_TABLE = 'account_employee_search'
+SEARCH_VERSION_KEY = 'account:search:version'
+
+# relative importance of a match in each indexed field
+FIELD_WEIGHTS = {
+    'name': 10.0,
+    'city': 2.0,
+    'competences': 5.0,
+    'description': 1.0,
+}
+
+WORD = re.compile(r'\w+')
+
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase ``text`` and strip diacritics, so "Łódź" and "lodz" compare equal."""
+    if not text:
+        return ''
+    # NFKD splits "ó" into "o" + a combining accent, but "ł" has no decomposition
+    text = unicodedata.normalize('NFKD', text.lower().replace('ł', 'l'))
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokens(text: Optional[str]) -> list[str]:
+    return WORD.findall(fold(text))
+
+
+@dataclass
+class SearchHit:
+    employee_id: int
+    score: float
+
+
+def documents(employee_ids: Optional[Iterable[int]] = None) -> Iterator[tuple[int, dict[str, str]]]:
+    """Yield ``(pk, folded fields)`` for active employees, optionally only ``employee_ids``."""
+    queryset = Employee.objects.filter(is_active=True) \
+        .select_related('account__user') \
+        .only('pk', 'city', 'description', 'account__user__first_name', 'account__user__last_name') \
+        .prefetch_related(Prefetch('competences', queryset=Competence.objects.only('pk', 'name').order_by()))
+    if employee_ids is not None:
+        queryset = queryset.filter(pk__in=list(employee_ids))
+
+    for employee in queryset.iterator(chunk_size=2000):
+        user = employee.account.user
+        yield employee.pk, {
+            'name': fold(f'{user.first_name} {user.last_name}'),
+            'city': fold(employee.city),
+            'competences': fold(' '.join(c.name for c in employee.competences.all())),
+            'description': fold(employee.description),
+        }
+
+
+class FTS5Backend:
+    """
+    SQLite FTS5 table keyed by employee pk (``rowid``), created by migration
+    0010. Every query token is a prefix match and hits are ranked by bm25
+    with ``FIELD_WEIGHTS``.
+    """
+
+    name = 'fts5'
+    # database name -> whether the table exists, to keep introspection off the request path
+    _available: dict[str, bool] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        if connection.vendor != 'sqlite':
+            return False
+        database = str(connection.settings_dict['NAME'])
+        if database not in cls._available:
+            cls._available[database] = SEARCH_TABLE in connection.introspection.table_names()
+        return cls._available[database]
+
+    def _delete(self, cursor, employee_ids: list[int]) -> None:
+        for start in range(0, len(employee_ids), 500):
+            chunk = employee_ids[start:start + 500]
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({", ".join("%s" for _ in chunk)})', chunk)
+
+    def _insert(self, cursor, docs: Iterable[tuple[int, dict[str, str]]]) -> None:
+        fields = list(FIELD_WEIGHTS)
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, {", ".join(fields)}) VALUES (%s, {", ".join("%s" for _ in fields)})',
+            [(pk, *(doc[f] for f in fields)) for pk, doc in docs],
+        )
+
+    def rebuild(self) -> None:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            self._insert(cursor, documents())
+
+    def reindex(self, employee_ids: Iterable[int]) -> None:
+        employee_ids = list(employee_ids)
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._delete(cursor, employee_ids)
+            self._insert(cursor, documents(employee_ids))
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        words = tokens(query)
+        if not words:
+            return []
+
+        match = ' '.join(f'"{word}"*' for word in words)
+        weights = ', '.join(str(w) for w in FIELD_WEIGHTS.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS rank FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s',
+                [match, limit],
+            )
+            # bm25() is negative, lower is better
+            return [SearchHit(pk, -rank) for pk, rank in cursor.fetchall()]
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory trigram postings ``trigram -> {employee pk: field weight}``.
+
+    A query matches an employee when at least ``threshold`` of its trigrams
+    occur in the employee's document, so misspellings and partial words still
+    match. Hits are ranked by the summed field weights of the shared trigrams.
+    """
+
+    threshold = 0.5
+
+    def __init__(self):
+        self.postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self.docs: dict[int, dict[str, float]] = {}
+
+    @classmethod
+    def build(cls) -> 'TrigramIndex':
+        index = cls()
+        index.add(documents())
+        return index
+
+    def add(self, docs: Iterable[tuple[int, dict[str, str]]]) -> None:
+        for pk, doc in docs:
+            grams = {}
+            for field, text in doc.items():
+                weight = FIELD_WEIGHTS[field]
+                for word in WORD.findall(text):
+                    for gram in trigrams(word):
+                        if grams.get(gram, 0.0) < weight:
+                            grams[gram] = weight
+            self.docs[pk] = grams
+            for gram, weight in grams.items():
+                self.postings[gram][pk] = weight
+
+    def remove(self, employee_ids: Iterable[int]) -> None:
+        for pk in employee_ids:
+            for gram in self.docs.pop(pk, ()):
+                posting = self.postings[gram]
+                posting.pop(pk, None)
+                if not posting:
+                    del self.postings[gram]
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        grams = set()
+        for word in tokens(query):
+            grams |= trigrams(word)
+        if not grams:
+            return []
+
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for gram in grams:
+            for pk, weight in self.postings.get(gram, {}).items():
+                scores[pk] += weight
+                matched[pk] += 1
+
+        needed = self.threshold * len(grams)
+        hits = [SearchHit(pk, score / len(grams)) for pk, score in scores.items() if matched[pk] >= needed]
+        hits.sort(key=lambda hit: (-hit.score, hit.employee_id))
+        return hits[:limit]
+
+
+class PythonBackend:
+    """Pure-Python fallback sharing one ``TrigramIndex`` per process."""
+
+    name = 'python'
+
+    _index = ProcessLocal(SEARCH_VERSION_KEY, TrigramIndex.build)
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def rebuild(self) -> None:
+        self._index.invalidate()
+
+    def reindex(self, employee_ids: Iterable[int]) -> None:
+        employee_ids = list(employee_ids)
+        docs = list(documents(employee_ids))
+
+        def apply(index: TrigramIndex):
+            index.remove(employee_ids)
+            index.add(docs)
+
+        self._index.update(apply)
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        return self._index.get().search(query, limit=limit)
+
+
+BACKENDS = {backend.name: backend for backend in (FTS5Backend, PythonBackend)}
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Backend named by ``name`` or ``EMPLOYEE_SEARCH_BACKEND``; ``'auto'``
+    prefers FTS5 and falls back to the pure-Python index.
+    """
+    name = name or getattr(settings, 'EMPLOYEE_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'fts5' if FTS5Backend.available() else 'python'
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown search backend: {name}')
+    return BACKENDS[name]()
+
+
+def search_employees_text(query: str, limit: int = 50) -> list[SearchHit]:
+    return get_backend().search(query, limit=limit)
+
+
+_pending = threading.local()
+
+
+def _flush() -> None:
+    employee_ids = getattr(_pending, 'ids', set())
+    _pending.ids = set()
+    if employee_ids:
+        get_backend().reindex(employee_ids)
+
+
+def reindex_employees(employee_ids: Iterable[int]) -> None:
+    """
+    Re-read the documents of ``employee_ids`` once the current transaction
+    commits; inactive or deleted employees drop out of the index. Changes
+    signalled several times in one transaction are indexed once.
+    """
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids |= employee_ids
+    transaction.on_commit(_flush)
+
+
+def rebuild_search_index() -> None:
+    get_backend().rebuild()
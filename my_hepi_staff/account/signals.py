@@ -0,0 +1,280 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from competence.models import Competence, Group
+from .access import invalidate_account
+from .analytics import competence_added, demand_changed, refresh_groups, supply_changed
+from .choices import invalidate_competence_choices, invalidate_employee_choices
+from .competence_summary import bump_catalog_version, invalidate_competence_summary
+from .documents import refresh_documents
+from .matching import invalidate_matrix
+from .search import rebuild_search_index, reindex_employees
+from .skill_index import apply_change, invalidate_index
+from .models import Account, Assignment, Employee, Employer, Project
+
+
+@receiver(m2m_changed, sender=Employee.competences.through)
+def employee_competences_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    # after commit, or a concurrent reader would rebuild from the old rows under the new version
+    transaction.on_commit(invalidate_matrix)
+
+    if not reverse or pk_set:
+        employee_ids = list(pk_set) if reverse else [instance.pk]
+        transaction.on_commit(lambda: invalidate_competence_summary(*employee_ids))
+    else:
+        # competence.competence_joined.clear() does not say who lost it
+        transaction.on_commit(bump_catalog_version)
+
+    if action == 'post_clear':
+        transaction.on_commit(invalidate_index)
+    else:
+        pairs = [(instance.pk, pk) for pk in pk_set] if reverse else [(pk, instance.pk) for pk in pk_set]
+        change = 'add' if action == 'post_add' else 'remove'
+        # the local copy must not keep a change that is rolled back
+        transaction.on_commit(lambda: apply_change(change, pairs))
+
+    if not reverse:
+        reindex_employees([instance.pk])
+    elif pk_set:
+        reindex_employees(pk_set)
+    else:
+        rebuild_search_index()
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def employee_changed(sender, instance, created=False, **kwargs):
+    reindex_employees([instance.pk])
+    # the matrix and skill index hold the active employees, the choices every employee
+    # by user name: other fields leave them as they are. Runs before
+    # employee_activity_rollup pops _was_active
+    if kwargs['signal'] is post_save and not created and \
+            instance.__dict__.get('_was_active') == instance.is_active:
+        return
+    transaction.on_commit(invalidate_matrix)
+    transaction.on_commit(invalidate_index)
+    transaction.on_commit(invalidate_employee_choices)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def account_changed(sender, instance, **kwargs):
+    invalidate_account(instance.pk)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Employer)
+@receiver(post_delete, sender=Employer)
+def account_profile_changed(sender, instance, created=True, **kwargs):
+    # sessions only cache whether the employee/employer row exists
+    if created:
+        invalidate_account(instance.account_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # logins save last_login only
+    if update_fields and not {'first_name', 'last_name'} & set(update_fields):
+        return
+    if not created:
+        invalidate_employee_choices()
+        reindex_employees(Employee.objects.filter(account__user=instance).values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Competence)
+def competence_deleting(sender, instance, **kwargs):
+    # the through rows are gone by post_delete, remember who had the competence
+    instance._employee_ids = list(instance.competence_joined.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Competence)
+@receiver(post_delete, sender=Competence)
+def catalog_changed(sender, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+    transaction.on_commit(invalidate_competence_choices)
+    transaction.on_commit(invalidate_matrix)
+    transaction.on_commit(invalidate_index)
+
+
+@receiver(post_save, sender=Competence)
+@receiver(post_delete, sender=Competence)
+def competence_changed(sender, instance, **kwargs):
+    if kwargs['signal'] is post_delete:
+        reindex_employees(getattr(instance, '_employee_ids', ()))
+    elif not kwargs.get('created'):
+        reindex_employees(instance.competence_joined.values_list('pk', flat=True))
+
+
+# -- competence rollups ----------------------------------------------------------
+
+def _rollup_deltas(sender, instance, action, reverse, pk_set, field, active_only=False):
+    """
+    Competence pk -> change in holders (``field`` being ``employee`` or
+    ``project``) for an m2m change, ``None`` when there is nothing to count.
+    remove() reports every pk it was given and clear() none, so on pre_remove
+    and pre_clear the rows really there are remembered on the instance.
+    """
+    counted = Employee.objects.filter(is_active=True) if active_only else None
+    own, other = ('competence_id', f'{field}_id') if reverse else (f'{field}_id', 'competence_id')
+
+    if action in ('pre_remove', 'pre_clear'):
+        rows = sender.objects.filter(**{own: instance.pk})
+        if pk_set is not None:
+            rows = rows.filter(**{f'{other}__in': pk_set})
+        if reverse and counted is not None:
+            rows = rows.filter(employee__in=counted)
+        instance._rollup_removed = list(rows.values_list(other, flat=True))
+        return None
+
+    if action == 'post_add':
+        sign, pks = 1, pk_set
+        if reverse and counted is not None:
+            pks = list(counted.filter(pk__in=pk_set).values_list('pk', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        sign, pks = -1, instance.__dict__.pop('_rollup_removed', [])
+    else:
+        return None
+
+    if reverse:
+        return Counter({instance.pk: sign * len(pks)})
+    return Counter({pk: sign for pk in pks})
+
+
+@receiver(m2m_changed, sender=Employee.competences.through)
+def employee_competences_rollup(sender, instance, action, reverse, pk_set, **kwargs):
+    # inactive employees are not counted as supply
+    if not reverse and not instance.is_active:
+        return
+    deltas = _rollup_deltas(sender, instance, action, reverse, pk_set, 'employee', active_only=True)
+    if deltas:
+        supply_changed(deltas)
+
+
+@receiver(m2m_changed, sender=Project.competences.through)
+def project_competences_rollup(sender, instance, action, reverse, pk_set, **kwargs):
+    deltas = _rollup_deltas(sender, instance, action, reverse, pk_set, 'project')
+    if deltas:
+        demand_changed(deltas)
+
+
+@receiver(pre_save, sender=Employee)
+def employee_saving(sender, instance, **kwargs):
+    instance._was_active = bool(instance.pk) and \
+        Employee.objects.filter(pk=instance.pk, is_active=True).exists()
+
+
+@receiver(post_save, sender=Employee)
+def employee_activity_rollup(sender, instance, created, **kwargs):
+    was_active = instance.__dict__.pop('_was_active', False)
+    if not created and was_active != instance.is_active:
+        sign = 1 if instance.is_active else -1
+        supply_changed(Counter({pk: sign for pk in instance.competences.values_list('pk', flat=True)}))
+
+
+@receiver(pre_delete, sender=Employee)
+@receiver(pre_delete, sender=Project)
+def competence_holder_deleting(sender, instance, **kwargs):
+    # the through rows are gone by post_delete
+    counted = sender is Project or instance.is_active
+    instance._rollup_competences = list(instance.competences.values_list('pk', flat=True)) if counted else []
+
+
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=Project)
+def competence_holder_deleted(sender, instance, **kwargs):
+    deltas = Counter({pk: -1 for pk in getattr(instance, '_rollup_competences', ())})
+    if deltas:
+        (demand_changed if sender is Project else supply_changed)(deltas)
+
+
+@receiver(pre_save, sender=Competence)
+def competence_saving(sender, instance, **kwargs):
+    instance._old_group_id = Competence.objects.filter(pk=instance.pk) \
+        .values_list('competence_group_id', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Competence)
+@receiver(post_delete, sender=Competence)
+def competence_rollup(sender, instance, created=False, **kwargs):
+    if created:
+        competence_added(instance)
+    elif kwargs['signal'] is post_delete:
+        # after commit, the group may be going away with its competences
+        transaction.on_commit(lambda: refresh_groups(group_ids=[instance.competence_group_id]))
+    else:
+        # a moved competence changes the sums of both groups
+        refresh_groups(group_ids={instance.competence_group_id, instance.__dict__.pop('_old_group_id', None)} - {None})
+
+
+@receiver(post_save, sender=Group)
+def group_rollup(sender, instance, created, **kwargs):
+    if created:
+        refresh_groups(group_ids=[instance.pk])
+
+
+# -- employee documents ----------------------------------------------------------
+
+DOCUMENT_USER_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+def _document_employee_ids(sender, instance, action, pk_set):
+    """
+    Employees whose documents an m2m change on ``sender`` touches. clear()
+    from the competence or project side names nobody, so the employees of
+    its rows are remembered on pre_clear.
+    """
+    if isinstance(instance, Employee):
+        return [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    if action == 'pre_clear':
+        instance._document_employee_ids = list(
+            sender.objects.filter(**{f'{instance._meta.model_name}_id': instance.pk})
+            .values_list('employee_id', flat=True))
+    elif action == 'post_clear':
+        return instance.__dict__.pop('_document_employee_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        return pk_set
+    return []
+
+
+@receiver(m2m_changed, sender=Employee.competences.through)
+@receiver(m2m_changed, sender=Assignment)
+def employee_relations_document(sender, instance, action, pk_set, **kwargs):
+    refresh_documents(_document_employee_ids(sender, instance, action, pk_set))
+
+
+@receiver(post_save, sender=Employee)
+def employee_document(sender, instance, **kwargs):
+    refresh_documents([instance.pk])
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def assignment_document(sender, instance, created=False, **kwargs):
+    if kwargs['signal'] is post_delete:
+        # after commit, the employee may be going away with its assignments
+        transaction.on_commit(lambda: refresh_documents([instance.employee_id]))
+    elif created:
+        # updating an assignment's period does not change the project count
+        refresh_documents([instance.employee_id])
+
+
+@receiver(post_save, sender=User)
+def user_document(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not DOCUMENT_USER_FIELDS & set(update_fields)):
+        return
+    refresh_documents(Employee.objects.filter(account__user=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Competence)
+def competence_document(sender, instance, **kwargs):
+    refresh_documents(getattr(instance, '_employee_ids', ()))
@@ -0,0 +1,160 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .choices import competence_choices
+from .competence_summary import catalog_version, competences_version, get_cache
+from .models import CompetenceNeighbours, Employee
+from .versioning import ProcessLocal
+
+
+SIMILARITY_VERSION_KEY = 'account:similarity:version'
+RECOMMENDATIONS_KEY = 'account:recommendations:{catalog}:{similarity}:{competences}:{employee_id}:{limit}'
+
+DEFAULT_TOP_K = 20
+# pairs held by fewer employees are noise, not a pattern
+DEFAULT_MIN_SUPPORT = 2
+DEFAULT_LIMIT = 5
+
+
+# -- batch computation ---------------------------------------------------------------
+
+def co_occurrences(progress: Optional[Callable[[int], None]] = None) -> tuple[Counter, Counter]:
+    """
+    Column sums and the upper triangle of ``XᵀX`` for the binary active
+    employee × competence matrix ``X``, walking its non-zero cells once in
+    employee order: ``(holders per competence, holders per (a, b) with a < b)``.
+    """
+    through = Employee.competences.through
+    cells = (through.objects
+             .filter(employee__is_active=True)
+             .order_by('employee_id', 'competence_id')
+             .values_list('employee_id', 'competence_id'))
+
+    holders = Counter()
+    pairs = Counter()
+    current, row, employees = None, [], 0
+
+    def flush():
+        holders.update(row)
+        pairs.update(combinations(row, 2))
+
+    for employee_id, competence_id in cells.iterator(chunk_size=5000):
+        if employee_id != current:
+            flush()
+            current, row = employee_id, []
+            employees += 1
+            if progress and employees % 1000 == 0:
+                progress(employees)
+        row.append(competence_id)
+    flush()
+
+    return holders, pairs
+
+
+def cosine_neighbours(holders: Counter, pairs: Counter, top_k: int = DEFAULT_TOP_K,
+                      min_support: int = DEFAULT_MIN_SUPPORT) -> dict[int, list[tuple[int, float]]]:
+    """The ``top_k`` most similar competences of each competence, by cosine of their columns."""
+    candidates = defaultdict(list)
+    for (a, b), both in pairs.items():
+        if both < min_support:
+            continue
+        score = both / math.sqrt(holders[a] * holders[b])
+        candidates[a].append((b, score))
+        candidates[b].append((a, score))
+
+    return {pk: heapq.nsmallest(top_k, scored, key=lambda n: (-n[1], n[0]))
+            for pk, scored in candidates.items()}
+
+
+def compute_similarity(top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT,
+                       progress: Optional[Callable[[int], None]] = None) -> int:
+    """Recompute and replace every ``CompetenceNeighbours`` row; returns the rows written."""
+    neighbours = cosine_neighbours(*co_occurrences(progress), top_k=top_k, min_support=min_support)
+
+    rows = []
+    for pk, values in neighbours.items():
+        row = CompetenceNeighbours(competence_id=pk)
+        row.neighbours = values
+        rows.append(row)
+
+    with transaction.atomic():
+        CompetenceNeighbours.objects.all().delete()
+        CompetenceNeighbours.objects.bulk_create(rows, batch_size=1000)
+        transaction.on_commit(invalidate_similarity)
+    return len(rows)
+
+
+# -- serving -------------------------------------------------------------------------
+
+class SimilarityIndex(dict):
+    """``competence pk -> [(neighbour pk, score), ...]`` as stored, best first."""
+
+    @classmethod
+    def build(cls) -> 'SimilarityIndex':
+        index = cls()
+        for row in CompetenceNeighbours.objects.only('raw_ids', 'raw_scores').iterator():
+            index[row.competence_id] = row.neighbours
+        return index
+
+    def related(self, competence_ids: Iterable[int], limit: Optional[int] = DEFAULT_LIMIT,
+                exclude: Iterable[int] = ()) -> list[tuple[int, float]]:
+        """
+        Competences most similar to ``competence_ids`` as a whole: the sum of
+        their similarity to each of them, the given ones and ``exclude`` left out.
+        """
+        competence_ids = set(competence_ids)
+        excluded = competence_ids | set(exclude)
+        totals = Counter()
+        for pk in competence_ids:
+            for neighbour, score in self.get(pk, ()):
+                if neighbour not in excluded:
+                    totals[neighbour] += score
+        key = lambda n: (-n[1], n[0])
+        return sorted(totals.items(), key=key) if limit is None else heapq.nsmallest(limit, totals.items(), key=key)
+
+
+_index = ProcessLocal(SIMILARITY_VERSION_KEY, SimilarityIndex.build)
+
+
+def get_index() -> SimilarityIndex:
+    return _index.get()
+
+
+def invalidate_similarity() -> None:
+    _index.invalidate()
+
+
+def related_competences(competence_ids: Iterable[int], limit: int = DEFAULT_LIMIT,
+                        exclude: Iterable[int] = ()) -> list[dict]:
+    """``related()`` with competence labels, skipping competences deleted since the last computation."""
+    labels = competence_choices().labels
+    related = [(pk, score) for pk, score in get_index().related(competence_ids, limit=None, exclude=exclude)
+               if pk in labels]
+    return [{'competence_id': pk, 'name': labels[pk], 'score': round(score, 4)} for pk, score in related[:limit]]
+
+
+def get_recommendations(employee_id: int, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """
+    "People with your skills also have…": ``related_competences()`` of the
+    employee's competences. Cached under the catalog, similarity and employee
+    competences versions, so any of them changing makes a fresh entry.
+    """
+    cache = get_cache()
+    key = RECOMMENDATIONS_KEY.format(catalog=catalog_version(), similarity=_index.version(),
+                                     competences=competences_version(employee_id), employee_id=employee_id,
+                                     limit=limit)
+    recommendations = cache.get(key)
+
+    if recommendations is None:
+        held = Employee.competences.through.objects.filter(employee_id=employee_id) \
+            .values_list('competence_id', flat=True)
+        recommendations = related_competences(held, limit=limit)
+        cache.set(key, recommendations, timeout=getattr(settings, 'COMPETENCE_SUMMARY_TIMEOUT', 300))
+
+    return recommendations
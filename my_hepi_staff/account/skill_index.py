@@ -0,0 +1,204 @@
+import re
+from typing import Iterable, Optional
+
+from competence.models import Competence
+from .models import Employee
+from .versioning import ProcessLocal
+
+
+INDEX_VERSION_KEY = 'account:skill-index:version'
+# NOT and "(" nest the parser's recursion; deeper queries are rejected before Python's recursion limit
+MAX_DEPTH = 50
+
+
+class QueryError(ValueError):
+    pass
+
+
+def bits_to_ids(bits: int, limit: Optional[int] = None) -> list[int]:
+    result = []
+    while bits and (limit is None or len(result) < limit):
+        low = bits & -bits
+        result.append(low.bit_length() - 1)
+        bits ^= low
+    return result
+
+
+def ids_to_bits(ids: Iterable[int]) -> int:
+    bits = 0
+    for pk in ids:
+        bits |= 1 << pk
+    return bits
+
+
+class SkillIndex:
+    """
+    Inverted index competence pk -> bitmap of employee pks.
+
+    Bit ``n`` of a posting is set when the employee with pk ``n`` has the
+    competence, so AND/OR/NOT over any number of terms are plain integer
+    operations regardless of how many employees match.
+    """
+
+    def __init__(self):
+        self.postings: dict[int, int] = {}
+        self.active = 0
+        self.by_name: dict[str, list[int]] = {}
+        self.by_group: dict[str, list[int]] = {}
+
+    @classmethod
+    def build(cls) -> 'SkillIndex':
+        index = cls()
+
+        for pk, name, group in Competence.objects.values_list('pk', 'name', 'competence_group__name'):
+            index.by_name.setdefault(name.lower(), []).append(pk)
+            index.by_group.setdefault(group.lower(), []).append(pk)
+
+        index.active = ids_to_bits(Employee.objects.filter(is_active=True).values_list('pk', flat=True))
+
+        through = Employee.competences.through.objects.values_list('competence_id', 'employee_id')
+        for competence_id, employee_id in through.iterator(chunk_size=10000):
+            index.postings[competence_id] = index.postings.get(competence_id, 0) | (1 << employee_id)
+
+        return index
+
+    def add(self, competence_id: int, employee_ids: Iterable[int]) -> None:
+        self.postings[competence_id] = self.postings.get(competence_id, 0) | ids_to_bits(employee_ids)
+
+    def remove(self, competence_id: int, employee_ids: Iterable[int]) -> None:
+        self.postings[competence_id] = self.postings.get(competence_id, 0) & ~ids_to_bits(employee_ids)
+
+    def union(self, competence_ids: Iterable[int]) -> int:
+        bits = 0
+        for pk in competence_ids:
+            bits |= self.postings.get(pk, 0)
+        return bits
+
+    def term(self, text: str) -> int:
+        if text.lower().startswith('group:'):
+            name = text[len('group:'):].strip('"').lower()
+            if name not in self.by_group:
+                raise QueryError(f'Unknown competence group: {name}')
+            return self.union(self.by_group[name])
+
+        name = text.strip('"').lower()
+        if name not in self.by_name:
+            raise QueryError(f'Unknown competence: {name}')
+        return self.union(self.by_name[name])
+
+    def search(self, query: str) -> int:
+        """Bitmap of active employees matching ``query``."""
+        return Parser(self, query).parse() & self.active
+
+
+TOKEN = re.compile(r'\s*(\(|\)|group:"[^"]*"|"[^"]*"|[^\s()]+)', re.IGNORECASE)
+
+
+class Parser:
+    """
+    Recursive-descent parser for skill queries::
+
+        query := or
+        or    := and ("OR" and)*
+        and   := not ("AND"? not)*
+        not   := "NOT" not | "(" query ")" | term
+        term  := name | "quoted name" | group:name | group:"quoted name"
+    """
+
+    def __init__(self, index: SkillIndex, query: str):
+        self.index = index
+        self.tokens = TOKEN.findall(query)
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def keyword(self, token: Optional[str]) -> Optional[str]:
+        return token.upper() if token and token.upper() in ('AND', 'OR', 'NOT') else None
+
+    def next(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise QueryError('Unexpected end of query.')
+        self.position += 1
+        return token
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise QueryError('Empty query.')
+        bits = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError(f'Unexpected {self.peek()!r}.')
+        return bits
+
+    def parse_or(self) -> int:
+        bits = self.parse_and()
+        while self.keyword(self.peek()) == 'OR':
+            self.next()
+            bits |= self.parse_and()
+        return bits
+
+    def parse_and(self) -> int:
+        bits = self.parse_not()
+        while (token := self.peek()) is not None and token != ')' and self.keyword(token) != 'OR':
+            if self.keyword(token) == 'AND':
+                self.next()
+            bits &= self.parse_not()
+        return bits
+
+    def descend(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise QueryError(f'Query nested deeper than {MAX_DEPTH} levels.')
+
+    def parse_not(self) -> int:
+        token = self.next()
+        if self.keyword(token) == 'NOT':
+            self.descend()
+            bits = self.index.active & ~self.parse_not()
+            self.depth -= 1
+            return bits
+        if token == '(':
+            self.descend()
+            bits = self.parse_or()
+            if self.next() != ')':
+                raise QueryError('Missing ")".')
+            self.depth -= 1
+            return bits
+        if token == ')' or self.keyword(token):
+            raise QueryError(f'Unexpected {token!r}.')
+        return self.index.term(token)
+
+
+_index = ProcessLocal(INDEX_VERSION_KEY, SkillIndex.build)
+
+
+def get_index() -> SkillIndex:
+    return _index.get()
+
+
+def invalidate_index() -> None:
+    _index.invalidate()
+
+
+def apply_change(action: str, pairs: Iterable[tuple[int, int]]) -> None:
+    """Apply ``(competence_id, employee_id)`` additions or removals without a rebuild."""
+    by_competence = {}
+    for competence_id, employee_id in pairs:
+        by_competence.setdefault(competence_id, []).append(employee_id)
+
+    def apply(index: SkillIndex):
+        for competence_id, employee_ids in by_competence.items():
+            if action == 'add':
+                index.add(competence_id, employee_ids)
+            else:
+                index.remove(competence_id, employee_ids)
+
+    _index.update(apply)
+
+
+def search_employees(query: str, limit: Optional[int] = None) -> tuple[int, list[int]]:
+    """Return the number of matching active employees and up to ``limit`` of their pks."""
+    bits = get_index().search(query)
+    return bits.bit_count(), bits_to_ids(bits, limit=limit)
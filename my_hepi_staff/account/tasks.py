@@ -0,0 +1,71 @@
+import csv
+from dataclasses import asdict
+
+from jobs.files import result_path
+from jobs.registry import register
+from .enrollment import enroll_from_csv
+from .export import export_rows
+from .importer import DEFAULT_BATCH_SIZE, StaffImporter, read_records
+from .rescoring import rescore_submissions
+from .similarity import DEFAULT_MIN_SUPPORT, DEFAULT_TOP_K, compute_similarity
+from .team import optimize_team, team_as_dict
+
+
+@register('account.export')
+def export(context, kind: str):
+    filename = f'{kind}-{context.job.pk}.csv'
+    rows = 0
+    with open(result_path(filename), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row in export_rows(kind):
+            writer.writerow(row)
+            rows += 1
+            if rows % 1000 == 0:
+                context.progress(message=f'{rows} rows written')
+    return {'file': filename, 'rows': rows - 1}
+
+
+@register('account.enroll_csv', max_attempts=1)
+def enroll_csv(context, content: str):
+    return asdict(enroll_from_csv(content.encode('utf-8')))
+
+
+@register('account.optimize_team')
+def optimize(context, competence_ids: list[int], size: int, **kwargs):
+    return team_as_dict(optimize_team(competence_ids, size, **kwargs))
+
+
+@register('account.import_staff', max_attempts=1)
+def import_staff(context, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1, **paths):
+    """``paths`` maps competences/employers/employees/projects to files readable by the worker."""
+    kinds = [kind for kind in ('competences', 'employers', 'employees', 'projects') if paths.get(kind)]
+    summary = {}
+
+    with StaffImporter(batch_size=batch_size, workers=workers) as importer:
+        for i, kind in enumerate(kinds):
+            created = skipped = 0
+            errors = []
+            for report in getattr(importer, f'import_{kind}')(read_records(paths[kind])):
+                created += report.created
+                skipped += report.skipped
+                errors.extend(report.errors)
+                context.progress(i, len(kinds), message=f'{kind}: {created} created, {skipped} skipped')
+            summary[kind] = {'created': created, 'skipped': skipped, 'errors': errors}
+
+    return summary
+
+
+@register('account.rescore_belbin', max_attempts=1)
+def rescore_belbin(context, batch_size: int = 1000, dry_run: bool = False):
+    def progress(done, total):
+        context.progress(done, total, message=f'{done} of {total} submissions rescored', force=done == total)
+
+    updated, unchanged = rescore_submissions(batch_size, dry_run, progress=progress)
+    return {'updated': updated, 'unchanged': unchanged}
+
+
+@register('account.compute_similarity')
+def similarity(context, top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT):
+    rows = compute_similarity(top_k, min_support,
+                              progress=lambda employees: context.progress(message=f'{employees} employees read'))
+    return {'competences': rows}
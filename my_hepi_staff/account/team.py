@@ -0,0 +1,163 @@
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .belbin import ROLES, role_mask, roles_from_mask
+from .matching import get_matrix
+from .models import EmployeeDocument
+
+
+@dataclass
+class TeamWeights:
+    coverage: float = 1.0
+    diversity: float = 0.5
+    load: float = 0.2
+    # projects at which the load penalty saturates
+    max_load: int = 5
+
+
+@dataclass
+class Team:
+    employee_ids: list[int]
+    score: float
+    coverage: float
+    roles: list[str]
+    missing: list[int]
+    loads: dict[int, int]
+    seconds: float
+    within_budget: bool = True
+    candidates: int = 0
+
+
+@dataclass(order=True)
+class _State:
+    score: float
+    members: tuple = field(compare=False)
+    covered: int = field(compare=False)
+    roles: int = field(compare=False)
+    load: float = field(compare=False)
+
+
+class TeamOptimizer:
+    """
+    Picks ``size`` employees maximising required-competence coverage and
+    Belbin role diversity while penalising people already on many projects.
+
+    Every candidate is reduced to two bitsets (competences from the matching
+    matrix, roles from ``belbin_test_result``) and a load, so the marginal
+    gain of adding someone is a handful of integer operations. The search is
+    a beam search over the best ``pool_size`` individuals; when the time
+    budget runs out it narrows to a greedy completion of the best beam.
+    """
+
+    def __init__(self, weights: Optional[TeamWeights] = None, beam_width: int = 8,
+                 pool_size: int = 300, budget: float = 0.5):
+        self.weights = weights or TeamWeights()
+        self.beam_width = max(1, beam_width)
+        self.pool_size = pool_size
+        self.budget = budget
+
+    def load_candidates(self, exclude: Iterable[int] = ()):
+        matrix = get_matrix()
+        excluded = set(exclude)
+
+        masks, loads = {}, {}
+        for pk, result, projects in EmployeeDocument.objects.filter(is_active=True) \
+                .values_list('pk', 'belbin_test_result', 'project_count').iterator(chunk_size=5000):
+            if result != 'N/A':
+                masks[pk] = role_mask(result)
+            loads[pk] = projects
+
+        candidates = []
+        for pk, row in zip(matrix.employee_ids, matrix.rows):
+            if pk not in excluded:
+                candidates.append((pk, row, masks.pop(pk, 0), loads.get(pk, 0)))
+        # active employees without competences can still bring a missing role
+        for pk, mask in masks.items():
+            if mask and pk not in excluded:
+                candidates.append((pk, 0, mask, loads.get(pk, 0)))
+
+        return matrix, candidates
+
+    def optimize(self, competence_ids: Iterable[int], size: int, exclude: Iterable[int] = ()) -> Team:
+        started = time.perf_counter()
+        deadline = started + self.budget
+        w = self.weights
+
+        matrix, candidates = self.load_candidates(exclude)
+        required, unknown = matrix.mask(competence_ids)
+        n_required = required.bit_count() + len(unknown)
+        n_roles = len(ROLES)
+
+        def penalty(load):
+            return w.load * min(load, w.max_load) / w.max_load
+
+        def gain(covered, roles, candidate):
+            _, row, mask, load = candidate
+            return (w.coverage * (row & required & ~covered).bit_count() / (n_required or 1)
+                    + w.diversity * (mask & ~roles).bit_count() / n_roles
+                    - penalty(load) / size)
+
+        pool = heapq.nlargest(self.pool_size, candidates, key=lambda c: gain(0, 0, c))
+
+        beam = [_State(0.0, (), 0, 0, 0.0)]
+        for _ in range(min(size, len(pool))):
+            width = self.beam_width if time.perf_counter() < deadline else 1
+            expanded = {}
+            for state in beam:
+                taken = set(state.members)
+                for i, candidate in enumerate(pool):
+                    if i in taken:
+                        continue
+                    members = tuple(sorted(state.members + (i,)))
+                    if members in expanded:
+                        continue
+                    expanded[members] = _State(
+                        state.score + gain(state.covered, state.roles, candidate), members,
+                        state.covered | (candidate[1] & required),
+                        state.roles | candidate[2],
+                        state.load + candidate[3],
+                    )
+            beam = heapq.nlargest(width, expanded.values())
+
+        best = beam[0]
+        members = [pool[i] for i in best.members]
+        return Team(
+            employee_ids=[c[0] for c in members],
+            score=round(best.score, 6),
+            coverage=best.covered.bit_count() / n_required if n_required else 0.0,
+            roles=roles_from_mask(best.roles),
+            missing=sorted(matrix.decode(required & ~best.covered) + unknown),
+            loads={c[0]: c[3] for c in members},
+            seconds=time.perf_counter() - started,
+            within_budget=time.perf_counter() <= deadline,
+            candidates=len(candidates),
+        )
+
+
+def optimize_team(competence_ids: Iterable[int], size: int, **kwargs) -> Team:
+    exclude = kwargs.pop('exclude', ())
+    return TeamOptimizer(**kwargs).optimize(competence_ids, size, exclude=exclude)
+
+
+def team_as_dict(team: Team) -> dict:
+    employees = EmployeeDocument.objects.in_bulk(team.employee_ids)
+    return {
+        'members': [
+            {
+                'employee_id': pk,
+                'name': str(employees[pk]),
+                'belbin_test_result': employees[pk].belbin_test_result,
+                'projects': team.loads[pk],
+            }
+            for pk in team.employee_ids if pk in employees
+        ],
+        'coverage': round(team.coverage, 4),
+        'roles': team.roles,
+        'missing': team.missing,
+        'score': team.score,
+        'candidates': team.candidates,
+        'elapsed_ms': round(team.seconds * 1000, 1),
+        'within_budget': team.within_budget,
+    }
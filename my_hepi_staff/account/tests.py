@@ -1,3 +1,1213 @@
-from django.test import TestCase
+import csv
+import os
+import random
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from asgiref.sync import SyncToAsync
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from competence.models import Competence, Group
+from jobs.queue import enqueue, work
+from my_hepi_staff.db import database_from_env, sqlite_pragmas_from_env
+from .access import VERSION_KEY
+from .analytics import group_report, live_group_report, rebuild_rollups, rollup_drift
+from .availability import available_employees, busy_employee_ids
+from .belbin import (ANSWERS, GROUPS, POINTS_PER_GROUP, QUESTIONS_PER_GROUP, ROLE_MAPPING, SCORE_RANGES,
+                     BelbinScorer, answer_field, answer_index, parse_result, scorer)
+from .checks import check_shared_cache
+from .competence_summary import summary_stats
+from .dataset import USERNAME_PREFIX, DatasetGenerator, Scale
+from .management.commands.index_audit import full_scans
+from .directory import directory_queryset, employee_directory
+from .documents import document_drift, rebuild_documents
+from .forms import ProjectForm
+from .importer import StaffImporter
+from .matching import rank_employees
+from .enrollment import set_competences
+from .models import (Account, Assignment, BelbinSubmission, CompetenceNeighbours, CompetenceRollup, Employee,
+                     EmployeeDocument, Employer, Project)
+from . import profiling
+from .projects import project_summaries
+from .search import fold, get_backend
+from .skill_index import INDEX_VERSION_KEY, QueryError, get_index, search_employees
+from .similarity import compute_similarity, get_recommendations, invalidate_similarity, related_competences
+from .team import optimize_team
+from .views import EmployeeDirectoryMixin
+
+
+def create_employer(username='employer'):
+    user = User.objects.create_user(username, password='secret')
+    account = Account.objects.create(user=user, is_employee=False, is_employer=True)
+    return Employer.objects.create(account=account, company_name=f'{username} Inc.',
+                                   address='Main 1', post_code='00-001', city='Warszawa')
+
+
+def create_employees(count, start=0, city='Kraków', belbin_test_result='N/A'):
+    employees = []
+    for i in range(start, start + count):
+        user = User.objects.create_user(f'employee{i}', first_name=f'Jan{i}', last_name=f'Kowalski{i:04d}',
+                                        email=f'employee{i}@example.com')
+        account = Account.objects.create(user=user)
+        employees.append(Employee.objects.create(account=account, address='Long 2', post_code='00-002',
+                                                 city=city, belbin_test_result=belbin_test_result))
+    return employees
+
+
+class EmployeeDirectoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_employer()
+        group = Group.objects.create(name='Python')
+        cls.django = Competence.objects.create(name='Django', competence_group=group)
+        cls.employees = create_employees(6) + create_employees(3, start=6, city='Gdańsk', belbin_test_result='PO^, CZA*')
+        for employee in cls.employees[::2]:
+            employee.competences.add(cls.django)
+
+    def test_keyset_pages_cover_everyone_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = employee_directory(cursor=cursor, per_page=4)
+            seen.extend(e.pk for e in page.employees)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(sorted(seen), sorted(e.pk for e in self.employees))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_filters(self):
+        self.assertEqual(len(employee_directory(city='gdańsk').employees), 3)
+        self.assertEqual(len(employee_directory(role='CZA').employees), 3)
+        self.assertEqual(len(employee_directory(role='CZ').employees), 0)
+        self.assertEqual(len(employee_directory(competence=self.django.pk).employees), 5)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            employee_directory(cursor='not-a-cursor')
+
+    def test_query_count_is_constant_per_page(self):
+        self.client.login(username='employer', password='secret')
+        # the first request stores the resolved account in the session
+        self.client.get(reverse('employee-list'))
+
+        with self.assertNumQueries(4):
+            self.client.get(reverse('employee-list'), {'per_page': 3})
+
+        create_employees(40, start=100)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('employee-list'), {'per_page': 30})
+        self.assertEqual(len(response.context['employees']), 30)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('employee-list-json'), {'per_page': 30})
+        self.assertEqual(len(response.json()['employees']), 30)
+        self.assertIsNotNone(response.json()['next_cursor'])
+
+    def test_filters_are_parsed_once_per_request(self):
+        self.client.login(username='employer', password='secret')
+        parse = EmployeeDirectoryMixin.get_directory_filters
+        with mock.patch.object(EmployeeDirectoryMixin, 'get_directory_filters', autospec=True,
+                               side_effect=parse) as filters:
+            response = self.client.get(reverse('employee-list'), {'city': 'Gdańsk', 'per_page': 2})
+        filters.assert_called_once()
+        self.assertEqual(response.context['filters']['city'], 'Gdańsk')
+        self.assertIn('city=Gda', response.context['next_page_query'])
+
+
+class DashboardCompetenceSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = create_employees(1)[0]
+        cls.employee.account.user.set_password('secret')
+        cls.employee.account.user.save()
+        cls.groups = [Group.objects.create(name=f'Group {i}') for i in range(5)]
+        cls.competences = [Competence.objects.create(name=f'Skill {i}', competence_group=cls.groups[i % 5])
+                           for i in range(30)]
+
+    def test_query_count_does_not_depend_on_skill_count(self):
+        self.client.login(username='employee0', password='secret')
+        self.client.get(reverse('dashboard'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.competences.set(self.competences[:2])
+
+        # session, user, employee, competence summary and the competence ids behind the recommendations
+        with self.assertNumQueries(5):
+            self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.competences.set(self.competences)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(sum(len(v) for v in response.context['competences_groups'].values()), 30)
+
+        hits = summary_stats()['hits']
+        with self.assertNumQueries(3):
+            self.client.get(reverse('dashboard'))
+        self.assertEqual(summary_stats()['hits'], hits + 1)
+
+    def test_renaming_a_group_invalidates_summaries(self):
+        self.client.login(username='employee0', password='secret')
+        self.employee.competences.set(self.competences[:1])
+        self.client.get(reverse('dashboard'))
+
+        self.groups[0].name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.groups[0].save()
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(list(response.context['competences_groups']), ['Renamed'])
+
+
+class CompetenceEnrollmentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_employer()
+        # the catalog is invalidated on commit, which the test transaction never reaches
+        with cls.captureOnCommitCallbacks(execute=True):
+            group = Group.objects.create(name='Python')
+            cls.competences = [Competence.objects.create(name=f'Skill {i}', competence_group=group)
+                               for i in range(5)]
+        cls.employees = create_employees(3)
+
+    def competence_ids(self, employee):
+        return set(employee.competences.values_list('pk', flat=True))
+
+    def test_only_the_difference_is_written(self):
+        employee = self.employees[0]
+        employee.competences.set(self.competences[:3])
+        wanted = {c.pk for c in self.competences[1:]}
+
+        # savepoint + read + delete + bulk insert + release, for the competence
+        # rollups: which removed rows exist + one update per added/removed set,
+        # and one document rewrite: three reads + an upsert
+        with self.assertNumQueries(12):
+            result = set_competences(employee, wanted)
+
+        self.assertEqual((result.added, result.removed), (2, 1))
+        self.assertEqual(self.competence_ids(employee), wanted)
+
+        with self.assertNumQueries(3):
+            result = set_competences(employee, wanted)
+        self.assertEqual(result.changed_employees, 0)
+
+    def test_csv_batch(self):
+        self.client.login(username='employer', password='secret')
+        c = [competence.pk for competence in self.competences]
+        content = (
+            'username,competences\n'
+            f'employee0,{c[0]};{c[1]}\n'
+            f'employee1,{c[2]}\n'
+            f'nobody,{c[2]}\n'
+            f'employee2,999\n'
+        )
+        upload = SimpleUploadedFile('competences.csv', content.encode(), content_type='text/csv')
+
+        response = self.client.post(reverse('competence-batch'), {'file': upload})
+
+        self.assertEqual(response.json()['changed_employees'], 2)
+        self.assertEqual(len(response.json()['errors']), 2)
+        self.assertEqual(self.competence_ids(self.employees[0]), {c[0], c[1]})
+        self.assertEqual(self.competence_ids(self.employees[1]), {c[2]})
+        self.assertEqual(self.competence_ids(self.employees[2]), set())
+
+    def test_form_fragment_follows_changes(self):
+        employee = self.employees[0]
+        employee.competences.set(self.competences[:1])
+        self.client.force_login(employee.account.user)
+        url = reverse('employee-competence')
+
+        self.assertContains(self.client.get(url), f'value="{self.competences[0].pk}" checked')
+        # served from the fragment cache: session, user and employee only
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.competences.add(self.competences[1])
+        self.assertContains(self.client.get(url), f'value="{self.competences[1].pk}" checked')
+
+    def test_belbin_questionnaire_is_rendered_once(self):
+        self.client.force_login(self.employees[0].account.user)
+        url = reverse('employee-belbin-test')
+
+        self.assertContains(self.client.get(url), 'Część I: Sądzę')
+        # later requests reuse the questionnaire rendered by the first one
+        response = self.client.get(url)
+        self.assertContains(response, 'Część I: Sądzę')
+        self.assertNotIn('form', response.context)
+
+        answers = {f'group_{g}_question_{q}': 0 for g in range(1, 8) for q in range(1, 9)}
+        response = self.client.post(url, {**answers, 'group_1_question_1': 5})
+        self.assertContains(response, 'must equal 10')
+        self.assertContains(response, 'name="group_1_question_1" value="5"')
+
+    def test_belbin_answers_out_of_range(self):
+        self.client.force_login(self.employees[0].account.user)
+        answers = {f'group_{g}_question_{q}': 0 for g in range(1, 8) for q in range(1, 9)}
+        answers.update({f'group_{g}_question_1': 10 for g in range(1, 8)})
+
+        # sums to 10, but -1 and 11 are not answers
+        response = self.client.post(reverse('employee-belbin-test'),
+                                    {**answers, 'group_1_question_1': -1, 'group_1_question_2': 11})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'greater than or equal to 0')
+        self.assertFalse(BelbinSubmission.objects.exists())
+
+        with self.assertRaises(ValueError):
+            BelbinSubmission(employee=self.employees[0]).answers = [300] + [0] * 55
+
+
+def legacy_belbin_result(fields):
+    """The scoring EmployeeBelbinTest.post did before account.belbin, kept as the reference."""
+    roles_with_levels = []
+    for item in ROLE_MAPPING:
+        score = sum(fields[f'group_{g}_question_{q}'] for g, q in item['mapping'])
+        level = ''
+        for level_name, range_values in SCORE_RANGES[item['name']].items():
+            if range_values[0] <= score <= range_values[1]:
+                level = level_name
+                break
+        if level:
+            roles_with_levels.append((item['name'], level))
+    return ', '.join([f"{role}{'*' if level == 'bardzo wysoki' else '^' if level == 'wysoki' else ''}"
+                      for role, level in roles_with_levels])
+
+
+class BelbinScorerTests(SimpleTestCase):
+
+    def answer_sets(self):
+        # ten points spread evenly (every role ties), all on one question, and fixed random splits
+        yield [2, 1, 2, 1, 1, 1, 1, 1] * GROUPS
+        for question in range(QUESTIONS_PER_GROUP):
+            yield [POINTS_PER_GROUP if q == question else 0 for q in range(QUESTIONS_PER_GROUP)] * GROUPS
+        rng = random.Random(7)
+        for _ in range(200):
+            answers = []
+            for _ in range(GROUPS):
+                group = [0] * QUESTIONS_PER_GROUP
+                for _ in range(POINTS_PER_GROUP):
+                    group[rng.randrange(QUESTIONS_PER_GROUP)] += 1
+                answers.extend(group)
+            yield answers
+
+    def test_same_results_as_the_legacy_scoring(self):
+        submissions = list(self.answer_sets())
+        for answers in submissions:
+            fields = {answer_field(i): value for i, value in enumerate(answers)}
+            with self.subTest(answers=answers):
+                self.assertEqual(scorer.result(answers), legacy_belbin_result(fields))
+
+        expected = [scorer.score(answers) for answers in submissions]
+        self.assertEqual(scorer.score_batch(submissions), expected)
+
+    def test_score_batch_uses_the_weights(self):
+        weighted = BelbinScorer(ROLE_MAPPING[:1] + [{'name': 'X', 'mapping': [[1, 1], [1, 1], [2, 3]]}])
+        submissions = [list(range(ANSWERS)), [1] * ANSWERS]
+        self.assertEqual(weighted.score_batch(submissions), [weighted.score(a) for a in submissions])
+        # X counts answer 0 twice and answer 10 once
+        self.assertEqual(weighted.score_batch(submissions)[0][1], 2 * 0 + 10)
+        self.assertEqual(weighted.score_batch(submissions)[1][1], 2 * 1 + 1)
+        self.assertEqual(weighted.score_batch([]), [])
+        with self.assertRaises(ValueError):
+            weighted.score_batch([[1] * ANSWERS, [1] * (ANSWERS - 1)])
+
+    def test_ties_keep_the_role_order(self):
+        answers = [0] * ANSWERS
+        # PO and NL get the same score, both "bardzo wysoki"
+        for group, question in ROLE_MAPPING[0]['mapping'] + ROLE_MAPPING[1]['mapping']:
+            answers[answer_index(group, question)] = 5
+        self.assertEqual(scorer.score(answers)[:2], [35, 35])
+        self.assertEqual(scorer.result(answers), 'PO*, NL*')
+        self.assertEqual(parse_result(scorer.result(answers)), {'PO': 'bardzo wysoki', 'NL': 'bardzo wysoki'})
+
+
+class RescoreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employees = create_employees(3)
+        cls.answers = [POINTS_PER_GROUP if q == 0 else 0 for q in range(QUESTIONS_PER_GROUP)] * GROUPS
+        for employee in cls.employees:
+            submission = BelbinSubmission(employee=employee)
+            submission.answers = cls.answers
+            submission.save()
+
+    def test_command_and_job_share_the_rescoring(self):
+        out = StringIO()
+        call_command('rescore_belbin', '--dry-run', stdout=out)
+        self.assertIn('Would update 3 employees, 0 unchanged.', out.getvalue())
+        self.assertEqual(Employee.objects.filter(belbin_test_result='N/A').count(), 3)
+
+        job = enqueue('account.rescore_belbin', batch_size=2)
+        work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'updated': 3, 'unchanged': 0})
+        self.assertEqual(job.message, '3 of 3 submissions rescored')
+        self.assertEqual(set(Employee.objects.values_list('belbin_test_result', flat=True)),
+                         {scorer.result(self.answers)})
+
+
+class ProjectListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        group = Group.objects.create(name='Python')
+        cls.competences = [Competence.objects.create(name=f'Skill {i}', competence_group=group) for i in range(4)]
+        cls.employees = create_employees(4)
+        for employee, competence in zip(cls.employees, cls.competences):
+            employee.competences.add(competence)
+
+    def create_project(self, code, competences, employees):
+        project = Project.objects.create(employer=self.employer, title=code, code=code)
+        project.competences.set(competences)
+        project.employees.set(employees)
+        return project
+
+    def test_coverage(self):
+        c, e = self.competences, self.employees
+        self.create_project('A', c[:2], e[:2])
+        self.create_project('B', c, e[:1])
+        self.create_project('C', [], e)
+
+        summaries = {p.code: p for p in project_summaries(self.employer.pk, sort='-coverage')}
+
+        self.assertEqual((summaries['A'].covered_count, summaries['A'].required_count), (2, 2))
+        self.assertEqual((summaries['B'].covered_count, summaries['B'].required_count), (1, 4))
+        self.assertEqual(summaries['B'].coverage, 0.25)
+        self.assertEqual(summaries['C'].coverage, 1.0)
+        self.assertEqual(summaries['C'].employee_count, 4)
+        self.assertEqual([p.code for p in project_summaries(self.employer.pk, sort='coverage')], ['B', 'A', 'C'])
+
+    def test_query_count_is_constant(self):
+        self.client.login(username='employer', password='secret')
+        self.create_project('P0', self.competences, self.employees[:1])
+        self.client.get(reverse('project-list'))
+
+        with self.assertNumQueries(6):
+            self.client.get(reverse('project-list'))
+
+        for i in range(1, 20):
+            self.create_project(f'P{i}', self.competences[:i % 4], self.employees[:i % 5])
+
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('project-list'), {'sort': '-coverage'})
+        self.assertEqual(len(response.context['projects']), 20)
+
+
+class AvailabilityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        group = Group.objects.create(name='Python')
+        cls.django = Competence.objects.create(name='Django', competence_group=group)
+        cls.employees = create_employees(4)
+        for employee in cls.employees[1:]:
+            employee.competences.add(cls.django)
+
+        project = Project.objects.create(employer=cls.employer, title='Busy', code='BUSY')
+        e = cls.employees
+        Assignment.objects.bulk_create([
+            Assignment(project=project, employee=e[0], start_date=date(2026, 11, 1), end_date=date(2026, 11, 30)),
+            Assignment(project=project, employee=e[1], start_date=date(2026, 11, 15), end_date=date(2026, 12, 15),
+                       allocation=60),
+            # open-ended
+            Assignment(project=project, employee=e[2], start_date=date(2026, 10, 1), allocation=30),
+        ])
+
+    def available(self, start, end, **kwargs):
+        return {e.pk: e.free for e in available_employees(start, end, **kwargs)}
+
+    def test_free_capacity(self):
+        e = self.employees
+        november = date(2026, 11, 1), date(2026, 11, 30)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.available(*november), {e[2].pk: 70, e[3].pk: 100})
+        self.assertEqual(self.available(*november, competences=[self.django.pk]), {e[2].pk: 70, e[3].pk: 100})
+        self.assertEqual(self.available(*november, min_free=80), {e[3].pk: 100})
+        self.assertEqual(self.available(date(2027, 1, 1), date(2027, 1, 31), min_free=100),
+                         {e[0].pk: 100, e[1].pk: 100, e[3].pk: 100})
+        with self.assertRaises(ValueError):
+            available_employees(date(2026, 12, 1), date(2026, 11, 1))
+
+    def test_consecutive_assignments_are_not_added_up(self):
+        employee = self.employees[3]
+        Assignment.objects.bulk_create([
+            Assignment(project=Project.objects.create(employer=self.employer, title=code, code=code),
+                       employee=employee, start_date=start, end_date=end, allocation=allocation)
+            for code, start, end, allocation in [('JAN', date(2028, 1, 1), date(2028, 1, 31), 50),
+                                                 ('MAR', date(2028, 3, 1), date(2028, 3, 31), 50),
+                                                 ('FEB', date(2028, 1, 20), date(2028, 2, 10), 20)]
+        ])
+        first_quarter = date(2028, 1, 1), date(2028, 3, 31)
+
+        # 50% in January and 50% in March is half time at most, with February's 20% on top in late January
+        self.assertEqual(self.available(*first_quarter, min_free=0)[employee.pk], 30)
+        self.assertEqual(self.available(date(2028, 2, 1), date(2028, 3, 31), min_free=0)[employee.pk], 50)
+        self.assertEqual(self.available(*first_quarter, min_free=0, exclude_project=Project.objects.get(code='FEB').pk)
+                         [employee.pk], 50)
+        self.assertEqual(busy_employee_ids(*first_quarter, allocation=30), [])
+        self.assertEqual(busy_employee_ids(*first_quarter, allocation=40), [employee.pk])
+
+    def test_directory_lists_active_employees_only(self):
+        e = self.employees
+        with self.captureOnCommitCallbacks(execute=True):
+            inactive = create_employees(1, start=4)[0]
+            inactive.is_active = False
+            inactive.save()
+
+        page = employee_directory(available_from=date(2027, 1, 1), available_to=date(2027, 1, 31))
+        self.assertEqual({d.pk: d.free for d in page.employees}, {e[0].pk: 100, e[1].pk: 100, e[2].pk: 70,
+                                                                    e[3].pk: 100})
+
+    def test_employee_list_filter(self):
+        self.client.login(username='employer', password='secret')
+        response = self.client.get(reverse('employee-list-json'), {'available_from': '2026-11-01',
+                                                                   'available_to': '2026-11-30', 'min_free': '60'})
+        self.assertEqual({e['id']: e['free'] for e in response.json()['employees']},
+                         {self.employees[2].pk: 70, self.employees[3].pk: 100})
+
+        response = self.client.get(reverse('employee-list-json'), {'available_from': 'next month'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_form_checks_free_time(self):
+        self.client.login(username='employer', password='secret')
+        data = {'code': 'NEW', 'title': 'New', 'description': '', 'competences': [self.django.pk],
+                'employees': [self.employees[0].pk, self.employees[3].pk],
+                'start_date': '2026-11-10', 'end_date': '2026-11-20', 'allocation': '50'}
+
+        response = self.client.post(reverse('project-create'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('employees', response.context['form'].errors)
+
+        data['employees'] = [self.employees[3].pk]
+        self.assertRedirects(self.client.post(reverse('project-create'), data), reverse('project-list'))
+        assignment = Assignment.objects.get(project__code='NEW')
+        self.assertEqual((assignment.employee, assignment.start_date, assignment.end_date, assignment.allocation),
+                         (self.employees[3], date(2026, 11, 10), date(2026, 11, 20), 50))
+        self.assertEqual(list(Project.objects.get(code='NEW').competences.all()), [self.django])
+
+
+class CompetenceRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        cls.group = Group.objects.create(name='Python')
+        cls.competences = [Competence.objects.create(name=f'Skill {i}', competence_group=cls.group) for i in range(3)]
+        cls.employees = create_employees(3)
+
+    def assertRollupsCurrent(self):
+        self.assertEqual(rollup_drift(), {})
+        self.assertEqual(group_report(), live_group_report())
+
+    def test_signals_keep_rollups_current(self):
+        c, e = self.competences, self.employees
+        project = Project.objects.create(employer=self.employer, title='A', code='A')
+        other = Project.objects.create(employer=self.employer, title='B', code='B')
+
+        # group sums are refreshed on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            e[0].competences.add(c[0], c[1])
+            c[1].competence_joined.add(e[1], e[2])
+            project.competences.add(c[0], c[1], c[2])
+            c[2].project_competence_joined.add(other)
+        self.assertRollupsCurrent()
+        self.assertEqual(CompetenceRollup.objects.get(pk=c[2].pk).gap, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # removing what is not there changes nothing
+            e[0].competences.remove(c[1], c[2])
+            c[0].competence_joined.remove(e[2])
+            e[1].is_active = False
+            e[1].save()
+        self.assertRollupsCurrent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            e[2].competences.clear()
+            c[2].project_competence_joined.clear()
+            project.delete()
+            e[0].delete()
+            Competence.objects.create(name='Skill 3', competence_group=self.group)
+        self.assertRollupsCurrent()
+        self.assertEqual(group_report()[0]['competences'], 4)
+
+    def test_rebuild_and_view(self):
+        c, e = self.competences, self.employees
+        Employee.competences.through.objects.bulk_create([
+            Employee.competences.through(employee=e[0], competence=c[0]),
+        ])
+        project = Project.objects.create(employer=self.employer, title='A', code='A')
+        Project.competences.through.objects.bulk_create([
+            Project.competences.through(project=project, competence=competence) for competence in c[:2]
+        ])
+        self.assertNotEqual(rollup_drift(), {})
+        self.assertEqual(rebuild_rollups(), (3, 1))
+        self.assertRollupsCurrent()
+
+        self.client.login(username='employer', password='secret')
+        # the first request stores the resolved account in the session
+        self.client.get(reverse('competence-analytics'))
+        # session, user, group rollups, competence rollups of the group
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('competence-analytics'), {'group': self.group.pk})
+        self.assertEqual([(g['under_supplied'], g['shortfall']) for g in response.context['groups']], [(1, 1)])
+        self.assertEqual([r.gap for r in response.context['competences']], [1, 0, 0])
+
+        response = self.client.get(reverse('competence-analytics'), {'format': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[:2], ['group,competence,employees,projects,gap', 'Python,Skill 1,0,1,1'])
+
+
+class CompetenceSimilarityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        group = Group.objects.create(name='Web')
+        cls.competences = c = [Competence.objects.create(name=f'Skill {i}', competence_group=group) for i in range(4)]
+        cls.employees = e = create_employees(6)
+        for employee, held in zip(e, [c[:2], c[:3], c[:2], c[2:], c[2:], [c[2]]]):
+            employee.competences.set(held)
+
+    def setUp(self):
+        # the index of the process outlives the rolled back rows
+        self.addCleanup(invalidate_similarity)
+
+    def test_top_neighbours(self):
+        c = self.competences
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(compute_similarity(top_k=5, min_support=2), 4)
+
+        # (0, 1) held together by 3 of 3, (2, 3) by 2 of 4 and 2; single pairs fall below the support
+        self.assertEqual(CompetenceNeighbours.objects.get(pk=c[0].pk).neighbours, [(c[1].pk, 1.0)])
+        [(pk, score)] = CompetenceNeighbours.objects.get(pk=c[3].pk).neighbours
+        self.assertEqual(pk, c[2].pk)
+        self.assertAlmostEqual(score, 2 / (4 * 2) ** 0.5, places=4)
+
+        self.assertEqual([r['name'] for r in related_competences([c[0].pk, c[3].pk])], ['Skill 1', 'Skill 2'])
+        self.assertEqual(related_competences([c[0].pk, c[1].pk]), [])
+
+    def test_recommendations_follow_the_employee_competences(self):
+        c, employee = self.competences, self.employees[5]
+        with self.captureOnCommitCallbacks(execute=True):
+            compute_similarity(min_support=2)
+
+        self.assertEqual([r['competence_id'] for r in get_recommendations(employee.pk)], [c[3].pk])
+        with self.assertNumQueries(0):
+            get_recommendations(employee.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            set_competences(employee, [c[2].pk, c[3].pk])
+        self.assertEqual(get_recommendations(employee.pk), [])
+
+    def test_related_competences_view(self):
+        c = self.competences
+        with self.captureOnCommitCallbacks(execute=True):
+            compute_similarity(min_support=2)
+
+        self.client.login(username='employer', password='secret')
+        response = self.client.get(reverse('project-related-competences'), {'competences': [c[1].pk]})
+        self.assertEqual(response.json(), {'related': [{'competence_id': c[0].pk, 'name': 'Skill 0', 'score': 1.0}]})
+        self.assertEqual(self.client.get(reverse('project-related-competences'), {'competences': 'x'}).status_code, 400)
+
+        form = ProjectForm(initial={'competences': [c[2].pk]})
+        self.assertEqual([r['name'] for r in form.suggest_competences()], ['Skill 3'])
+
+
+class EmployeeDocumentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        group = Group.objects.create(name='Python')
+        cls.competences = [Competence.objects.create(name=f'Skill {i}', competence_group=group) for i in range(3)]
+        cls.employees = create_employees(3)
+
+    def test_signals_keep_documents_current(self):
+        c, e = self.competences, self.employees
+        project = Project.objects.create(employer=self.employer, title='A', code='A')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            e[0].competences.add(c[2], c[0])
+            c[1].competence_joined.add(e[0], e[1])
+            project.employees.add(e[0], e[1])
+            Assignment.objects.create(project=Project.objects.create(employer=self.employer, title='B', code='B'),
+                                      employee=e[0])
+            user = e[1].account.user
+            user.last_name = 'Nowak'
+            user.save()
+            e[2].belbin_test_result = 'PO^, CZA*'
+            e[2].save()
+        self.assertEqual(document_drift(), {})
+
+        document = EmployeeDocument.objects.get(pk=e[0].pk)
+        self.assertEqual((document.competence_ids, document.project_count), ([c[0].pk, c[1].pk, c[2].pk], 2))
+        self.assertEqual(EmployeeDocument.objects.get(pk=e[1].pk).last_name, 'Nowak')
+        self.assertEqual(employee_directory(role='CZA').employees, [EmployeeDocument.objects.get(pk=e[2].pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            c[1].competence_joined.clear()
+            project.delete()
+            c[2].delete()
+            e[1].account.user.delete()
+        self.assertEqual(document_drift(), {})
+        self.assertEqual(EmployeeDocument.objects.get(pk=e[0].pk).project_count, 1)
+
+    def test_check_and_rebuild(self):
+        e = self.employees
+        Employee.objects.filter(pk=e[0].pk).update(city='Gdańsk')
+        Employee.competences.through.objects.create(employee=e[1], competence=self.competences[0])
+        self.assertEqual(document_drift(), {e[0].pk: ['city'], e[1].pk: ['raw_competence_ids']})
+
+        self.assertEqual(rebuild_documents(), 3)
+        self.assertEqual(document_drift(), {})
+
+    def test_directory_reads_one_table(self):
+        query = str(directory_queryset(city='kraków', role='PO', competence=self.competences[0].pk).query)
+        self.assertNotIn('auth_user', query)
+        self.assertNotIn('account_employee"', query)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(employee_directory().employees), 3)
+
+
+class EmployeeSearchTests(TestCase):
+
+    def setUp(self):
+        group = Group.objects.create(name='Python')
+        self.django = Competence.objects.create(name='Django', competence_group=group)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lukasz, self.anna = create_employees(2, city='Łódź')
+            self.lukasz.account.user.first_name = 'Łukasz'
+            self.lukasz.account.user.save()
+            self.anna.competences.add(self.django)
+
+    def test_fold(self):
+        self.assertEqual(fold('Łukasz Żółć, ŁÓDŹ'), 'lukasz zolc, lodz')
+
+    def test_backends_fold_diacritics_and_rank(self):
+        for name in ('fts5', 'python'):
+            backend = get_backend(name)
+            backend.rebuild()
+            with self.subTest(backend=name):
+                self.assertEqual([h.employee_id for h in backend.search('lukasz')], [self.lukasz.pk])
+                self.assertEqual({h.employee_id for h in backend.search('lodz')}, {self.lukasz.pk, self.anna.pk})
+                self.assertEqual([h.employee_id for h in backend.search('djan')], [self.anna.pk])
+
+    def test_python_backend_tolerates_typos(self):
+        backend = get_backend('python')
+        backend.rebuild()
+        self.assertEqual([h.employee_id for h in backend.search('Lukazs')], [self.lukasz.pk])
+
+    def test_index_follows_saves(self):
+        backend = get_backend('fts5')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.anna.is_active = False
+            self.anna.save()
+            self.lukasz.competences.add(self.django)
+
+        self.assertEqual([h.employee_id for h in backend.search('django')], [self.lukasz.pk])
+
+
+class MatchingTests(TestCase):
+
+    def setUp(self):
+        group = Group.objects.create(name='Python')
+        self.c = [Competence.objects.create(name=f'Skill {i}', competence_group=group) for i in range(6)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees = create_employees(4)
+            for employee, held in zip(self.employees, ([0, 1, 2], [0, 1], [0, 1, 2, 3, 4], [3])):
+                employee.competences.set([self.c[i] for i in held])
+
+    def ranked(self, competences, **kwargs):
+        return [(m.employee_id, m.covered, m.required, round(m.jaccard, 4), m.missing)
+                for m in rank_employees([c.pk for c in competences], **kwargs)]
+
+    def test_ranked_by_coverage_then_jaccard(self):
+        e, c = self.employees, self.c
+        self.assertEqual(self.ranked(c[:3]), [
+            (e[0].pk, 3, 3, 1.0, []),
+            (e[2].pk, 3, 3, 0.6, []),
+            (e[1].pk, 2, 3, 0.6667, [c[2].pk]),
+        ])
+        # nobody holds c[5]: required and missing for everyone, and only those with c[3] match
+        self.assertEqual(self.ranked([c[3], c[5]], limit=1), [(e[3].pk, 1, 2, 0.5, [c[5].pk])])
+        self.assertEqual([m[0] for m in self.ranked(c[:3], exclude=[e[0].pk])], [e[2].pk, e[1].pk])
+        self.assertEqual(self.ranked([c[5]]), [])
+
+    def test_inactive_employees_are_left_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[0].is_active = False
+            self.employees[0].save()
+        self.assertEqual([m[0] for m in self.ranked(self.c[:3])], [self.employees[2].pk, self.employees[1].pk])
+
+    def test_follows_competence_changes(self):
+        e, c = self.employees, self.c
+        self.ranked(c[:3])
+        with self.captureOnCommitCallbacks(execute=True):
+            e[1].competences.add(c[2])
+            e[0].competences.remove(c[0])
+
+        self.assertEqual(self.ranked(c[:3]), [
+            (e[1].pk, 3, 3, 1.0, []),
+            (e[2].pk, 3, 3, 0.6, []),
+            (e[0].pk, 2, 3, 0.6667, [c[0].pk]),
+        ])
+
+
+class TeamOptimizerTests(TestCase):
+
+    def setUp(self):
+        group = Group.objects.create(name='Python')
+        self.c = [Competence.objects.create(name=f'Skill {i}', competence_group=group) for i in range(4)]
+        roster = [([0, 1], 'PO^'), ([0, 1], 'PO^'), ([2], 'NL*'), ([3], 'N/A'), ([], 'CZA^'), ([0, 1, 2, 3], 'SIE*')]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees = []
+            for i, (held, result) in enumerate(roster):
+                employee = create_employees(1, start=i, belbin_test_result=result)[0]
+                employee.competences.set([self.c[j] for j in held])
+                self.employees.append(employee)
+            # the one who has it all is not available
+            self.employees[5].is_active = False
+            self.employees[5].save()
+
+    def test_covers_the_required_competences(self):
+        e = self.employees
+        team = optimize_team([c.pk for c in self.c], 3)
+
+        self.assertEqual(team.coverage, 1.0)
+        self.assertEqual(team.missing, [])
+        self.assertEqual(len({e[0].pk, e[1].pk} & set(team.employee_ids)), 1)
+        self.assertEqual(set(team.employee_ids) - {e[0].pk, e[1].pk}, {e[2].pk, e[3].pk})
+        self.assertEqual(team.roles, ['PO', 'NL'])
+        self.assertEqual(team.candidates, 5)
+
+    def test_balances_belbin_roles(self):
+        e = self.employees
+        team = optimize_team([self.c[0].pk], 3)
+
+        # a second PO adds nothing once Skill 0 is covered, other roles do
+        self.assertEqual(len({e[0].pk, e[1].pk} & set(team.employee_ids)), 1)
+        self.assertEqual(set(team.employee_ids) - {e[0].pk, e[1].pk}, {e[2].pk, e[4].pk})
+        self.assertEqual(team.roles, ['PO', 'NL', 'CZA'])
+
+    def test_no_candidates(self):
+        team = optimize_team([c.pk for c in self.c], 3, exclude=[e.pk for e in self.employees])
+
+        self.assertEqual((team.employee_ids, team.coverage, team.roles, team.candidates), ([], 0.0, [], 0))
+        self.assertEqual(team.missing, [c.pk for c in self.c])
+
+
+class SkillIndexTests(TestCase):
+
+    def setUp(self):
+        group = Group.objects.create(name='Python')
+        self.django = Competence.objects.create(name='Django', competence_group=group)
+        self.flask = Competence.objects.create(name='Flask', competence_group=group)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees = create_employees(2)
+            self.employees[0].competences.add(self.django)
+
+    def test_changes_apply_after_commit(self):
+        self.assertEqual(search_employees('django'), (1, [self.employees[0].pk]))
+
+        with transaction.atomic():
+            self.employees[1].competences.add(self.django)
+            transaction.set_rollback(True)
+        self.assertEqual(search_employees('django'), (1, [self.employees[0].pk]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[1].competences.add(self.flask)
+        # applied to the local copy, no rebuild
+        with self.assertNumQueries(0):
+            self.assertEqual(search_employees('flask'), (1, [self.employees[1].pk]))
+
+    def test_only_activity_changes_rebuild(self):
+        get_index()
+        version = cache.get(INDEX_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[0].description = 'Backend developer'
+            self.employees[0].save()
+        self.assertEqual(cache.get(INDEX_VERSION_KEY), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employees[0].is_active = False
+            self.employees[0].save()
+        self.assertNotEqual(cache.get(INDEX_VERSION_KEY), version)
+        self.assertEqual(search_employees('django'), (0, []))
+
+    def test_nesting_is_limited(self):
+        self.assertEqual(search_employees('(' * 50 + 'django' + ')' * 50), (1, [self.employees[0].pk]))
+        self.assertEqual(search_employees('NOT ' * 49 + 'flask'), (2, [e.pk for e in self.employees]))
+        for query in ['(' * 2000 + 'django', 'NOT ' * 2000 + 'django', '(NOT ' * 30 + 'django']:
+            with self.subTest(query=query[:10]), self.assertRaisesMessage(QueryError, 'nested deeper than'):
+                search_employees(query)
+
+        self.client.force_login(create_employer().account.user)
+        response = self.client.get(reverse('employee-skill-search-json'), {'q': '(' * 2000})
+        self.assertEqual(response.status_code, 400)
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        cls.employees = create_employees(3)
+        cls.project = Project.objects.create(employer=cls.employer, title='Shop', code='SHOP')
+        cls.project.employees.add(cls.employees[0])
+
+    async def test_employees_are_paged_with_a_cursor(self):
+        await self.async_client.aforce_login(self.employer.account.user)
+
+        response = await self.async_client.get(reverse('api-employee-list'), {'per_page': 2})
+        data = response.json()
+        self.assertEqual([e['id'] for e in data['employees']], [e.pk for e in self.employees[:2]])
+
+        response = await self.async_client.get(reverse('api-employee-list'), {'cursor': data['next_cursor']})
+        self.assertEqual([e['id'] for e in response.json()['employees']], [self.employees[2].pk])
+
+    def test_projects(self):
+        self.client.force_login(self.employer.account.user)
+        data = self.client.get(reverse('api-project-detail', kwargs={'pk': self.project.pk})).json()
+        self.assertEqual(data['employees'], [self.employees[0].pk])
+        self.assertEqual(data['coverage'], 1.0)
+
+    def test_middleware_chain_stays_async(self):
+        # a sync-only middleware would put every async view on a thread through async_to_sync
+        for enabled in (False, True):
+            with self.subTest(profiling=enabled), override_settings(PROFILING_ENABLED=enabled):
+                self.assertFalse(isinstance(ASGIHandler()._middleware_chain, SyncToAsync))
+
+    @override_settings(PROFILING_ENABLED=True)
+    async def test_async_requests_are_profiled(self):
+        profiling.buffer.clear()
+        await self.async_client.aforce_login(self.employer.account.user)
+        await self.async_client.get(reverse('api-project-list'))
+
+        [result] = profiling.buffer.snapshot()
+        self.assertEqual((result.view, result.status), ('api-project-list', 200))
+        self.assertGreater(result.queries, 0)
+
+    def test_access(self):
+        self.assertEqual(self.client.get(reverse('api-employee-list')).status_code, 401)
+        self.client.force_login(self.employees[0].account.user)
+        self.assertEqual(self.client.get(reverse('api-employee-list')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('api-competence-groups')).status_code, 200)
+
+
+class CachedChoicesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='Python')
+        cls.django = Competence.objects.create(name='Django', competence_group=group)
+        cls.employees = create_employees(2)
+
+    def test_validated_against_the_cached_catalog(self):
+        data = {'code': 'SHOP', 'title': 'Shop', 'competences': [str(self.django.pk)],
+                'employees': [str(e.pk) for e in self.employees]}
+        self.assertTrue(ProjectForm(data).is_valid())
+
+        with self.assertNumQueries(1):
+            # only the unique code check hits the database
+            form = ProjectForm(data)
+            self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['competences'], [self.django.pk])
+
+        form = ProjectForm({**data, 'competences': ['999']})
+        self.assertFalse(form.is_valid())
+        self.assertIn('competences', form.errors)
+
+    def test_renames_invalidate_the_catalog(self):
+        self.assertIn('>Django</option>', str(ProjectForm()['competences']))
+        self.django.name = 'Flask'
+        with transaction.atomic():
+            self.django.save()
+            transaction.set_rollback(True)
+        # nothing changes before the rename commits
+        with self.assertNumQueries(0):
+            self.assertIn('>Django</option>', str(ProjectForm()['competences']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.save()
+
+        with self.assertNumQueries(1):
+            html = str(ProjectForm(initial={'competences': [self.django]})['competences'])
+        self.assertIn('<optgroup label="Python"><option value="%d" selected>Flask</option>' % self.django.pk, html)
+
+
+class SharedCacheCheckTests(TestCase):
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    def test_process_local_cache(self):
+        with override_settings(CACHES=self.LOCMEM, ALLOW_PROCESS_LOCAL_CACHE=False):
+            messages = check_shared_cache()
+            self.assertEqual([m.id for m in messages], ['account.W001'])
+            # a warning, so manage.py commands still run with DEBUG off
+            self.assertFalse(messages[0].is_serious())
+        with override_settings(CACHES=self.LOCMEM, ALLOW_PROCESS_LOCAL_CACHE=True):
+            self.assertEqual(check_shared_cache(), [])
+
+        shared = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}
+        with override_settings(CACHES={'default': shared}, ALLOW_PROCESS_LOCAL_CACHE=False):
+            self.assertEqual(check_shared_cache(), [])
+        with override_settings(CACHES={**self.LOCMEM, 'summaries': shared}, COMPETENCE_SUMMARY_CACHE='summaries',
+                               ALLOW_PROCESS_LOCAL_CACHE=False):
+            # the default cache still holds the process-local versions
+            self.assertEqual([m.id for m in check_shared_cache()], ['account.W001'])
+
+
+class CurrentAccountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = create_employees(1)[0]
+        cls.employee.account.user.set_password('secret')
+        cls.employee.account.user.save()
+
+    def test_account_is_cached_in_the_session_until_it_changes(self):
+        self.client.login(username='employee0', password='secret')
+        self.client.get(reverse('employee-belbin-test'))
+
+        # session and user only; the navbar flags come from the session
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('employee-belbin-test'))
+        self.assertTrue(response.context['account'].is_employee)
+        self.assertNotContains(response, reverse('project-list'))
+
+        account = self.employee.account
+        account.is_employer = True
+        account.save()
+
+        response = self.client.get(reverse('employee-belbin-test'))
+        self.assertContains(response, reverse('project-list'))
+
+    def test_account_is_resolved_again_when_its_version_expires(self):
+        self.client.login(username='employee0', password='secret')
+        self.client.get(reverse('employee-belbin-test'))
+
+        # what an invalidation made in another process looks like once the version times out
+        cache.delete(VERSION_KEY.format(account_id=self.employee.account.pk))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('employee-belbin-test'))
+        self.assertTrue(any('FROM "account_account"' in q['sql'] for q in queries))
+
+
+class DatabaseProfileTests(TestCase):
+
+    def test_sqlite_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_postgresql_from_environment(self):
+        environ = {'DATABASE_ENGINE': 'postgresql', 'DATABASE_NAME': 'staff', 'DATABASE_CONN_MAX_AGE': '300',
+                   'DATABASE_PGBOUNCER': '1'}
+        with mock.patch.dict(os.environ, environ):
+            config = database_from_env(Path('.'))
+
+        self.assertEqual((config['NAME'], config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), ('staff', 300, True))
+        self.assertTrue(config['DISABLE_SERVER_SIDE_CURSORS'])
+
+        with mock.patch.dict(os.environ, {'SQLITE_JOURNAL_MODE': 'bogus'}), self.assertRaises(ImproperlyConfigured):
+            sqlite_pragmas_from_env()
+
+    def test_sqlite_journal_mode_only_on_request(self):
+        with mock.patch.dict(os.environ, {'SQLITE_JOURNAL_MODE': ''}):
+            pragmas = sqlite_pragmas_from_env()
+        self.assertNotIn('journal_mode', pragmas)
+        self.assertEqual(pragmas['synchronous'], 'full')
+
+        with mock.patch.dict(os.environ, {'SQLITE_JOURNAL_MODE': 'WAL'}):
+            pragmas = sqlite_pragmas_from_env()
+        self.assertEqual((pragmas['journal_mode'], pragmas['synchronous']), ('wal', 'normal'))
+
+
+
+class ProfileViewsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', employers=2, employees=30, projects=5, stdout=StringIO())
+
+    def test_views_within_budget(self):
+        out = StringIO()
+        # with the system checks manage.py runs, which a method named check() once replaced
+        call_command('profile_views', repeat=1, max_ms=60000, skip_checks=False, stdout=out, stderr=StringIO())
+        self.assertIn('employer project-list', ' '.join(out.getvalue().split()))
+        self.assertIn('requests within budget', out.getvalue())
+        # the persona logins are rolled back with everything else
+        self.assertFalse(Session.objects.exists())
+
+    def test_budget_exceeded(self):
+        with self.assertRaisesMessage(CommandError, 'queries > 0'):
+            call_command('profile_views', repeat=1, max_queries=0, stdout=StringIO())
+
+
+class IndexAuditTests(TestCase):
+
+    def test_full_scans(self):
+        sql = ('SELECT "account_employee"."id" FROM "account_employee" INNER JOIN "auth_user" T3 ON (...) '
+               'WHERE "account_employee"."id" IN (SELECT U0."employee_id" FROM "account_project_employees" U0)')
+
+        self.assertEqual(full_scans(sql, ['SCAN account_employee', 'SEARCH T3 USING INTEGER PRIMARY KEY (rowid=?)',
+                                          'LIST SUBQUERY 1', 'SCAN U0']),
+                         {'account_employee', 'account_project_employees'})
+        # walking an index in order is fine, unless the rows are sorted again afterwards
+        self.assertEqual(full_scans(sql, ['SCAN T3 USING INDEX account_user_last_name_idx']), set())
+        self.assertEqual(full_scans(sql, ['SCAN T3 USING INDEX account_user_last_name_idx',
+                                          'USE TEMP B-TREE FOR ORDER BY']), {'auth_user'})
+
+    def test_views_use_indexes(self):
+        # the planner scans tables of a few rows, so give it a dataset and statistics to plan with
+        call_command('generate_dataset', employers=5, employees=400, projects=40, stdout=StringIO())
+        compute_similarity()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        call_command('index_audit', stdout=StringIO(), stderr=StringIO())
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        group = Group.objects.create(name='Python')
+        cls.django, cls.flask, cls.cobol = [Competence.objects.create(name=name, competence_group=group)
+                                            for name in ('Django', 'Flask', 'Cobol')]
+        cls.employees = create_employees(2)
+        cls.employees[0].competences.set([cls.django, cls.flask])
+        cls.employees[1].competences.set([cls.django])
+        shop = Project.objects.create(employer=cls.employer, title='Shop', code='SHOP')
+        shop.competences.set([cls.django, cls.flask])
+        shop.employees.set(cls.employees)
+        Project.objects.create(employer=cls.employer, title='Blog', code='BLOG').competences.set([cls.django])
+
+    def export(self, kind):
+        out = StringIO()
+        call_command('export_staff', kind, stdout=out)
+        return list(csv.reader(StringIO(out.getvalue())))
+
+    def test_competences(self):
+        self.assertEqual(self.export('competences'), [
+            ['id', 'group', 'name', 'status', 'employees', 'projects'],
+            [str(self.django.pk), 'Python', 'Django', 'Active', '2', '2'],
+            [str(self.flask.pk), 'Python', 'Flask', 'Active', '1', '1'],
+            [str(self.cobol.pk), 'Python', 'Cobol', 'Active', '0', '0'],
+        ])
+
+    def test_employees_and_projects(self):
+        employees = self.export('employees')
+        self.assertEqual(len(employees), 3)
+        self.assertEqual(employees[1][1:4] + employees[1][-3:], ['employee0', 'Jan0', 'Kowalski0000',
+                                                                 'True', 'N/A', 'Django;Flask'])
+
+        self.assertEqual(self.export('projects')[1:], [
+            [str(Project.objects.get(code='SHOP').pk), 'SHOP', 'Shop', 'employer Inc.', 'Django;Flask',
+             'employee0;employee1'],
+            [str(Project.objects.get(code='BLOG').pk), 'BLOG', 'Blog', 'employer Inc.', 'Django', ''],
+        ])
+
+    def test_view_streams_the_same_csv(self):
+        self.client.login(username='employer', password='secret')
+        response = self.client.get(reverse('export', args=['competences']))
+        self.assertEqual(list(csv.reader(StringIO(b''.join(response.streaming_content).decode()))),
+                         self.export('competences'))
+
+        self.client.force_login(self.employees[0].account.user)
+        self.assertEqual(self.client.get(reverse('export', args=['competences'])).status_code, 403)
+
+
+class StaffImporterTests(TestCase):
+
+    def employer(self, username, company_name):
+        return {'username': username, 'password': 'secret', 'company_name': company_name, 'city': 'Gdańsk'}
+
+    def test_import_is_idempotent(self):
+        competences = [{'group': 'Python', 'name': 'Django'}, {'group': 'Python', 'name': 'Flask'}]
+        employers = [self.employer('acme', 'ACME')]
+        employees = [{'username': 'anna', 'first_name': 'Anna', 'competences': 'Django;Python/Flask'},
+                     {'username': 'piotr', 'competences': ''}]
+        projects = [{'code': 'SHOP', 'title': 'Shop', 'employer': 'ACME', 'competences': 'Django',
+                     'employees': 'anna;nobody'}]
+
+        for run in range(2):
+            with StaffImporter(batch_size=1, workers=1) as importer:
+                reports = [report for kind, records in [('competences', competences), ('employers', employers),
+                                                         ('employees', employees), ('projects', projects)]
+                           for report in getattr(importer, f'import_{kind}')(records)]
+            with self.subTest(run=run):
+                self.assertEqual(sum(r.created for r in reports), 6 if run == 0 else 0)
+                self.assertEqual(sum(r.skipped for r in reports), 0 if run == 0 else 6)
+                self.assertFalse(any(r.errors for r in reports))
+
+        anna = Employee.objects.get(account__user__username='anna')
+        self.assertEqual(sorted(anna.competences.values_list('name', flat=True)), ['Django', 'Flask'])
+        project = Project.objects.get(code='SHOP')
+        self.assertEqual((project.employer.company_name, list(project.employees.all())), ('ACME', [anna]))
+        self.assertTrue(User.objects.get(username='acme').check_password('secret'))
+
+    def test_company_name_taken_twice_in_a_batch(self):
+        records = [self.employer('acme', 'ACME'), self.employer('acme2', 'ACME'), self.employer('acme', 'ACME'),
+                   self.employer('initech', 'Initech')]
+        with StaffImporter(workers=1) as importer:
+            [report] = importer.import_employers(records)
+
+        self.assertEqual((report.created, report.skipped), (2, 2))
+        self.assertEqual(report.errors, ["Row 2: company name 'ACME' is already used by row 1."])
+        self.assertEqual(Employer.objects.get(company_name='ACME').account.user.username, 'acme')
+        self.assertFalse(User.objects.filter(username='acme2').exists())
+
+    def test_unknown_competences(self):
+        with StaffImporter(workers=1) as importer, self.assertRaisesMessage(ValueError, 'Unknown competences: Cobol'):
+            list(importer.import_employees([{'username': 'anna', 'competences': 'Cobol'}]))
+        self.assertFalse(User.objects.filter(username='anna').exists())
+
+
+class DatasetGeneratorTests(TestCase):
+
+    def test_generate(self):
+        generator = DatasetGenerator(Scale(employers=2, employees=30, projects=5), belbin_ratio=0.5, batch_size=8)
+        with generator.importer() as importer:
+            for kind in ('competences', 'employers', 'employees', 'projects'):
+                for _ in getattr(importer, f'import_{kind}')(getattr(generator, f'{kind[:-1]}_records')()):
+                    pass
+            submitted = sum(generator.generate_belbin())
+
+        employees = Employee.objects.filter(account__user__username__startswith=USERNAME_PREFIX)
+        self.assertEqual(employees.count(), 30)
+        self.assertEqual(Employer.objects.count(), 2)
+        self.assertEqual(Project.objects.filter(code__startswith='GEN-').count(), 5)
+        self.assertTrue(0 < submitted < 30)
+        self.assertEqual(employees.exclude(belbin_test_result='N/A').count(), submitted)
+        # every employee has competences, and staffed projects only take employees who have one they require
+        self.assertFalse(employees.filter(competences=None).exists())
+        for project in Project.objects.prefetch_related('competences', 'employees__competences'):
+            required = set(project.competences.all())
+            for employee in project.employees.all():
+                self.assertTrue(required & set(employee.competences.all()))
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('login/', auth_views.LoginView.as_view(), name='login'),
@@ -9,6 +9,7 @@ urlpatterns = [
     path('', views.DashboardView.as_view(), name='dashboard'),
     path('competence/', views.EmployeeCompetenceView.as_view(), name='employee-competence'),
     path('competence/<int:employee_id>', views.EmployeeCompetenceView.as_view(), name='employee-competence-update'),
+    path('competence/batch', views.CompetenceBatchView.as_view(), name='competence-batch'),
     path('aboutme/<int:pk>/', views.EmployeeAboutMeUpdateView.as_view(), name='employee-update'),
     path('belbintest/', views.EmployeeBelbinTest.as_view(), name='employee-belbin-test'),
 
@@ -16,6 +17,30 @@ urlpatterns = [
     path('project/add', views.ProjectCreateView.as_view(), name='project-create'),
     path('project/<int:pk>', views.ProjectUpdateView.as_view(), name='project-update'),
     path('project/<int:pk>/delete', views.ProjectDeleteView.as_view(), name='project-delete'),
+    path('project/candidates', views.ProjectCandidatesView.as_view(), name='project-candidates'),
+    path('project/<int:pk>/candidates', views.ProjectCandidatesView.as_view(), name='project-candidates-for-project'),
+    path('project/related-competences', views.ProjectRelatedCompetencesView.as_view(), name='project-related-competences'),
+    path('project/team', views.ProjectTeamView.as_view(), name='project-team'),
+    path('project/<int:pk>/team', views.ProjectTeamView.as_view(), name='project-team-for-project'),
 
     path('employee/', views.EmployerEmployeesView.as_view(), name='employee-list'),
+    path('employee/page', views.EmployerEmployeesJsonView.as_view(), name='employee-list-json'),
+    path('employee/skills', views.EmployeeSkillSearchView.as_view(), name='employee-skill-search'),
+    path('employee/skills.json', views.EmployeeSkillSearchView.as_view(as_json=True), name='employee-skill-search-json'),
+    path('employee/search', views.EmployeeSearchView.as_view(), name='employee-search'),
+    path('employee/search.json', views.EmployeeSearchView.as_view(as_json=True), name='employee-search-json'),
+
+    path('analytics/', views.CompetenceAnalyticsView.as_view(), name='competence-analytics'),
+
+    path('export/<str:kind>.csv', views.ExportView.as_view(), name='export'),
+
+    path('api/employees', api.EmployeeListApi.as_view(), name='api-employee-list'),
+    path('api/employees/<int:pk>', api.EmployeeDetailApi.as_view(), name='api-employee-detail'),
+    path('api/projects', api.ProjectListApi.as_view(), name='api-project-list'),
+    path('api/projects/<int:pk>', api.ProjectDetailApi.as_view(), name='api-project-detail'),
+    path('api/competence-groups', api.CompetenceGroupApi.as_view(), name='api-competence-groups'),
+    path('api/belbin', api.BelbinResultApi.as_view(), name='api-belbin-results'),
+
+    path('profiling/', views.ProfilingView.as_view(), name='profiling-json'),
+    path('profiling/metrics', views.ProfilingView.as_view(), {'fmt': 'metrics'}, name='profiling-metrics'),
 ]
@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from django.core.cache import cache
+
+
+T = TypeVar('T')
+
+
+class ProcessLocal(Generic[T]):
+    """
+    An in-process structure (matrix, index, ...) shared by all requests of a
+    worker and rebuilt lazily when a version number kept in the default cache
+    changes. Bumping the version invalidates every copy only when that cache
+    is shared between processes; with LocMemCache each process has its own
+    versions and the other workers keep their stale copies (see
+    ``account.checks``).
+    """
+
+    def __init__(self, key: str, build: Callable[[], T]):
+        self.key = key
+        self.build = build
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._version = None
+
+    def version(self):
+        return cache.get_or_set(self.key, time.time_ns, timeout=None)
+
+    def get(self) -> T:
+        version = self.version()
+        if self._value is None or self._version != version:
+            with self._lock:
+                if self._value is None or self._version != version:
+                    self._value = self.build()
+                    self._version = version
+        return self._value
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, time.time_ns(), timeout=None)
+
+    def update(self, apply: Callable[[T], None]) -> None:
+        """
+        Bump the version and apply an incremental change to this process' copy.
+        The local copy stays in use only if it was current before the change.
+        """
+        with self._lock:
+            try:
+                version = cache.incr(self.key)
+            except ValueError:
+                cache.set(self.key, time.time_ns(), timeout=None)
+                self._value = None
+                return
+
+            if self._value is None or self._version != version - 1:
+                return
+
+            apply(self._value)
+            self._version = version
@@ -1,8 +1,13 @@
-from typing import Any
+from datetime import date
+from typing import Any, Optional
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.db import transaction
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
 from django.urls import reverse_lazy 
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
@@ -10,8 +15,25 @@ from django.views.generic.base import TemplateView, View
 from django.views.generic.edit import FormView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, redirect
-from .models import Account, Employee, Employer, Project, Competence
+from django.template.loader import render_to_string
+from jobs.queue import enqueue
+from jobs.views import accepted
+from .models import BelbinSubmission, Employee, EmployeeDocument, Project, Competence
 from .forms import CompetenceEnrollForm, GroupedTableForm, ProjectForm
+from .belbin import ROLE_MAPPING, ROLES, answers_from_form, scorer
+from .competence_summary import catalog_version, competences_version, get_competence_summary
+from .export import EXPORTS, stream_csv, stream_rows
+from .enrollment import enroll_from_csv, set_competences
+from .analytics import competence_report, csv_rows, group_report
+from .availability import FULL_TIME, busy_employee_ids, parse_period
+from .directory import DEFAULT_PAGE_SIZE, DirectoryPage, employee_directory
+from .matching import rank_employees
+from .projects import DEFAULT_SORT, SORTS, project_page
+from .search import search_employees_text
+from .similarity import get_recommendations, related_competences
+from .skill_index import QueryError, search_employees
+from .team import optimize_team, team_as_dict
+from . import profiling
 
 
 class DashboardView(TemplateView):
@@ -26,29 +48,14 @@ class DashboardView(TemplateView):
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data()
 
-        user_id = self.request.user.id
-        context['account'] = Account.objects.get(user_id=user_id)
-
-        if context['account'].is_employee:
-            context['employee'] = Employee.objects.get(account_id=context['account'].id)
-            context['competences_groups'] = self._get_sorted_comptences_groups_and_competences_(context['employee'])
+        if self.request.account.is_employee:
+            context['employee'] = Employee.objects.select_related('account__user') \
+                .get(account_id=self.request.account.pk)
+            context['competences_groups'] = get_competence_summary(context['employee'].pk)
+            context['recommended_competences'] = get_recommendations(context['employee'].pk)
 
         return context
     
-    def _get_sorted_comptences_groups_and_competences_(self, employee: Employee) -> dict[str, Any]:
-        competences = employee.competences.all()
-        result = {}
-
-        for competence in competences:
-            key = competence.competence_group.name
-
-            if key not in result:
-                result[key] = []
-
-            result[key].append(competence.name)
-        
-        return result
-    
 
 class EmployeeAboutMeUpdateView(LoginRequiredMixin, UpdateView):
     model = Employee
@@ -62,20 +69,51 @@ class EmployeeCompetenceView(LoginRequiredMixin, FormView):
     redirect_authenticated_user = True
     success_url = reverse_lazy('dashboard')
 
+    def get_initial(self):
+        initial = super().get_initial()
+        if self.request.account.is_employee:
+            employee = self.request.account.employee
+            # only evaluated when the cached form fragment has to be rendered
+            initial['competence'] = lambda: list(employee.competences.values_list('pk', flat=True))
+        return initial
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['catalog_version'] = catalog_version()
+        # the versions only reach processes sharing the cache, the timeout bounds the rest
+        context['fragment_timeout'] = getattr(settings, 'COMPETENCE_SUMMARY_TIMEOUT', 300)
+        if self.request.account.is_employee:
+            context['competences_version'] = competences_version(self.request.account.employee.pk)
+        return context
+
     def form_valid(self, form):
-        competences = form.cleaned_data['competence']
+        set_competences(self.request.account.employee, form.cleaned_data['competence'])
 
-        account = Account.objects.get(user_id=self.request.user.pk)
-        employee = Employee.objects.get(account_id=account.pk)
+        return super().form_valid(form)
 
-        # Clear existing competences
-        employee.competences.clear()
 
-        # Add selected competences
-        for competence in competences:
-            employee.competences.add(competence)
+class CompetenceBatchView(LoginRequiredMixin, View):
 
-        return super().form_valid(form)
+    def post(self, request, *args, **kwargs):
+        if not request.account.is_employer:
+            return JsonResponse({'error': 'Only employers can update competences in bulk.'}, status=403)
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return JsonResponse({'error': 'Upload a CSV file with username,competences columns.'}, status=400)
+
+        if request.POST.get('background'):
+            content = upload.read().decode('utf-8-sig')
+            return accepted(enqueue('account.enroll_csv', user=request.user, content=content))
+
+        result = enroll_from_csv(upload.file)
+
+        return JsonResponse({
+            'changed_employees': result.changed_employees,
+            'added': result.added,
+            'removed': result.removed,
+            'errors': result.errors,
+        })
     
 
 class ProjectView(TemplateView):
@@ -89,12 +127,16 @@ class ProjectView(TemplateView):
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data()
 
-        user_id = self.request.user.id
-        context['account'] = Account.objects.get(user_id=user_id)
+        if self.request.account.is_employer:
+            employer = self.request.account.employer
+            sort = self.request.GET.get('sort', DEFAULT_SORT)
+            if sort not in SORTS:
+                sort = DEFAULT_SORT
 
-        if context['account'].is_employer:
-            employer = Employer.objects.get(account_id=context['account'].pk)
-            context['projects'] = Project.objects.filter(employer_id=employer.pk)
+            page = project_page(employer.pk, sort=sort, page=self.request.GET.get('page'))
+            context['page'] = page
+            context['projects'] = page.object_list
+            context['sort'] = sort
 
         return context
     
@@ -104,17 +146,144 @@ class ProjectCreateView(CreateView, LoginRequiredMixin):
     form_class = ProjectForm
     template_name = 'account/employer/project/form.html'
 
+    def get_initial(self):
+        initial = super().get_initial()
+        competence_ids = self.request.GET.getlist('competences')
+
+        try:
+            period = parse_period(self.request.GET.get('start_date'), self.request.GET.get('end_date'))
+        except ValueError:
+            period = None
+        if period:
+            initial['start_date'] = period[0]
+            initial['end_date'] = period[1] if period[1] != date.max else None
+
+        allocation = self.request.GET.get('allocation', '')
+        if allocation.isdigit() and 0 < int(allocation) <= FULL_TIME:
+            initial['allocation'] = int(allocation)
+
+        if competence_ids:
+            initial['competences'] = competence_ids
+            form = self.form_class(initial=initial)
+            initial['employees'] = [m.employee_id for m in form.suggest_employees()]
+
+        return initial
+
     def form_valid(self, form):
         project = form.save(commit=False)
-        project.employer = Employer.objects.get(account_id=self.request.user.account.pk)
+        project.employer = self.request.account.employer
         project.save()
-
-        employees = self.request.POST.getlist('employees')  # Pobierz listę wybranych pracowników z formularza
-        project.employees.set(employees)  # Przypisz wybranych pracowników do projektu
+        # competences, and employees with the assignment period of the form
+        form.save_m2m()
 
         return redirect("project-list")
     
 
+def unavailable_employee_ids(request: HttpRequest, project_id: Optional[int] = None) -> list[int]:
+    """
+    Employees without room for ``allocation`` percent (full time by default)
+    over the ``start_date``..``end_date`` query parameters; nobody without a
+    ``start_date``. The project's own assignments do not count.
+    """
+    period = parse_period(request.GET.get('start_date'), request.GET.get('end_date'))
+    if period is None:
+        return []
+    allocation = request.GET.get('allocation', str(FULL_TIME))
+    if not allocation.isdigit() or not 0 < int(allocation) <= FULL_TIME:
+        raise ValueError(f'allocation must be a percentage between 1 and {FULL_TIME}.')
+    return busy_employee_ids(*period, allocation=int(allocation), exclude_project=project_id)
+
+
+class ProjectCandidatesView(LoginRequiredMixin, View):
+
+    def get(self, request, pk=None):
+        if not request.account.is_employer:
+            return JsonResponse({'error': 'Only employers can staff projects.'}, status=403)
+
+        if pk is not None:
+            competence_ids = Project.competences.through.objects.filter(project_id=pk) \
+                .values_list('competence_id', flat=True)
+        else:
+            competence_ids = request.GET.getlist('competences')
+
+        try:
+            competence_ids = [int(c) for c in competence_ids]
+            limit = min(int(request.GET.get('limit', 10)), 100)
+        except ValueError:
+            return JsonResponse({'error': 'Competences and limit must be integers.'}, status=400)
+
+        try:
+            busy = unavailable_employee_ids(request, project_id=pk)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        matches = rank_employees(competence_ids, limit=limit, exclude=busy)
+        employees = EmployeeDocument.objects.in_bulk([m.employee_id for m in matches])
+
+        return JsonResponse({
+            'candidates': [
+                {
+                    'employee_id': m.employee_id,
+                    'name': str(employees[m.employee_id]),
+                    'covered': m.covered,
+                    'required': m.required,
+                    'coverage': round(m.coverage, 4),
+                    'jaccard': round(m.jaccard, 4),
+                    'missing': m.missing,
+                }
+                for m in matches if m.employee_id in employees
+            ]
+        })
+
+
+class ProjectTeamView(LoginRequiredMixin, View):
+
+    def get(self, request, pk=None):
+        if not request.account.is_employer:
+            return JsonResponse({'error': 'Only employers can staff projects.'}, status=403)
+
+        if pk is not None:
+            competence_ids = Project.competences.through.objects.filter(project_id=pk) \
+                .values_list('competence_id', flat=True)
+        else:
+            competence_ids = request.GET.getlist('competences')
+
+        try:
+            competence_ids = [int(c) for c in competence_ids]
+            size = max(1, min(int(request.GET.get('size', 5)), 50))
+            beam_width = max(1, min(int(request.GET.get('beam', 8)), 64))
+            budget = max(10, min(int(request.GET.get('budget_ms', 500)), 5000)) / 1000
+        except ValueError:
+            return JsonResponse({'error': 'Competences, size, beam and budget_ms must be integers.'}, status=400)
+
+        try:
+            busy = unavailable_employee_ids(request, project_id=pk)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        if request.GET.get('background'):
+            return accepted(enqueue('account.optimize_team', user=request.user, competence_ids=competence_ids,
+                                    size=size, beam_width=beam_width, budget=budget, exclude=busy))
+
+        team = optimize_team(competence_ids, size, beam_width=beam_width, budget=budget, exclude=busy)
+        return JsonResponse(team_as_dict(team))
+
+
+class ProjectRelatedCompetencesView(LoginRequiredMixin, View):
+
+    def get(self, request):
+        if not request.account.is_employer:
+            return JsonResponse({'error': 'Only employers can plan projects.'}, status=403)
+
+        try:
+            competence_ids = [int(c) for c in request.GET.getlist('competences')]
+            limit = max(1, min(int(request.GET.get('limit', 5)), 50))
+        except ValueError:
+            return JsonResponse({'error': 'Competences and limit must be integers.'}, status=400)
+
+        return JsonResponse({'related': related_competences(competence_ids, limit=limit)})
+
+
 class ProjectUpdateView(UpdateView, LoginRequiredMixin):
     model = Project
     form_class = ProjectForm
@@ -128,27 +297,214 @@ class ProjectDeleteView(DeleteView, LoginRequiredMixin):
     context_object_name = 'project'
 
 
-class EmployerEmployeesView(TemplateView, LoginRequiredMixin):
+class EmployeeDirectoryMixin:
+    filter_params = ['city', 'role', 'competence', 'available_from', 'available_to', 'min_free']
+
+    def get_directory_filters(self) -> dict[str, Any]:
+        filters = {name: self.request.GET.get(name, '').strip() for name in self.filter_params}
+        filters['competence'] = int(filters['competence']) if filters['competence'].isdigit() else None
+        filters['min_free'] = min(int(filters['min_free']), FULL_TIME) if filters['min_free'].isdigit() else None
+        for name in ('available_from', 'available_to'):
+            filters[name] = date.fromisoformat(filters[name]) if filters[name] else None
+        return filters
+
+    def get_directory_page(self, filters: Optional[dict[str, Any]] = None) -> DirectoryPage:
+        if filters is None:
+            filters = self.get_directory_filters()
+        try:
+            per_page = int(self.request.GET.get('per_page', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            per_page = DEFAULT_PAGE_SIZE
+
+        return employee_directory(cursor=self.request.GET.get('cursor'),
+                                  per_page=per_page,
+                                  **filters)
+
+
+class EmployerEmployeesView(LoginRequiredMixin, EmployeeDirectoryMixin, TemplateView):
     template_name = 'account/employer/employee/list.html'
 
     def get(self, request, *args, **kwargs):
-        context = self.get_context_data()
+        try:
+            context = self.get_context_data()
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
         return render(request, self.template_name, context=context)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
 
-        user_id = self.request.user.id
-        context['account'] = Account.objects.get(user_id=user_id)
+        if self.request.account.is_employer:
+            filters = self.get_directory_filters()
+            page = self.get_directory_page(filters)
+
+            context['employees'] = page.employees
+            context['filters'] = filters
+            context['roles'] = ROLES
+            context['competences'] = Competence.objects.only('pk', 'name')
 
-        if context['account'].is_employer:
-            context['employees'] = Employee.objects.all()
+            if page.has_next:
+                query = {k: v for k, v in filters.items() if v}
+                query['cursor'] = page.next_cursor
+                context['next_page_query'] = urlencode(query)
 
         return context
 
 
+class EmployerEmployeesJsonView(LoginRequiredMixin, EmployeeDirectoryMixin, View):
+
+    def get(self, request, *args, **kwargs):
+        if not request.account.is_employer:
+            return JsonResponse({'error': 'Only employers can browse employees.'}, status=403)
+
+        try:
+            page = self.get_directory_page()
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({
+            'employees': [
+                {
+                    'id': e.pk,
+                    'username': e.username,
+                    'first_name': e.first_name,
+                    'last_name': e.last_name,
+                    'email': e.email,
+                    'city': e.city,
+                    'belbin_test_result': e.belbin_test_result,
+                    **({'free': e.free} if hasattr(e, 'free') else {}),
+                }
+                for e in page.employees
+            ],
+            'next_cursor': page.next_cursor,
+        })
+
+
+class EmployeeSkillSearchView(LoginRequiredMixin, View):
+    template_name = 'account/employer/employee/skill_search.html'
+    as_json = False
+    limit = 100
+
+    def get(self, request, *args, **kwargs):
+        if not request.account.is_employer:
+            if self.as_json:
+                return JsonResponse({'error': 'Only employers can search employees.'}, status=403)
+            return HttpResponseForbidden('Only employers can search employees.')
+
+        query = request.GET.get('q', '').strip()
+        count, employee_ids, error = 0, [], None
+
+        if query:
+            try:
+                count, employee_ids = search_employees(query, limit=self.limit)
+            except QueryError as e:
+                error = str(e)
+
+        if self.as_json:
+            if error:
+                return JsonResponse({'error': error}, status=400)
+            return JsonResponse({'query': query, 'count': count, 'employee_ids': employee_ids})
+
+        employees = EmployeeDocument.objects.in_bulk(employee_ids)
+        return render(request, self.template_name, {
+            'query': query,
+            'count': count,
+            'error': error,
+            'employees': [employees[pk] for pk in employee_ids if pk in employees],
+        })
+
+
+class EmployeeSearchView(LoginRequiredMixin, View):
+    template_name = 'account/employer/employee/search.html'
+    as_json = False
+    limit = 50
+
+    def get(self, request, *args, **kwargs):
+        if not request.account.is_employer:
+            if self.as_json:
+                return JsonResponse({'error': 'Only employers can search employees.'}, status=403)
+            return HttpResponseForbidden('Only employers can search employees.')
+
+        query = request.GET.get('q', '').strip()
+        hits = search_employees_text(query, limit=self.limit) if query else []
+
+        if self.as_json:
+            return JsonResponse({
+                'query': query,
+                'results': [{'employee_id': hit.employee_id, 'score': round(hit.score, 4)} for hit in hits],
+            })
+
+        employees = EmployeeDocument.objects.in_bulk([hit.employee_id for hit in hits])
+        return render(request, self.template_name, {
+            'query': query,
+            'employees': [employees[hit.employee_id] for hit in hits if hit.employee_id in employees],
+        })
+
+
+class CompetenceAnalyticsView(LoginRequiredMixin, View):
+    """Competence supply and demand per group, read from the rollup tables; ``?group=`` drills down."""
+    template_name = 'account/employer/analytics.html'
+
+    def get(self, request, *args, **kwargs):
+        if not request.account.is_employer:
+            return HttpResponseForbidden('Only employers can see competence analytics.')
+
+        group = request.GET.get('group', '')
+        group_id = int(group) if group.isdigit() else None
+
+        if request.GET.get('format') == 'csv':
+            filename = f"competence-gaps-{timezone.now():%Y%m%d}.csv"
+            response = StreamingHttpResponse(stream_rows(csv_rows(group_id)), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        groups = group_report()
+        return render(request, self.template_name, context={
+            'groups': groups,
+            'group': next((g for g in groups if g['group_id'] == group_id), None),
+            'competences': competence_report(group_id) if group_id is not None else [],
+        })
+
+
+class ExportView(LoginRequiredMixin, View):
+
+    def get(self, request, kind, *args, **kwargs):
+        if kind not in EXPORTS:
+            raise Http404(f'Unknown export: {kind}')
+
+        if not request.account.is_employer:
+            return HttpResponseForbidden('Only employers can export staff data.')
+
+        if request.GET.get('background'):
+            return accepted(enqueue('account.export', user=request.user, kind=kind))
+
+        filename = f"{kind}-{timezone.now():%Y%m%d}.csv"
+        response = StreamingHttpResponse(stream_csv(kind), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ProfilingView(LoginRequiredMixin, View):
+
+    def get(self, request, fmt='json', *args, **kwargs):
+        if not request.user.is_staff:
+            return HttpResponseForbidden('Only staff can read profiling data.')
+
+        profiles = profiling.buffer.snapshot()
+
+        if fmt == 'metrics':
+            return HttpResponse(profiling.prometheus_text(profiles), content_type='text/plain; version=0.0.4')
+
+        return JsonResponse({
+            'requests': [p.as_dict() for p in profiles],
+            'views': profiling.summarize(profiles),
+        })
+
+
 class EmployeeBelbinTest(View):
     template_name = 'account/employee/belbinTest.html'
+    questions_template_name = 'account/employee/belbin_questions.html'
+    _questionnaire = None
 
     questions = [
         {
@@ -244,104 +600,40 @@ class EmployeeBelbinTest(View):
         }
     ]
 
-    answers_sum_mapping = [
-        {
-            'name': 'PO',
-            'mapping': [[1, 7], [2, 1], [3, 8], [4, 4], [5, 2], [6, 6], [7, 5]],
-            'sum': 0
-        },
-        {
-            'name': 'NL',
-            'mapping': [[1, 4], [2, 2], [3, 1], [4, 8], [5, 6], [6, 3], [7, 7]],
-            'sum': 0
-        },
-        {
-            'name': 'CZA',
-            'mapping': [[1, 6], [2, 5], [3, 3], [4, 2], [5, 4], [6, 7], [7, 1]],
-            'sum': 0
-        },
-        {
-            'name': 'SIE',
-            'mapping': [[1, 3], [2, 7], [3, 4], [4, 5], [5, 8], [6, 1], [7, 6]],
-            'sum': 0
-        },
-        {
-            'name': 'CZK',
-            'mapping': [[1, 1], [2, 3], [3, 6], [4, 7], [5, 5], [6, 8], [7, 4]],
-            'sum': 0
-        },
-        {
-            'name': 'SĘ',
-            'mapping': [[1, 8], [2, 4], [3, 7], [4, 3], [5, 1], [6, 5], [7, 2]],
-            'sum': 0
-        },
-        {
-            'name': 'CZG',
-            'mapping': [[1, 2], [2, 6], [3, 5], [4, 1], [5, 3], [6, 5], [7, 8]],
-            'sum': 0
-        },
-        {
-            'name': 'PER',
-            'mapping': [[1, 5], [2, 8], [3, 2], [4, 6], [5, 7], [6, 4], [7, 3]],
-            'sum': 0
-        }
-    ]
+    answers_sum_mapping = ROLE_MAPPING
+
+    @classmethod
+    def questionnaire(cls) -> str:
+        """The unanswered questionnaire; it never changes, so it is rendered once per process."""
+        if cls._questionnaire is None:
+            cls._questionnaire = render_to_string(cls.questions_template_name, {
+                'form': GroupedTableForm(grouped_questions=cls.questions),
+            })
+        return cls._questionnaire
 
     def get(self, request):
         return render(request, self.template_name, {
-            'form': GroupedTableForm(grouped_questions=self.questions),
-            'account': Account.objects.get(user_id=request.user.id)
+            'questionnaire': self.questionnaire(),
         })
 
     def post(self, request):
         form = GroupedTableForm(request.POST, grouped_questions=self.questions)
         if form.is_valid():
-            cleaned_data = form.cleaned_data
-            fields_with_values = {}
-            for field_name, field_value in cleaned_data.items():
-                fields_with_values[field_name] = field_value
-
-            score_ranges = {
-            'PO': {'sredni': (9, 13), 'wysoki': (14, 18), 'bardzo wysoki': (19, float('inf'))},
-            'NL': {'sredni': (5, 8), 'wysoki': (9, 12), 'bardzo wysoki': (13, float('inf'))},
-            'CZA': {'sredni': (10, 14), 'wysoki': (15, 20), 'bardzo wysoki': (21, float('inf'))},
-            'SIE': {'sredni': (4, 7), 'wysoki': (8, 11), 'bardzo wysoki': (12, float('inf'))},
-            'CZK': {'sredni': (6, 9), 'wysoki': (10, 13), 'bardzo wysoki': (14, float('inf'))},
-            'SĘ': {'sredni': (7, 11), 'wysoki': (12, 16), 'bardzo wysoki': (17, float('inf'))},
-            'CZG': {'sredni': (5, 10), 'wysoki': (11, 15), 'bardzo wysoki': (16, float('inf'))},
-            'PER': {'sredni': (8, 13), 'wysoki': (14, 19), 'bardzo wysoki': (20, float('inf'))},
-            }   
-            min_score = 0
-            roles_above_min_score = []
-            roles_with_levels = []
-
-            for item in self.answers_sum_mapping:
-                item['sum'] = 0
-                for m in item['mapping']:
-                    item['sum'] += fields_with_values['group_' + str(m[0]) + '_question_' + str(m[1])]
-
-                role_name = item['name']
-                score = item['sum']
-
-                level = ''
-                for level_name, range_values in score_ranges[role_name].items():
-                    if range_values[0] <= score <= range_values[1]:
-                        level = level_name
-                        break
-                
-                if level: 
-                    roles_with_levels.append((role_name, level))
-
-
-            max_sum_name = max(self.answers_sum_mapping, key=lambda x: x['sum'])['name']
-            account = Account.objects.get(user_id=self.request.user.pk)
-            employee = Employee.objects.get(account_id=account.pk)
-            employee.belbin_test_result = ', '.join([f"{role}{'*' if level == 'bardzo wysoki' else '^' if level == 'wysoki' else ''}" for role, level in roles_with_levels])
-            employee.save()
+            employee = request.account.employee
+            answers = answers_from_form(form.cleaned_data)
+            scores = scorer.score(answers)
+
+            with transaction.atomic():
+                submission = BelbinSubmission(employee=employee)
+                submission.answers = answers
+                submission.scores = scores
+                submission.save()
+
+                employee.belbin_test_result = scorer.format(scores)
+                employee.save()
 
             return redirect("dashboard")
 
         return render(request, self.template_name, {
             'form': form,
-            'account': Account.objects.get(user_id=request.user.id)
         })
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competence', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='competence',
+            index=models.Index(fields=['status', 'name'], name='competence__status_3f57e0_idx'),
+        ),
+    ]
@@ -37,6 +37,7 @@ class Competence(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['competence_group', 'name']),
+            models.Index(fields=['status', 'name']),
         ]
 
     def __str__(self) -> str:
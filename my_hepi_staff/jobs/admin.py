@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'progress', 'attempts', 'created', 'finished']
+    list_filter = ['status', 'name']
+    raw_id_fields = ['created_by']
+    readonly_fields = ['result', 'error']
+    ordering = ['-created']
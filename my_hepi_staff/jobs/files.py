@@ -0,0 +1,16 @@
+import os
+
+from django.conf import settings
+
+
+def result_dir() -> str:
+    path = str(getattr(settings, 'JOBS_RESULT_DIR'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def result_path(filename: str) -> str:
+    """Absolute path of a job result file; ``filename`` must not leave the result directory."""
+    if os.path.basename(filename) != filename or filename in ('', '.', '..'):
+        raise ValueError(f'Invalid result file name: {filename!r}')
+    return os.path.join(result_dir(), filename)
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import work
+from jobs.registry import handler_names
+
+
+def _setup_worker():
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers, each in its own process, polling the Job table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait before polling again when no job is due.')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due.')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='Exit each worker after running this many jobs.')
+
+    def handle(self, *args, **options):
+        kwargs = {'burst': options['burst'], 'poll_interval': options['poll_interval'],
+                  'max_jobs': options['max_jobs']}
+        processes = max(1, options['processes'])
+        self.stdout.write(f'Handlers: {", ".join(handler_names()) or "none"}')
+
+        try:
+            if processes == 1:
+                processed = work(**kwargs)
+            else:
+                # forked workers must not share the parent's database connections
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=processes, initializer=_setup_worker) as pool:
+                    futures = [pool.submit(work, **kwargs) for _ in range(processes)]
+                    processed = sum(f.result() for f in as_completed(futures))
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted.')
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {processed} jobs.'))
@@ -0,0 +1,169 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, Status
+from .registry import get_handler
+
+
+def enqueue(name: str, user=None, priority: int = 0, max_attempts: Optional[int] = None, **args) -> Job:
+    """Queue a ``name`` job with keyword ``args`` and return it immediately."""
+    handler = get_handler(name)
+    if handler is None:
+        raise ValueError(f'Unknown job: {name}')
+
+    return Job.objects.create(
+        name=name,
+        args=args,
+        priority=priority,
+        max_attempts=max_attempts or handler.max_attempts,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale() -> int:
+    """Requeue (or fail, when out of attempts) running jobs whose worker stopped sending heartbeats."""
+    stale = Job.objects.filter(
+        status=Status.RUNNING,
+        heartbeat__lt=timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_STALE_AFTER', 300)),
+    )
+    message = 'Its worker stopped responding.'
+    failed = stale.filter(attempts__gte=F('max_attempts')) \
+        .update(status=Status.FAILED, worker='', finished=timezone.now(), error=message)
+    return failed + stale.update(status=Status.QUEUED, worker='', message=message)
+
+
+def claim(worker: str, candidates: int = 10) -> Optional[Job]:
+    """
+    Atomically take the next due job. A candidate is claimed by an UPDATE
+    conditioned on it still being queued, so when several workers race for
+    the same row exactly one update matches; the others try the next
+    candidate. This needs no row locks and works the same on SQLite and
+    PostgreSQL.
+    """
+    now = timezone.now()
+    pks = list(Job.objects.filter(status=Status.QUEUED, run_after__lte=now)
+               .order_by('-priority', 'pk').values_list('pk', flat=True)[:candidates])
+
+    for pk in pks:
+        claimed = Job.objects.filter(pk=pk, status=Status.QUEUED).update(
+            status=Status.RUNNING, worker=worker, attempts=F('attempts') + 1,
+            started=now, heartbeat=now, finished=None,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+class JobContext:
+    """Passed to handlers to report progress; writes are throttled to ``interval`` seconds."""
+
+    def __init__(self, job: Job, interval: float = 0.5):
+        self.job = job
+        self.interval = interval
+        self._last = 0.0
+
+    def progress(self, done: Optional[float] = None, total: Optional[float] = None, message: str = '',
+                 force: bool = False) -> None:
+        """Without ``done`` only the message and heartbeat change, for work of unknown size."""
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+
+        fields = {'message': message[:250], 'heartbeat': timezone.now()}
+        if done is not None:
+            fraction = done / total if total else done
+            fields['progress'] = max(0.0, min(1.0, fraction))
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=getattr(settings, 'JOBS_RETRY_DELAY', 10) * 2 ** (attempts - 1))
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a running job's heartbeat fresh while its handler works without reporting progress."""
+
+    def __init__(self, job: Job):
+        super().__init__(daemon=True)
+        self.job = job
+        self.interval = getattr(settings, 'JOBS_HEARTBEAT', 30)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                Job.objects.filter(pk=self.job.pk, status=Status.RUNNING).update(heartbeat=timezone.now())
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.join()
+
+
+def execute(job: Job) -> Job:
+    """Run a claimed job and store its result, or schedule a retry with exponential backoff."""
+    handler = get_handler(job.name)
+
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for {job.name!r}.')
+        with Heartbeat(job):
+            result = handler.func(JobContext(job), **job.args)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts and handler is not None:
+            update = {'status': Status.QUEUED, 'run_after': timezone.now() + retry_delay(job.attempts)}
+        else:
+            update = {'status': Status.FAILED, 'finished': timezone.now()}
+        Job.objects.filter(pk=job.pk).update(error=error, worker='', **update)
+    else:
+        Job.objects.filter(pk=job.pk).update(
+            status=Status.SUCCEEDED, result=result, progress=1.0, finished=timezone.now(),
+        )
+
+    job.refresh_from_db()
+    return job
+
+
+def work(burst: bool = False, poll_interval: float = 1.0, max_jobs: Optional[int] = None) -> int:
+    """
+    Claim and run jobs until interrupted. With ``burst`` return as soon as
+    no job is due. Returns the number of jobs run.
+    """
+    worker = worker_name()
+    processed = 0
+
+    while max_jobs is None or processed < max_jobs:
+        close_old_connections()
+        job = claim(worker)
+        if job is None:
+            requeue_stale()
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        execute(job)
+        processed += 1
+
+    return processed
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class Handler:
+    name: str
+    func: Callable
+    max_attempts: int = 3
+
+
+_handlers: dict[str, Handler] = {}
+
+
+def register(name: str, max_attempts: int = 3):
+    """
+    Register ``func(context, **args)`` as the handler of jobs called ``name``.
+    The return value, which must be JSON-serializable, is stored as the job's
+    result.
+    """
+    def decorator(func: Callable) -> Callable:
+        if name in _handlers and _handlers[name].func is not func:
+            raise ValueError(f'Job handler {name!r} is already registered.')
+        _handlers[name] = Handler(name, func, max_attempts)
+        return func
+    return decorator
+
+
+def get_handler(name: str) -> Optional[Handler]:
+    return _handlers.get(name)
+
+
+def handler_names() -> list[str]:
+    return sorted(_handlers)
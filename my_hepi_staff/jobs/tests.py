@@ -0,0 +1,112 @@
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Job, Status
+from .queue import JobContext, claim, enqueue, execute, requeue_stale, work
+from .registry import register
+
+
+calls = []
+
+
+@register('tests.add')
+def add(context, a, b):
+    context.progress(1, 2, message='halfway', force=True)
+    return a + b
+
+
+@register('tests.flaky', max_attempts=2)
+def flaky(context):
+    calls.append(1)
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+
+    def test_job_runs_and_stores_its_result(self):
+        job = enqueue('tests.add', a=2, b=3)
+        self.assertEqual(work(burst=True), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.progress, job.message), (Status.SUCCEEDED, 5, 1.0, 'halfway'))
+
+    def test_a_job_is_claimed_once(self):
+        enqueue('tests.add', a=1, b=1)
+        self.assertIsNotNone(claim('worker-1'))
+        self.assertIsNone(claim('worker-2'))
+
+    def test_failures_are_retried_with_backoff(self):
+        calls.clear()
+        job = enqueue('tests.flaky')
+
+        job = execute(claim('worker'))
+        self.assertEqual(job.status, Status.QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(claim('worker'))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job = execute(claim('worker'))
+        self.assertEqual((job.status, job.attempts, len(calls)), (Status.FAILED, 2, 2))
+        self.assertIn('RuntimeError: boom', job.error)
+
+    def test_stale_jobs_are_requeued(self):
+        job = enqueue('tests.add', a=1, b=1)
+        claim('worker')
+        Job.objects.filter(pk=job.pk).update(heartbeat=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Status.QUEUED)
+
+    def test_progress_without_done_only_updates_the_message(self):
+        job = enqueue('tests.add', a=1, b=1)
+        context = JobContext(job)
+        context.progress(1, 4, message='a quarter', force=True)
+        context.progress(message='still going', force=True)
+
+        job.refresh_from_db()
+        self.assertEqual((job.progress, job.message), (0.25, 'still going'))
+
+    def test_unknown_jobs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+
+
+class JobStatusViewTests(TestCase):
+
+    def test_only_the_owner_sees_a_job(self):
+        owner = User.objects.create_user('owner', password='secret')
+        User.objects.create_user('other', password='secret')
+        job = enqueue('tests.add', user=owner, a=1, b=2)
+        work(burst=True)
+
+        self.client.login(username='other', password='secret')
+        self.assertEqual(self.client.get(reverse('job-status', kwargs={'pk': job.pk})).status_code, 404)
+
+        self.client.login(username='owner', password='secret')
+        data = self.client.get(reverse('job-status', kwargs={'pk': job.pk})).json()
+        self.assertEqual((data['status'], data['result']), ('succeeded', 3))
+
+    @override_settings(JOBS_RESULT_DIR=tempfile.mkdtemp())
+    def test_export_in_the_background(self):
+        from account.models import Account, Employer
+
+        user = User.objects.create_user('employer', password='secret')
+        account = Account.objects.create(user=user, is_employee=False, is_employer=True)
+        Employer.objects.create(account=account, company_name='Acme', address='Main 1', post_code='00-001',
+                                city='Warszawa')
+        self.client.login(username='employer', password='secret')
+
+        response = self.client.get(reverse('export', kwargs={'kind': 'competences'}), {'background': 1})
+        self.assertEqual(response.status_code, 202)
+        work(burst=True)
+
+        data = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(data['result']['rows'], 0)
+        response = self.client.get(data['download_url'])
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines()[0],
+                         'id,group,name,status,employees,projects')
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<int:pk>', views.JobStatusView.as_view(), name='job-status'),
+    path('<int:pk>/file', views.JobFileView.as_view(), name='job-file'),
+]
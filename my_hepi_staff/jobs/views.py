@@ -0,0 +1,52 @@
+import os
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.generic.base import View
+
+from .files import result_path
+from .models import Job, Status
+
+
+def status_url(job: Job) -> str:
+    return reverse('job-status', kwargs={'pk': job.pk})
+
+
+def accepted(job: Job) -> JsonResponse:
+    """202 response for a view that handed its work to a job."""
+    return JsonResponse({'job': job.pk, 'status': job.status, 'status_url': status_url(job)}, status=202)
+
+
+class JobMixin(LoginRequiredMixin):
+
+    def get_job(self, pk) -> Job:
+        job = get_object_or_404(Job, pk=pk)
+        if job.created_by_id != self.request.user.pk and not self.request.user.is_staff:
+            raise Http404('No such job.')
+        return job
+
+
+class JobStatusView(JobMixin, View):
+
+    def get(self, request, pk, *args, **kwargs):
+        job = self.get_job(pk)
+        data = job.as_dict()
+        if job.status == Status.SUCCEEDED and isinstance(job.result, dict) and job.result.get('file'):
+            data['download_url'] = reverse('job-file', kwargs={'pk': job.pk})
+        return JsonResponse(data)
+
+
+class JobFileView(JobMixin, View):
+    """Serve the file a finished job stored under ``JOBS_RESULT_DIR``."""
+
+    def get(self, request, pk, *args, **kwargs):
+        job = self.get_job(pk)
+        if job.status != Status.SUCCEEDED or not isinstance(job.result, dict) or not job.result.get('file'):
+            raise Http404('This job has no file.')
+
+        path = result_path(job.result['file'])
+        if not os.path.exists(path):
+            raise Http404('The file has been removed.')
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.result['file'])
@@ -0,0 +1,115 @@
+"""
+Database settings read from the environment, and the SQLite tuning applied to
+every new connection.
+
+    DATABASE_ENGINE         sqlite (default) or postgresql
+    DATABASE_NAME           file for SQLite, database name for PostgreSQL
+    DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT
+    DATABASE_CONN_MAX_AGE   seconds a connection is reused across requests, 0 closes it per request
+    DATABASE_POOL_SIZE      PostgreSQL only: size of the psycopg pool (Django 5.1+); CONN_MAX_AGE is then 0
+    DATABASE_PGBOUNCER      1 when connecting through PgBouncer in transaction mode
+
+    SQLITE_JOURNAL_MODE     wal, delete, truncate, ...; unset leaves the file's mode alone
+    SQLITE_SYNCHRONOUS      normal (default with wal), full (default otherwise), off
+    SQLITE_MMAP_SIZE        bytes of the file mapped into memory, 0 disables it
+    SQLITE_BUSY_TIMEOUT     milliseconds a writer waits for the lock before "database is locked"
+"""
+import os
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+
+
+JOURNAL_MODES = {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'}
+SYNCHRONOUS = {'off', 'normal', 'full', 'extra'}
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.environ.get(name, '')
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f'{name} must be an integer, got {value!r}.')
+
+
+def env_choice(name: str, default: str, choices: set[str]) -> str:
+    value = os.environ.get(name, default).lower()
+    if value not in choices:
+        raise ImproperlyConfigured(f'{name} must be one of {", ".join(sorted(choices))}, got {value!r}.')
+    return value
+
+
+def database_from_env(base_dir: Path) -> dict:
+    engine = os.environ.get('DATABASE_ENGINE', 'sqlite')
+    conn_max_age = env_int('DATABASE_CONN_MAX_AGE', 60)
+
+    if engine == 'sqlite':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', base_dir / 'db.sqlite3'),
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': conn_max_age != 0,
+        }
+
+    if engine == 'postgresql':
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'my_hepi_staff'),
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': conn_max_age != 0,
+            # PgBouncer in transaction mode hands each transaction a different
+            # server connection, which breaks the named cursors used by .iterator()
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DATABASE_PGBOUNCER', '0') == '1',
+            'OPTIONS': {},
+        }
+        pool_size = env_int('DATABASE_POOL_SIZE', 0)
+        if pool_size:
+            if django.VERSION < (5, 1):
+                raise ImproperlyConfigured('DATABASE_POOL_SIZE needs Django 5.1+, use DATABASE_CONN_MAX_AGE '
+                                           'or PgBouncer instead.')
+            # the pool owns the connections, Django must not keep them itself
+            config['OPTIONS']['pool'] = {'min_size': 1, 'max_size': pool_size}
+            config['CONN_MAX_AGE'] = 0
+        return config
+
+    raise ImproperlyConfigured(f'DATABASE_ENGINE must be sqlite or postgresql, got {engine!r}.')
+
+
+def sqlite_pragmas_from_env() -> dict[str, object]:
+    pragmas = {}
+    # the journal mode is stored in the database file, so it is only changed on request
+    # (once is enough) rather than rewriting the file's header from every manage.py run
+    if os.environ.get('SQLITE_JOURNAL_MODE'):
+        pragmas['journal_mode'] = env_choice('SQLITE_JOURNAL_MODE', 'wal', JOURNAL_MODES)
+    return {
+        **pragmas,
+        # with WAL, NORMAL only syncs at checkpoints: a power loss may drop the
+        # last commits but cannot corrupt the database
+        'synchronous': env_choice('SQLITE_SYNCHRONOUS', 'normal' if pragmas.get('journal_mode') == 'wal' else 'full',
+                                  SYNCHRONOUS),
+        'mmap_size': env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT', 20000),
+    }
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply ``settings.SQLITE_PRAGMAS`` to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def connect() -> None:
+    connection_created.connect(configure_sqlite, dispatch_uid='my_hepi_staff.db.configure_sqlite')
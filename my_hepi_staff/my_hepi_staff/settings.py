@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 
+from .db import database_from_env, sqlite_pragmas_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,15 +44,18 @@ INSTALLED_APPS = [
     # MY APPS
     'django_seed',
     'competence.apps.CompetenceConfig',
+    'jobs.apps.JobsConfig',
     'widget_tweaks',
 ]
 
 MIDDLEWARE = [
+    'account.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'account.access.CurrentAccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,13 +66,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # compiled templates are kept per process; runserver's autoreloader resets them on change
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'account.access.account',
             ],
         },
     },
@@ -78,14 +90,85 @@ WSGI_APPLICATION = 'my_hepi_staff.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# Configured from DATABASE_* environment variables, see my_hepi_staff/db.py.
 
 DATABASES = {
+    'default': database_from_env(BASE_DIR),
+}
+
+# Applied to every new SQLite connection: writers wait SQLITE_BUSY_TIMEOUT ms for the
+# lock instead of failing at once. SQLITE_JOURNAL_MODE=wal (set once, the file keeps it)
+# lets readers run alongside a writer; unset, the journal mode is left alone.
+SQLITE_PRAGMAS = sqlite_pragmas_from_env()
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'my-hepi-staff'),
     }
 }
 
+# Seconds the account resolved into a session is trusted, an upper bound on staleness
+# when the invalidation happened in another process
+CURRENT_ACCOUNT_TIMEOUT = 300
+
+# Cache alias holding the per-employee competence summaries shown on the dashboard
+COMPETENCE_SUMMARY_CACHE = os.environ.get('COMPETENCE_SUMMARY_CACHE', 'default')
+# Seconds a summary (and the cached competence form) is kept, bounding how long one
+# stays stale when it was invalidated in another process
+COMPETENCE_SUMMARY_TIMEOUT = 300
+
+# Process-local structures and cached summaries are invalidated through the cache, so
+# production needs a backend shared by every worker; LocMemCache only suits a single
+# process (runserver, tests), so the system check warns about it unless this is set
+ALLOW_PROCESS_LOCAL_CACHE = DEBUG
+
+
+# Request profiling
+# ProfilingMiddleware keeps the last PROFILING_BUFFER_SIZE requests per process,
+# readable at /profiling/ (JSON) and /profiling/metrics (Prometheus) by staff.
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILING_BUFFER_SIZE = 1000
+
+# Per URL name budgets checked by `manage.py profile_views`; '*' applies to every view
+PROFILE_VIEW_BUDGETS = {
+    '*': {'queries': 15, 'ms': 500},
+}
+
+# Tables `manage.py index_audit` lets a view read in full, per URL name; '*' applies to every view
+INDEX_AUDIT_ALLOWED_SCANS = {
+    '*': [
+        # process-local structures (account.versioning.ProcessLocal) load their whole
+        # table when the version changes, from whichever view asks first
+        'account_competenceneighbours',  # similarity index
+        'account_account',  # employee choices, every employee by name
+    ],
+    # one small row per competence group and every group is listed; the ORDER BY
+    # spans the join with competence_group, so no index can serve it
+    'competence-analytics': ['account_grouprollup'],
+}
+
+
+# Background jobs run by `manage.py run_workers`
+# A running job whose heartbeat is older than JOBS_STALE_AFTER seconds is requeued;
+# failed attempts are retried after JOBS_RETRY_DELAY * 2 ** (attempt - 1) seconds.
+
+JOBS_RESULT_DIR = os.environ.get('JOBS_RESULT_DIR', BASE_DIR / 'job_results')
+JOBS_HEARTBEAT = 30
+JOBS_STALE_AFTER = 300
+JOBS_RETRY_DELAY = 10
+
+
+# Employee full-text search: 'fts5' (SQLite table from migration 0010),
+# 'python' (in-process trigram index) or 'auto' (fts5 when the table exists)
+
+EMPLOYEE_SEARCH_BACKEND = os.environ.get('EMPLOYEE_SEARCH_BACKEND', 'auto')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators